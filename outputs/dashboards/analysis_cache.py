@@ -0,0 +1,159 @@
+"""
+Size-Bounded Analysis Cache
+===========================
+
+A replacement for the plain dict the optimized dashboard kept in
+``st.session_state``: every entry is charged its size in bytes, and once the
+memory budget is exceeded entries are evicted by the configured policy —
+least recently used (``'lru'``) or least frequently used (``'lfu'``, ties
+broken by recency). Entries may also carry a time-to-live after which they
+count as misses and are dropped.
+
+Hit, miss, eviction and expiration counters are kept so the dashboard can show
+how well the cache is doing. All operations take a lock, so background
+workers (see ``speculation.py``) can fill the cache the page reads from.
+
+Usage:
+    cache = AnalysisCache(max_bytes=64 * 1024 ** 2, policy='lru', ttl=600)
+    result = cache.get(key)
+    if result is None:
+        result = expensive_analysis()
+        cache.put(key, result)
+    cache.stats()   # {'entries': ..., 'bytes': ..., 'hits': ..., ...}
+"""
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_MAX_BYTES = 64 * 1024 ** 2
+POLICIES = ('lru', 'lfu')
+
+
+def entry_size(value):
+    """Approximate memory footprint of a cached value in bytes."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(entry_size(item) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(entry_size(k) + entry_size(v) for k, v in value.items())
+    return sys.getsizeof(value)
+
+
+class AnalysisCache:
+    """Mapping of analysis results with a byte budget, LRU/LFU eviction and TTLs."""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, policy='lru', ttl=None):
+        self._entries = OrderedDict()   # key -> [value, size, expires_at, uses], oldest use first
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._lock = threading.RLock()
+        self.configure(max_bytes, policy, ttl)
+
+    def configure(self, max_bytes, policy, ttl):
+        """Set the budget, policy and default TTL (seconds, None for no expiry)."""
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown eviction policy: {policy!r} (expected one of {POLICIES})")
+        with self._lock:
+            self.max_bytes = int(max_bytes)
+            self.policy = policy
+            self.ttl = ttl
+            self._evict()
+
+    def get(self, key, default=None):
+        """Cached value for ``key``, or ``default`` on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] is not None and entry[2] <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            entry[3] += 1
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, ttl=None):
+        """Store ``value``; returns False when it alone exceeds the budget."""
+        size = entry_size(value)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if size > self.max_bytes:
+                return False
+            ttl = self.ttl if ttl is None else ttl
+            expires_at = time.monotonic() + ttl if ttl else None
+            self._entries[key] = [value, size, expires_at, 1]
+            self.total_bytes += size
+            self._evict(protect=key)
+            return True
+
+    def _remove(self, key):
+        _, size, _, _ = self._entries.pop(key)
+        self.total_bytes -= size
+
+    def _purge_expired(self):
+        now = time.monotonic()
+        for key in [k for k, entry in self._entries.items() if entry[2] is not None and entry[2] <= now]:
+            self._remove(key)
+            self.expirations += 1
+
+    def _evict(self, protect=None):
+        """Drop entries by policy until the cache fits its budget."""
+        if self.total_bytes <= self.max_bytes:
+            return
+        self._purge_expired()
+        while self.total_bytes > self.max_bytes:
+            candidates = [key for key in self._entries if key != protect]
+            if not candidates:
+                break
+            if self.policy == 'lru':
+                victim = candidates[0]
+            else:
+                # min() keeps the first of equal counts, i.e. the least recently used
+                victim = min(candidates, key=lambda key: self._entries[key][3])
+            self._remove(victim)
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def stats(self):
+        """Counters and occupancy for display."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.total_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
+
+    def __contains__(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+        return entry is not None and (entry[2] is None or entry[2] > time.monotonic())
+
+    def __len__(self):
+        return len(self._entries)
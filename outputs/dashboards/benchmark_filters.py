@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Filter Benchmark: Series.isin vs BitmapIndex, date masks vs TimeIndex
+=====================================================================
+
+Compares the dashboards' original ``isin`` filter path on object-dtype string
+columns against the packed-bitset ``BitmapIndex``, and full-column date
+comparisons against ``TimeIndex`` binary-search slicing, on synthetic
+sales-style data. Every case checks that both paths return the same rows.
+
+Usage:
+    python benchmark_filters.py                      # 1M, 10M and 50M rows
+    python benchmark_filters.py --sizes 1000000      # a single size
+    python benchmark_filters.py --repeat 10
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from bitmap_index import BitmapIndex
+from time_index import TimeIndex
+
+REGIONS = ['North', 'South', 'East', 'West']
+PRODUCTS = ['Product A', 'Product B', 'Product C', 'Product D']
+SALES_REPS = [f'Rep {i}' for i in range(1, 11)]
+
+# (regions, products) selections representative of multiselect usage
+SELECTIONS = [
+    (REGIONS, PRODUCTS),
+    (['North', 'East'], PRODUCTS),
+    (['West'], ['Product B', 'Product C']),
+]
+
+# Date windows (in days) over two years of transactions
+DATE_WINDOWS = [730, 90, 7]
+
+
+def make_frame(n_rows, seed=42):
+    """Synthetic frame with object-dtype dimension columns, like load_sales_data."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'date': pd.Timestamp('2023-01-01') + pd.to_timedelta(
+            np.sort(rng.integers(0, 731 * 24 * 3600, n_rows)), unit='s'),
+        'region': np.array(REGIONS, dtype=object)[rng.integers(0, len(REGIONS), n_rows)],
+        'product': np.array(PRODUCTS, dtype=object)[rng.integers(0, len(PRODUCTS), n_rows)],
+        'sales_rep': np.array(SALES_REPS, dtype=object)[rng.integers(0, len(SALES_REPS), n_rows)],
+    })
+
+
+def best_of(func, repeat):
+    """Best wall-clock time of ``repeat`` calls, plus the last result."""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run_benchmark(n_rows, repeat):
+    df = make_frame(n_rows)
+
+    start = time.perf_counter()
+    index = BitmapIndex(df, ['region', 'product', 'sales_rep'])
+    build_time = time.perf_counter() - start
+    print(f"\n{n_rows:,} rows — index build {build_time:.2f}s (one-off, cached by the dashboards)")
+    print(f"{'regions':>8} {'products':>8} {'isin (ms)':>10} {'bitmap (ms)':>12} {'speedup':>8}")
+
+    for regions, products in SELECTIONS:
+        isin_time, isin_mask = best_of(
+            lambda: (df['region'].isin(regions) & df['product'].isin(products)).to_numpy(),
+            repeat,
+        )
+        bitmap_time, bitmap_mask = best_of(
+            lambda: index.mask(region=regions, product=products),
+            repeat,
+        )
+        if not np.array_equal(isin_mask, bitmap_mask):
+            raise AssertionError(f"Row mismatch for regions={regions}, products={products}")
+        print(f"{len(regions):>8} {len(products):>8} {isin_time * 1e3:>10.1f} "
+              f"{bitmap_time * 1e3:>12.1f} {isin_time / bitmap_time:>7.1f}x")
+
+    time_index = TimeIndex(df, 'date')
+    regions, products = SELECTIONS[1]
+    print(f"{'days':>8} {'scan (ms)':>10} {'slice (ms)':>12} {'speedup':>8}")
+    for days in DATE_WINDOWS:
+        start = pd.Timestamp('2024-06-01') - pd.Timedelta(days=days // 2)
+        end = start + pd.Timedelta(days=days)
+
+        def scan():
+            mask = ((df['date'] >= start) & (df['date'] <= end)
+                    & df['region'].isin(regions) & df['product'].isin(products))
+            return np.flatnonzero(mask.to_numpy())
+
+        def sliced():
+            lo, hi = time_index.bounds(start, end)
+            return lo + np.flatnonzero(index.mask_range(lo, hi, region=regions, product=products))
+
+        scan_time, scan_rows = best_of(scan, repeat)
+        slice_time, slice_rows = best_of(sliced, repeat)
+        if not np.array_equal(scan_rows, slice_rows):
+            raise AssertionError(f"Row mismatch for a {days}-day window")
+        print(f"{days:>8} {scan_time * 1e3:>10.1f} {slice_time * 1e3:>12.2f} "
+              f"{scan_time / slice_time:>7.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000_000, 10_000_000, 50_000_000],
+                        help='Row counts to benchmark')
+    parser.add_argument('--repeat', type=int, default=5, help='Timing repetitions per case')
+    args = parser.parse_args()
+
+    for n_rows in args.sizes:
+        run_benchmark(n_rows, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
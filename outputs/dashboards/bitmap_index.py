@@ -0,0 +1,93 @@
+"""
+Bitmap Index for Low-Cardinality Filter Columns
+===============================================
+
+Dictionary-encodes each indexed column once and keeps one packed bitset
+(``np.packbits``, 1 bit per row) per distinct value. A multiselect filter
+then becomes a bitwise OR over the selected values' bitsets and the filters
+of different columns are combined with a bitwise AND, instead of running a
+string comparison pass over every row with ``Series.isin``.
+
+Usage:
+    index = BitmapIndex(df, ['region', 'product'])
+    mask = index.mask(region=['North', 'East'], product=['Product A'])
+    filtered = df[mask]   # same rows as df['region'].isin(...) & df['product'].isin(...)
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class BitmapIndex:
+    """Per-value packed bitsets for a fixed set of dataframe columns."""
+
+    def __init__(self, df, columns):
+        self.n_rows = len(df)
+        self.columns = tuple(columns)
+        self.categories = {}
+        self.bitmaps = {}
+        for column in self.columns:
+            codes, uniques = pd.factorize(df[column], sort=True)
+            self.categories[column] = {value: code for code, value in enumerate(uniques)}
+            self.bitmaps[column] = np.stack([
+                np.packbits(codes == code) for code in range(len(uniques))
+            ]) if len(uniques) else np.zeros((0, (self.n_rows + 7) // 8), dtype=np.uint8)
+
+    def values(self, column):
+        """Distinct values of an indexed column, in sorted order."""
+        return list(self.categories[column])
+
+    def bitmap(self, **selections):
+        """Packed bitset of rows matching every ``column=[values]`` selection.
+
+        A selection of ``None`` (or one covering every distinct value) does not
+        restrict the column; values absent from the column match no rows.
+        """
+        return self._combine(slice(None), (self.n_rows + 7) // 8, selections)
+
+    def _combine(self, byte_span, n_bytes, selections):
+        """AND of per-column ORs, restricted to the packed bytes in ``byte_span``."""
+        result = None
+        for column, selected in selections.items():
+            if column not in self.bitmaps:
+                raise KeyError(f"Column {column!r} is not indexed")
+            if selected is None:
+                continue
+            lookup = self.categories[column]
+            codes = sorted({lookup[value] for value in selected if value in lookup})
+            if len(codes) == len(lookup):
+                continue
+            if codes:
+                column_bits = np.bitwise_or.reduce(self.bitmaps[column][codes, byte_span], axis=0)
+            else:
+                column_bits = np.zeros(n_bytes, dtype=np.uint8)
+            result = column_bits if result is None else result & column_bits
+        if result is None:
+            result = np.full(n_bytes, 0xFF, dtype=np.uint8)
+        return result
+
+    def mask(self, **selections):
+        """Boolean row mask equivalent to AND-ing ``isin`` over the selections."""
+        return np.unpackbits(self.bitmap(**selections), count=self.n_rows).view(bool)
+
+    def mask_range(self, lo, hi, **selections):
+        """Boolean mask for rows ``lo..hi-1`` only (e.g. a TimeIndex slice).
+
+        Only the packed bytes covering the range are touched, so the cost is
+        proportional to the slice length rather than the full table.
+        """
+        lo, hi = max(lo, 0), min(hi, self.n_rows)
+        if hi <= lo:
+            return np.zeros(0, dtype=bool)
+        first_byte, last_byte = lo // 8, (hi + 7) // 8
+        bits = self._combine(slice(first_byte, last_byte), last_byte - first_byte, selections)
+        offset = lo - first_byte * 8
+        return np.unpackbits(bits, count=offset + hi - lo)[offset:].view(bool)
+
+    def rows(self, **selections):
+        """Positional indices of the matching rows."""
+        return np.flatnonzero(self.mask(**selections))
+
+    def count(self, **selections):
+        """Number of matching rows, computed on the packed bitset."""
+        return int(np.unpackbits(self.bitmap(**selections), count=self.n_rows).sum())
@@ -0,0 +1,145 @@
+"""
+Server-Side Box-Plot Summaries
+==============================
+
+``px.box`` ships every sample to the browser so that Plotly.js can compute
+quartiles and outliers there. ``BoxSummary`` computes, for every (feature,
+class), what a box plot actually draws:
+
+* quartiles — exact (``np.quantile``, linear interpolation like Plotly.js)
+  for classes of up to ``EXACT_MAX_ROWS`` rows, from a t-digest (see
+  ``sketches.TDigest`` for the error bounds) for larger ones; the digests of
+  all large classes of a feature are built together in one pass;
+* whisker ends — the most extreme values within 1.5 IQR of the box (exact);
+* mean and standard deviation;
+* outliers — all of them up to ``MAX_OUTLIERS``, otherwise the two extremes
+  plus a random sample, with the total count kept.
+
+``box_figure`` turns the summaries into precomputed ``go.Box`` traces, so the
+payload is a handful of numbers per class plus the capped outliers,
+whatever the row count.
+
+Usage:
+    summary = BoxSummary.build(df, feature_names, 'species')
+    summary.stats('petal length (cm)', 'setosa')   # {'q1': ..., 'median': ..., 'outliers': array(...), ...}
+    fig = box_figure(summary, 'petal length (cm)', title='Petal length by class')
+"""
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from sketches import DEFAULT_COMPRESSION, TDigest, compress_centroids
+
+EXACT_MAX_ROWS = 100_000
+MAX_OUTLIERS = 200
+WHISKER_IQR = 1.5
+
+
+def _limits(values, q1, q3):
+    """Whisker ends and outliers of one class."""
+    iqr = q3 - q1
+    low, high = q1 - WHISKER_IQR * iqr, q3 + WHISKER_IQR * iqr
+    inside = (values >= low) & (values <= high)
+    return values[inside].min(), values[inside].max(), values[~inside]
+
+
+def _sample_outliers(outliers, max_outliers, rng):
+    if len(outliers) <= max_outliers:
+        return outliers
+    extremes = [outliers.argmin(), outliers.argmax()]
+    rest = np.setdiff1d(np.arange(len(outliers)), extremes)
+    return outliers[np.r_[extremes, rng.choice(rest, max_outliers - 2, replace=False)]]
+
+
+class BoxSummary:
+    """Five-number summaries and capped outliers per (feature, class)."""
+
+    def __init__(self, by, classes, stats):
+        self.by = by
+        self.classes = list(classes)
+        self._stats = stats   # (feature, class) -> dict
+
+    @classmethod
+    def build(cls, df, features, by, exact_max_rows=EXACT_MAX_ROWS, max_outliers=MAX_OUTLIERS,
+              compression=DEFAULT_COMPRESSION, random_state=42):
+        codes, classes = pd.factorize(df[by], sort=True)
+        rng = np.random.default_rng(random_state)
+        order = np.argsort(codes, kind='stable')
+        boundaries = np.searchsorted(codes[order], np.arange(len(classes) + 1))
+        stats = {}
+        for feature in features:
+            column = df[feature].to_numpy(dtype=float)[order]
+            groups = [column[start:end] for start, end in zip(boundaries[:-1], boundaries[1:])]
+            groups = [values[np.isfinite(values)] for values in groups]
+            quartiles = cls._quartiles(groups, exact_max_rows, compression)
+            for class_name, values, (q1, median, q3, method) in zip(classes, groups, quartiles):
+                if len(values) == 0:
+                    continue
+                lower, upper, outliers = _limits(values, q1, q3)
+                stats[(feature, class_name)] = {
+                    'n': len(values),
+                    'q1': q1, 'median': median, 'q3': q3,
+                    'lowerfence': lower, 'upperfence': upper,
+                    'mean': values.mean(), 'sd': values.std(ddof=1) if len(values) > 1 else 0.0,
+                    'outliers': _sample_outliers(outliers, max_outliers, rng),
+                    'n_outliers': len(outliers),
+                    'method': method,
+                }
+        return cls(by, classes, stats)
+
+    @staticmethod
+    def _quartiles(groups, exact_max_rows, compression):
+        """(q1, median, q3, method) per group; large groups share one t-digest pass."""
+        quartiles = [None] * len(groups)
+        large = [i for i, values in enumerate(groups) if len(values) > exact_max_rows]
+        for i, values in enumerate(groups):
+            if i not in large and len(values):
+                quartiles[i] = (*np.quantile(values, [0.25, 0.5, 0.75]), 'exact')
+        if large:
+            ids = np.concatenate([np.full(len(groups[i]), i) for i in large])
+            values = np.concatenate([groups[i] for i in large])
+            digest_ids, means, weights = compress_centroids(ids, values, np.ones(len(values)), compression)
+            for i in large:
+                mask = digest_ids == i
+                digest = TDigest(means[mask], weights[mask], groups[i].min(), groups[i].max(), compression)
+                quartiles[i] = (*digest.quantile([0.25, 0.5, 0.75]), 't-digest')
+        return [q if q is not None else (np.nan, np.nan, np.nan, 'empty') for q in quartiles]
+
+    def stats(self, feature, class_name):
+        key = (feature, class_name)
+        if key not in self._stats:
+            raise KeyError(f"No box summary for feature {feature!r}, class {class_name!r}")
+        return self._stats[key]
+
+    def classes_for(self, feature):
+        return [class_name for class_name in self.classes if (feature, class_name) in self._stats]
+
+
+def box_figure(summary, feature, title=None, color='#636efa'):
+    """Box plot of ``feature`` by class from precomputed summaries."""
+    classes = summary.classes_for(feature)
+    stats = [summary.stats(feature, class_name) for class_name in classes]
+    labels = [str(class_name) for class_name in classes]
+    fig = go.Figure(go.Box(
+        x=labels,
+        q1=[s['q1'] for s in stats],
+        median=[s['median'] for s in stats],
+        q3=[s['q3'] for s in stats],
+        lowerfence=[s['lowerfence'] for s in stats],
+        upperfence=[s['upperfence'] for s in stats],
+        mean=[s['mean'] for s in stats],
+        sd=[s['sd'] for s in stats],
+        marker_color=color,
+        name=feature,
+        boxpoints=False,
+    ))
+    outlier_x = np.concatenate([[label] * len(s['outliers']) for label, s in zip(labels, stats)] or [[]])
+    outlier_y = np.concatenate([s['outliers'] for s in stats] or [[]])
+    if len(outlier_y):
+        fig.add_trace(go.Scatter(
+            x=outlier_x, y=outlier_y, mode='markers', marker=dict(color=color, size=4),
+            name='outliers', hovertemplate="%{x}: %{y}<extra>outlier</extra>",
+        ))
+    fig.update_layout(title=title, xaxis_title=summary.by, yaxis_title=feature, showlegend=False)
+    return fig
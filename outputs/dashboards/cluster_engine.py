@@ -0,0 +1,137 @@
+"""
+Parallel K-Means Sweep
+======================
+
+Fits k-means for a whole range of k at once instead of one k per slider move.
+The fits run in parallel on a process pool, and the fitted sweep keeps every
+model, its labels, and the inertia (elbow) and silhouette curves, so picking
+k afterwards is a lookup.
+
+* Features are standardized once per sweep.
+* From ``MINIBATCH_MIN_ROWS`` rows on, ``MiniBatchKMeans`` replaces ``KMeans``.
+* Silhouette scores are computed on a random sample of ``SILHOUETTE_SAMPLE``
+  rows when there are more rows than that, since the exact score is
+  quadratic in the number of rows.
+* Tables below ``PARALLEL_MIN_ROWS`` rows are fitted in-process, where the
+  fits take less time than starting worker processes.
+
+Workers are started with ``spawn`` (safe next to the server's threads),
+receive the standardized matrix once at start-up, and cap their BLAS/OpenMP
+threads so that the processes together do not oversubscribe the cores.
+
+Usage:
+    sweep = KMeansSweep(k_values=range(2, 11)).fit(df[features])
+    sweep.labels(3)     # cluster of every row for k=3
+    sweep.centers(3)    # cluster centers in the original units
+    sweep.curves        # DataFrame: k, inertia, silhouette, seconds
+    sweep.report        # {'algorithm': 'KMeans', 'rows': ..., 'workers': ..., 'seconds': ...}
+"""
+
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import numpy as np
+import pandas as pd
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.metrics import silhouette_score
+from sklearn.preprocessing import StandardScaler
+
+K_VALUES = range(2, 11)
+MINIBATCH_MIN_ROWS = 50_000
+MINIBATCH_SIZE = 4096
+SILHOUETTE_SAMPLE = 5_000
+PARALLEL_MIN_ROWS = 20_000
+DEFAULT_WORKERS = os.cpu_count() or 1
+
+_worker_matrix = None
+
+
+def fit_k(X, k, minibatch=False, silhouette_sample=SILHOUETTE_SAMPLE, random_state=42):
+    """Fit one k: model, labels, inertia, (sampled) silhouette and fit time."""
+    start = time.perf_counter()
+    if minibatch:
+        model = MiniBatchKMeans(n_clusters=k, batch_size=MINIBATCH_SIZE, n_init=3, random_state=random_state)
+    else:
+        model = KMeans(n_clusters=k, random_state=random_state)
+    labels = model.fit_predict(X)
+    seconds = time.perf_counter() - start
+    if 2 <= len(np.unique(labels)) < len(X):
+        sample_size = silhouette_sample if len(X) > silhouette_sample else None
+        silhouette = silhouette_score(X, labels, sample_size=sample_size, random_state=random_state)
+    else:
+        silhouette = np.nan
+    return {'k': k, 'model': model, 'labels': labels.astype(np.int32), 'inertia': float(model.inertia_),
+            'silhouette': float(silhouette), 'seconds': seconds}
+
+
+def _init_worker(X, threads):
+    global _worker_matrix
+    from threadpoolctl import threadpool_limits
+
+    _worker_matrix = X
+    threadpool_limits(threads)
+
+
+def _fit_in_worker(k, minibatch, silhouette_sample, random_state):
+    return fit_k(_worker_matrix, k, minibatch, silhouette_sample, random_state)
+
+
+class KMeansSweep:
+    """K-means fitted for every k of a range, with elbow and silhouette curves."""
+
+    def __init__(self, k_values=K_VALUES, max_workers=DEFAULT_WORKERS, minibatch_min_rows=MINIBATCH_MIN_ROWS,
+                 silhouette_sample=SILHOUETTE_SAMPLE, random_state=42):
+        self.k_values = list(k_values)
+        self.max_workers = max_workers
+        self.minibatch_min_rows = minibatch_min_rows
+        self.silhouette_sample = silhouette_sample
+        self.random_state = random_state
+        self.results = {}
+        self.curves = None
+        self.report = None
+
+    def fit(self, data):
+        start = time.perf_counter()
+        self.scaler = StandardScaler()
+        X = self.scaler.fit_transform(np.asarray(data, dtype=float))
+        minibatch = len(X) >= self.minibatch_min_rows
+        options = (minibatch, self.silhouette_sample, self.random_state)
+        workers = min(self.max_workers, len(self.k_values))
+        if len(X) < PARALLEL_MIN_ROWS or workers <= 1:
+            workers = 1
+            results = [fit_k(X, k, *options) for k in self.k_values]
+        else:
+            threads = max((os.cpu_count() or 1) // workers, 1)
+            with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn'),
+                                     initializer=_init_worker, initargs=(X, threads)) as pool:
+                results = list(pool.map(_fit_in_worker, self.k_values, *(repeat(option) for option in options)))
+        self.results = {result['k']: result for result in results}
+        self.curves = pd.DataFrame([
+            {name: result[name] for name in ('k', 'inertia', 'silhouette', 'seconds')} for result in results
+        ])
+        self.report = {
+            'algorithm': 'MiniBatchKMeans' if minibatch else 'KMeans',
+            'rows': len(X),
+            'features': X.shape[1],
+            'workers': workers,
+            'seconds': time.perf_counter() - start,
+        }
+        return self
+
+    def _result(self, k):
+        if k not in self.results:
+            raise KeyError(f"k={k} was not part of the sweep (fitted: {self.k_values})")
+        return self.results[k]
+
+    def model(self, k):
+        return self._result(k)['model']
+
+    def labels(self, k):
+        return self._result(k)['labels']
+
+    def centers(self, k):
+        """Cluster centers of ``k`` in the original feature units."""
+        return self.scaler.inverse_transform(self.model(k).cluster_centers_)
@@ -0,0 +1,95 @@
+"""
+Compact Dtypes Memory Mode
+==========================
+
+Shrinks loaded or generated frames without changing what the dashboards show:
+
+* float64 columns become float32 (half the memory; ~7 significant digits);
+* string/object dimensions with few distinct values become categoricals
+  (integer codes plus one copy of each label);
+* integer columns get the smallest signed or unsigned type holding their range.
+
+Aggregations stay accurate because the engines built on these frames
+(``RollupCube``, ``MovingStats``, ``PartitionedSummary``, ``GramStore``,
+``PCAEngine``) accumulate in float64 regardless of the column dtype.
+``precision_check`` compares correlation and PCA results between the
+full-precision and the compact frame so the loss can be verified per dataset;
+``memory_report`` shows the per-column savings.
+
+The mode is off by default; set ``DASHBOARD_COMPACT_DTYPES=1`` to make every
+dashboard loader return compact frames.
+
+Usage:
+    compact = compact_frame(df)
+    memory_report(df, compact)                 # bytes per column, before/after
+    precision_check(df, compact, feature_names)
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from pca_engine import PCAEngine
+
+COMPACT_DTYPES = os.environ.get('DASHBOARD_COMPACT_DTYPES', '0') == '1'
+MAX_CATEGORY_RATIO = 0.5   # convert strings to categoricals below this distinct/rows ratio
+DEFAULT_TOLERANCE = 1e-4
+
+
+def _compact_column(series, float32, categorical):
+    if pd.api.types.is_bool_dtype(series):
+        return series
+    if pd.api.types.is_float_dtype(series):
+        return series.astype(np.float32) if float32 else series
+    if pd.api.types.is_integer_dtype(series):
+        downcast = 'unsigned' if len(series) and series.min() >= 0 else 'integer'
+        return pd.to_numeric(series, downcast=downcast)
+    if categorical and (pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)):
+        if series.nunique(dropna=True) <= MAX_CATEGORY_RATIO * len(series):
+            return series.astype('category')
+    return series
+
+
+def compact_frame(df, float32=True, categorical=True, exclude=()):
+    """Copy of ``df`` with compact dtypes (columns in ``exclude`` are kept as-is)."""
+    return pd.DataFrame({
+        column: df[column] if column in exclude else _compact_column(df[column], float32, categorical)
+        for column in df.columns
+    }, index=df.index)
+
+
+def memory_report(original, compact):
+    """Per-column dtype and memory before/after, with a total row."""
+    before = original.memory_usage(index=False, deep=True)
+    after = compact.memory_usage(index=False, deep=True)
+    report = pd.DataFrame({
+        'dtype': original.dtypes.astype(str),
+        'compact dtype': compact.dtypes.astype(str),
+        'MB': before / 1024 ** 2,
+        'compact MB': after / 1024 ** 2,
+    })
+    report.loc['Total'] = ['', '', report['MB'].sum(), report['compact MB'].sum()]
+    report['saved %'] = (1 - report['compact MB'] / report['MB']) * 100
+    return report
+
+
+def precision_check(original, compact, features, n_components=3, tolerance=DEFAULT_TOLERANCE):
+    """Largest deviations of correlation and PCA results on the compact frame."""
+    features = list(features)
+    correlation_error = np.nanmax(np.abs(
+        original[features].corr().to_numpy() - compact[features].corr().to_numpy()
+    ))
+    n_components = min(n_components, len(features))
+    exact = PCAEngine(n_components, mode='exact').fit(original, columns=features)
+    reduced = PCAEngine(n_components, mode='exact').fit(compact, columns=features)
+    variance_error = np.abs(exact.explained_variance_ratio_ - reduced.explained_variance_ratio_).max()
+    # Components are defined up to sign: compare |cos| of matching components
+    alignment = np.abs(np.sum(exact.components_ * reduced.components_, axis=1))
+    component_error = float(1 - alignment.min())
+    checks = pd.DataFrame({
+        'max abs error': [correlation_error, variance_error, component_error],
+        'tolerance': tolerance,
+    }, index=['correlation matrix', 'PCA explained variance', 'PCA component direction (1 - |cos|)'])
+    checks['passed'] = checks['max abs error'] <= checks['tolerance']
+    return checks
@@ -0,0 +1,91 @@
+"""
+Versioned Dataset Handles for Cheap Cache Keys
+==============================================
+
+``st.cache_data`` hashes every DataFrame argument in full before it can look
+up a cached result, which for large frames costs about as much as the cached
+computation itself. A ``DatasetHandle`` wraps a frame together with an O(1)
+fingerprint:
+
+* a handle created by a loader is identified by its provenance (the loader
+  call), so every session loading the same data shares cache entries;
+* mutating a handle (``replace`` / ``append``) gives it a fresh, unique
+  version id;
+* ``derive`` wraps a frame computed from a handle (a filtered view, a column
+  subset) under a fingerprint built from the parent's fingerprint and a key
+  describing the derivation.
+
+Functions decorated with ``cache_on_handles`` are ``st.cache_data`` functions
+(``st.cache_resource`` with ``resource=True``) that hash handle arguments by
+fingerprint instead of by content.
+
+Usage:
+    dataset = DatasetHandle(generate_large_dataset(10000), 'generate_large_dataset(10000)')
+
+    @cache_on_handles
+    def compute_stats(data):
+        return data.frame.describe()
+
+    subset = dataset.derive(('columns', tuple(features)), dataset.frame[features])
+    compute_stats(subset)
+"""
+
+import functools
+import hashlib
+import uuid
+
+import pandas as pd
+
+
+class DatasetHandle:
+    """A DataFrame plus a fingerprint that changes whenever the frame does."""
+
+    def __init__(self, frame, source, version=0):
+        self.frame = frame
+        self.source = source
+        self.version = version
+
+    @property
+    def fingerprint(self):
+        return f"{self.source}@{self.version}"
+
+    def replace(self, frame):
+        """Swap in a new frame under a new version."""
+        self.frame = frame
+        self.version = uuid.uuid4().hex
+        return self
+
+    def append(self, rows):
+        """Append rows under a new version."""
+        return self.replace(pd.concat([self.frame, rows], ignore_index=True))
+
+    def derive(self, key, frame):
+        """Handle for ``frame`` computed from this dataset as described by ``key``."""
+        digest = hashlib.blake2b(f"{self.fingerprint}|{key!r}".encode(), digest_size=16).hexdigest()
+        return DatasetHandle(frame, f"derived:{digest}")
+
+    def __len__(self):
+        return len(self.frame)
+
+    def __repr__(self):
+        return f"DatasetHandle({self.fingerprint!r}, rows={len(self.frame):,})"
+
+
+def dataset_fingerprint(handle):
+    """Hash function for handles: their fingerprint, not their contents."""
+    return handle.fingerprint
+
+
+def cache_on_handles(func=None, *, resource=False, **cache_kwargs):
+    """``st.cache_data`` keyed on handle fingerprints; other arguments hash as usual.
+
+    ``resource=True`` uses ``st.cache_resource`` instead, for results that are
+    shared objects rather than copied values (indexes, engines).
+    """
+    if func is None:
+        return functools.partial(cache_on_handles, resource=resource, **cache_kwargs)
+    import streamlit as st
+
+    hash_funcs = {DatasetHandle: dataset_fingerprint, **cache_kwargs.pop('hash_funcs', {})}
+    cache = st.cache_resource if resource else st.cache_data
+    return cache(func, hash_funcs=hash_funcs, **cache_kwargs)
@@ -0,0 +1,185 @@
+"""
+Process-Wide Read-Only Dataset Store
+====================================
+
+``st.cache_data`` hands every caller its own copy of a cached DataFrame, so a
+dataset kept in ``st.session_state`` costs its full size once per browser
+session. The store keeps exactly one read-only copy of each dataset per
+server process and gives every session the same ``DatasetHandle``; sessions
+keep only what is private to them (row positions of their filters, their
+analysis cache).
+
+Datasets are materialized as uncompressed Arrow IPC files and memory-mapped
+back. Numeric columns are zero-copy views of the mapping, so they live in the
+OS page cache and are shared by every worker process mapping the same file,
+not just by the sessions of one process; categorical codes and string
+columns are copied once per process. The arrays are read-only: code that
+needs to modify a dataset must work on a copy.
+
+Files are named after the dataset and a hash of the source of its loader and
+of every helper the loader calls from its directory, so editing any of them
+rebuilds the file; writing a rebuilt file removes the superseded ones of the
+same dataset. Without pyarrow the store still shares one in-memory copy per
+process.
+
+``session_bytes`` measures what a session holds beyond the shared datasets,
+and ``stats`` reports the shared bytes and the number of recently active
+sessions, from which the dashboards derive a memory-per-session figure.
+
+Usage:
+    dataset = DATASET_STORE.get('load_dataset(10000)', generate_large_dataset, 10000)
+    DATASET_STORE.touch(session_id)
+    DATASET_STORE.session_bytes(st.session_state)   # private bytes of this session
+    DATASET_STORE.stats()   # {'datasets': ..., 'bytes': ..., 'sessions': ...}
+
+Configuration (environment variables):
+    DASHBOARD_STORE_DIR   directory of the mapped Arrow files (default: .cache/shared next to this file)
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from analysis_cache import AnalysisCache, entry_size
+from dataset_handle import DatasetHandle
+from disk_cache import chain_hash
+
+DEFAULT_STORE_DIR = Path(__file__).parent / ".cache" / "shared"
+SESSION_TIMEOUT = 30 * 60   # seconds without a rerun before a session stops counting as active
+
+
+def _write_arrow(df, path):
+    """Write ``df`` (without its index) as a single-batch Arrow file, atomically."""
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(df, preserve_index=False).combine_chunks()
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}-", dir=path.parent)
+    os.close(fd)
+    try:
+        with pa.OSFile(tmp_name, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp_name, path)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+
+
+def _map_arrow(path):
+    """DataFrame over a memory-mapped Arrow file, zero-copy for numeric columns."""
+    import pyarrow as pa
+
+    table = pa.ipc.open_file(pa.memory_map(str(path), 'r')).read_all()
+    mapped = [
+        name for name, column in zip(table.column_names, table.columns)
+        if (pa.types.is_integer(column.type) or pa.types.is_floating(column.type))
+        and column.num_chunks == 1 and column.null_count == 0
+    ]
+    # Everything else goes through pandas conversion, which restores its dtype
+    converted = table.drop_columns(mapped).to_pandas()
+    columns = {
+        name: table.column(name).chunk(0).to_numpy(zero_copy_only=True) if name in mapped else converted[name]
+        for name in table.column_names
+    }
+    return pd.DataFrame(columns, copy=False)
+
+
+def _freeze(df):
+    """Mark the frame's NumPy arrays read-only."""
+    for name in df.columns:
+        values = df[name].to_numpy()
+        if isinstance(values, np.ndarray) and values.flags.writeable and values.base is None:
+            values.flags.writeable = False
+    return df
+
+
+class DatasetStore:
+    """One shared, read-only copy of each dataset per process."""
+
+    def __init__(self, root=None, memory_map=True):
+        self.root = Path(root or os.environ.get('DASHBOARD_STORE_DIR', DEFAULT_STORE_DIR))
+        self.memory_map = memory_map
+        self._datasets = {}   # name -> DatasetHandle
+        self._sessions = {}   # session id -> last rerun (monotonic seconds)
+        self._lock = threading.Lock()
+
+    def get(self, name, loader, *args, **kwargs):
+        """Shared handle for ``name``, built with ``loader(*args, **kwargs)`` on first use."""
+        with self._lock:
+            handle = self._datasets.get(name)
+            if handle is None:
+                handle = DatasetHandle(self._materialize(name, loader, args, kwargs), name)
+                self._datasets[name] = handle
+            return handle
+
+    def _materialize(self, name, loader, args, kwargs):
+        if self.memory_map:
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                pass
+            else:
+                prefix = hashlib.sha256(name.encode()).hexdigest()[:16]
+                path = self.root / f"{prefix}-{chain_hash(loader)}.arrow"
+                if not path.exists():
+                    self.root.mkdir(parents=True, exist_ok=True)
+                    _write_arrow(loader(*args, **kwargs), path)
+                    self._remove_superseded(prefix, path)
+                return _map_arrow(path)
+        return _freeze(loader(*args, **kwargs))
+
+    def _remove_superseded(self, prefix, current):
+        """Delete files of the same dataset written by older loader code."""
+        for stale in self.root.glob(f"{prefix}-*.arrow"):
+            if stale != current:
+                try:
+                    # Processes still mapping the file keep their pages (POSIX)
+                    stale.unlink()
+                except OSError:
+                    pass
+
+    def touch(self, session):
+        """Record a rerun of ``session`` (counts it as active)."""
+        with self._lock:
+            self._sessions[session] = time.monotonic()
+
+    def active_sessions(self, timeout=SESSION_TIMEOUT):
+        """Sessions with a rerun in the last ``timeout`` seconds."""
+        cutoff = time.monotonic() - timeout
+        with self._lock:
+            for session in [s for s, seen in self._sessions.items() if seen < cutoff]:
+                del self._sessions[session]
+            return len(self._sessions)
+
+    def session_bytes(self, state):
+        """Bytes held by a session's state beyond the shared datasets."""
+        shared = {id(handle) for handle in self._datasets.values()}
+        total = 0
+        for value in dict(state).values():
+            if id(value) in shared:
+                continue
+            if isinstance(value, AnalysisCache):
+                total += value.stats()['bytes']
+            elif isinstance(value, DatasetHandle):
+                total += entry_size(value.frame)
+            else:
+                total += entry_size(value)
+        return total
+
+    def stats(self):
+        """Shared datasets, their in-process bytes and the active session count."""
+        with self._lock:
+            handles = list(self._datasets.values())
+        return {
+            'datasets': len(handles),
+            'bytes': sum(entry_size(handle.frame) for handle in handles),
+            'sessions': self.active_sessions(),
+        }
+
+
+DATASET_STORE = DatasetStore()
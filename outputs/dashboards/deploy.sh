@@ -26,3 +26,5 @@ echo "   • streamlit run sales_dashboard.py"
 echo "   • streamlit run scientific_explorer.py"
 echo "   • streamlit run multipage_dashboard.py"
 echo "   • streamlit run optimized_dashboard.py"
+echo "📦 Optional large sales dataset:"
+echo "   • python sales_generator.py --transactions-per-day 1000"
@@ -0,0 +1,264 @@
+"""
+Persistent Arrow Cache for Dashboard Loaders
+============================================
+
+A disk tier underneath ``@st.cache_data``: loader results are written once as
+uncompressed Arrow IPC (Feather v2) files and memory-mapped back on the next
+server start or by other replicas sharing the directory, instead of every
+process regenerating its data from scratch.
+
+Entries are keyed by loader name, call arguments (with defaults applied) and
+a hash of the source of the loader and of every helper it calls from its
+directory, so editing either invalidates its entries automatically. The
+cache directory has a size cap; least-recently-used entries are evicted when a
+new entry would exceed it.
+
+Supported return values are DataFrames, and tuples/lists mixing DataFrames
+with JSON-serializable values (e.g. ``(df, feature_names, target_col)``).
+Loader arguments should be simple values with a stable ``repr``.
+
+Usage:
+    @st.cache_data          # in-process tier
+    @disk_cached            # persistent tier
+    def load_data(n_samples=10000):
+        ...
+
+    LOADER_CACHE.invalidate('load_data')   # drop one loader's entries
+    LOADER_CACHE.clear()                   # drop everything
+
+Configuration (environment variables):
+    DASHBOARD_CACHE_DIR        cache directory (default: .cache/loaders next to this file)
+    DASHBOARD_CACHE_MAX_BYTES  size cap in bytes (default: 2 GiB)
+"""
+
+import functools
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+DEFAULT_CACHE_DIR = Path(__file__).parent / ".cache" / "loaders"
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+ENTRY_FILE = "entry.json"
+
+
+def code_hash(func):
+    """Hash of a function's source (bytecode when the source is unavailable)."""
+    try:
+        source = inspect.getsource(func).encode()
+    except (OSError, TypeError):
+        source = func.__code__.co_code
+    return hashlib.sha256(source).hexdigest()[:16]
+
+
+def _referenced_names(code):
+    """Global names used by ``code`` and the lambdas/comprehensions nested in it."""
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if inspect.iscode(const):
+            names |= _referenced_names(const)
+    return names
+
+
+def chain_hash(func):
+    """Hash of a function's source and of every function it calls from its own directory.
+
+    Unlike ``code_hash`` this changes when a helper the loader calls is edited,
+    not just the loader itself.
+    """
+    try:
+        local_dir = Path(inspect.getsourcefile(inspect.unwrap(func))).resolve().parent
+    except TypeError:
+        return code_hash(func)
+    digest = hashlib.sha256()
+    seen = set()
+    pending = [func]
+    while pending:
+        current = inspect.unwrap(pending.pop())
+        if not inspect.isfunction(current) or current.__code__ in seen:
+            continue
+        seen.add(current.__code__)
+        digest.update(code_hash(current).encode())
+        for name in sorted(_referenced_names(current.__code__), reverse=True):
+            value = current.__globals__.get(name)
+            if not inspect.isfunction(value):
+                continue
+            try:
+                source_file = Path(inspect.getsourcefile(inspect.unwrap(value))).resolve()
+            except TypeError:
+                continue
+            if source_file.parent == local_dir:
+                pending.append(value)
+    return digest.hexdigest()[:16]
+
+
+def _write_frame(df, path):
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(df)
+    with pa.OSFile(str(path), 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+def _read_frame(path):
+    import pyarrow as pa
+
+    # Not closed explicitly: zero-copy columns keep referencing the mapping
+    source = pa.memory_map(str(path), 'r')
+    return pa.ipc.open_file(source).read_all().to_pandas()
+
+
+class DiskCache:
+    """Directory of Arrow-encoded loader results with LRU eviction."""
+
+    def __init__(self, root=None, max_bytes=None):
+        self.root = Path(root or os.environ.get('DASHBOARD_CACHE_DIR', DEFAULT_CACHE_DIR))
+        self.max_bytes = int(max_bytes or os.environ.get('DASHBOARD_CACHE_MAX_BYTES', DEFAULT_MAX_BYTES))
+
+    def key(self, loader_name, args, kwargs, func_hash):
+        """Entry name for one loader call."""
+        payload = repr((loader_name, func_hash, args, sorted(kwargs.items())))
+        return f"{loader_name}-{hashlib.sha256(payload.encode()).hexdigest()[:24]}"
+
+    def get(self, key):
+        """Stored value for ``key``, or ``None`` on a miss."""
+        entry_dir = self.root / key
+        entry_path = entry_dir / ENTRY_FILE
+        try:
+            entry = json.loads(entry_path.read_text())
+            value = self._decode(entry['value'], entry_dir)
+        except (OSError, ValueError, KeyError):
+            return None
+        os.utime(entry_path)  # mark as recently used
+        return value
+
+    def put(self, key, loader_name, value):
+        """Store ``value``; returns False when the value type is not supported."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_dir = Path(tempfile.mkdtemp(prefix=f".{key}-", dir=self.root))
+        try:
+            encoded = self._encode(value, tmp_dir)
+            size = sum(path.stat().st_size for path in tmp_dir.iterdir())
+            if size > self.max_bytes:
+                raise ValueError(f"Entry of {size:,} bytes exceeds the cache size cap")
+            (tmp_dir / ENTRY_FILE).write_text(json.dumps({
+                'loader': loader_name,
+                'created': time.time(),
+                'size': size,
+                'value': encoded,
+            }))
+            self._evict(reserve=size)
+            os.rename(tmp_dir, self.root / key)
+        except (TypeError, ValueError):
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return False
+        except OSError:
+            # Typically another process stored the same entry first
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return (self.root / key).exists()
+        return True
+
+    def _encode(self, value, entry_dir):
+        if isinstance(value, pd.DataFrame):
+            _write_frame(value, entry_dir / "frame_0.arrow")
+            return {'frame': "frame_0.arrow"}
+        if isinstance(value, (tuple, list)):
+            items = []
+            for i, item in enumerate(value):
+                if isinstance(item, pd.DataFrame):
+                    _write_frame(item, entry_dir / f"frame_{i}.arrow")
+                    items.append({'frame': f"frame_{i}.arrow"})
+                else:
+                    json.dumps(item)  # raises TypeError for unsupported values
+                    items.append({'json': item})
+            return {'sequence': items, 'tuple': isinstance(value, tuple)}
+        raise TypeError(f"Cannot cache values of type {type(value).__name__}")
+
+    def _decode(self, encoded, entry_dir):
+        if 'frame' in encoded:
+            return _read_frame(entry_dir / encoded['frame'])
+        if 'json' in encoded:
+            return encoded['json']
+        items = [self._decode(item, entry_dir) for item in encoded['sequence']]
+        return tuple(items) if encoded['tuple'] else items
+
+    def entries(self):
+        """Metadata of every stored entry, least recently used first."""
+        found = []
+        if not self.root.exists():
+            return found
+        for entry_path in self.root.glob(f"*/{ENTRY_FILE}"):
+            if entry_path.parent.name.startswith('.'):
+                continue
+            try:
+                entry = json.loads(entry_path.read_text())
+                last_used = entry_path.stat().st_mtime
+            except (OSError, ValueError):
+                continue
+            found.append({'key': entry_path.parent.name, 'loader': entry['loader'],
+                          'size': entry['size'], 'last_used': last_used})
+        return sorted(found, key=lambda entry: entry['last_used'])
+
+    def size(self):
+        """Total bytes held by stored entries."""
+        return sum(entry['size'] for entry in self.entries())
+
+    def _evict(self, reserve=0):
+        """Remove least-recently-used entries until ``reserve`` more bytes fit."""
+        entries = self.entries()
+        total = sum(entry['size'] for entry in entries)
+        for entry in entries:
+            if total + reserve <= self.max_bytes:
+                break
+            shutil.rmtree(self.root / entry['key'], ignore_errors=True)
+            total -= entry['size']
+
+    def invalidate(self, loader_name=None):
+        """Drop the entries of one loader (all loaders when ``None``); returns the count."""
+        removed = 0
+        for entry in self.entries():
+            if loader_name is None or entry['loader'] == loader_name:
+                shutil.rmtree(self.root / entry['key'], ignore_errors=True)
+                removed += 1
+        return removed
+
+    def clear(self):
+        """Drop every entry."""
+        return self.invalidate()
+
+
+LOADER_CACHE = DiskCache()
+
+
+def disk_cached(func=None, *, cache=None):
+    """Decorator adding the persistent tier to a loader (place under ``@st.cache_data``)."""
+    if func is None:
+        return functools.partial(disk_cached, cache=cache)
+
+    signature = inspect.signature(func)
+    loader_name = func.__name__
+    func_hash = None
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        nonlocal func_hash
+        if func_hash is None:
+            # Hashed on first call, once the helpers below the loader are defined
+            func_hash = chain_hash(func)
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        store = cache or LOADER_CACHE
+        key = store.key(loader_name, bound.args, bound.kwargs, func_hash)
+        value = store.get(key)
+        if value is None:
+            value = func(*args, **kwargs)
+            store.put(key, loader_name, value)
+        return value
+
+    return wrapper
@@ -0,0 +1,115 @@
+"""
+Time-Series Downsampling for Plotly Traces
+==========================================
+
+Reduces a sorted time series to a fixed point budget before it is turned into
+a figure, so the browser receives a few thousand points instead of every
+minute or transaction. Two modes are available:
+
+* ``'lttb'`` — Largest-Triangle-Three-Buckets, keeps the visually salient
+  shape of the line with one point per bucket.
+* ``'minmax'`` — per pixel-width bucket of the x axis, keeps the minimum and
+  maximum so spikes are never dropped.
+
+Passing ``x_range`` re-fetches full detail for a zoomed window: the window is
+binary-searched out of the sorted series first and only then downsampled.
+
+Usage:
+    trace_df = downsample(daily_sales, 'date', 'sales', max_points=2000)
+    zoomed = downsample(daily_sales, 'date', 'sales', x_range=(start, end))
+"""
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_POINT_BUDGET = 2000
+METHODS = ('lttb', 'minmax')
+
+
+def _as_float(values):
+    """Numeric view of an x/y column (datetimes become int64 nanoseconds)."""
+    values = np.asarray(values)
+    if values.dtype.kind == 'M':
+        return values.astype('datetime64[ns]').astype(np.int64).astype(float)
+    return values.astype(float)
+
+
+def lttb_indices(x, y, n_out):
+    """Indices of the points kept by Largest-Triangle-Three-Buckets."""
+    x, y = _as_float(x), _as_float(y)
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    # n_out - 2 buckets between the fixed first and last points
+    edges = (np.arange(n_out - 1) * ((n - 2) / (n_out - 2))).astype(int) + 1
+    selected = np.empty(n_out, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    anchor = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_lo = hi
+        next_hi = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_lo:next_hi].mean()
+        avg_y = y[next_lo:next_hi].mean()
+        area = np.abs((x[anchor] - avg_x) * (y[lo:hi] - y[anchor])
+                      - (x[anchor] - x[lo:hi]) * (avg_y - y[anchor]))
+        anchor = lo + int(np.argmax(area))
+        selected[i + 1] = anchor
+    return selected
+
+
+def minmax_indices(x, y, n_out):
+    """Indices of the min and max point per equal-width x bucket, within ``n_out`` points."""
+    x, y = _as_float(x), _as_float(y)
+    n = len(y)
+    if n_out >= n or n_out < 4:
+        return np.arange(n)
+    n_buckets = (n_out - 2) // 2
+    span = x[-1] - x[0]
+    if span <= 0:
+        bucket = np.zeros(n, dtype=int)
+    else:
+        bucket = np.minimum(((x - x[0]) / span * n_buckets).astype(int), n_buckets - 1)
+    # Sorting by (bucket, y): the first row of each bucket is its min, the last its max
+    order = np.lexsort((y, bucket))
+    sorted_bucket = bucket[order]
+    starts = np.flatnonzero(np.r_[True, sorted_bucket[1:] != sorted_bucket[:-1]])
+    ends = np.r_[starts[1:], n] - 1
+    keep = np.concatenate((order[starts], order[ends], [0, n - 1]))
+    return np.unique(keep)
+
+
+def downsample_indices(x, y, max_points=DEFAULT_POINT_BUDGET, method='lttb'):
+    """Dispatch to the requested downsampling method."""
+    if method == 'lttb':
+        return lttb_indices(x, y, max_points)
+    if method == 'minmax':
+        return minmax_indices(x, y, max_points)
+    raise ValueError(f"Unknown downsampling method {method!r}; expected one of {METHODS}")
+
+
+def downsample(df, x, y, max_points=DEFAULT_POINT_BUDGET, method='lttb', x_range=None):
+    """Rows of ``df`` (sorted by ``x``) to send to the browser for a line chart.
+
+    ``y`` may be a column name or a list of names; with several series the
+    budget is split between them and the union of their points is kept.
+    ``x_range`` restricts to an inclusive ``(start, end)`` window first, so a
+    zoomed view is drawn at full resolution up to the budget.
+    """
+    if x_range is not None:
+        x_values = df[x]
+        start, end = x_range
+        if x_values.dtype.kind == 'M':
+            start, end = pd.Timestamp(start), pd.Timestamp(end)
+        lo = int(x_values.searchsorted(start, side='left'))
+        hi = int(x_values.searchsorted(end, side='right'))
+        df = df.iloc[lo:hi]
+    columns = [y] if isinstance(y, str) else list(y)
+    if len(df) <= max_points:
+        return df
+    per_series = max(max_points // len(columns), 3)
+    keep = np.unique(np.concatenate([
+        downsample_indices(df[x].to_numpy(), df[column].to_numpy(), per_series, method)
+        for column in columns
+    ]))
+    return df.iloc[keep]
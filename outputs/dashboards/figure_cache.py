@@ -0,0 +1,150 @@
+"""
+Figure Cache with Compact Binary Trace Arrays
+=============================================
+
+Reruns rebuild every Plotly figure even when the aggregate behind it has not
+changed. ``cached_figure`` keys a built figure by (chart id, fingerprint of
+its input data, style parameters) in a process-wide LRU cache, so unchanged
+charts skip ``plotly.express`` construction entirely. Cache misses are timed
+as ``figure_build`` spans of the rerun instrumentation.
+
+Plotly 6 already ships numpy trace arrays as base64 typed arrays, but it
+serializes datetime arrays as ISO strings. Before a figure is cached its
+datetime x/y arrays are therefore converted to float epoch milliseconds on a
+``date`` axis, and floats can optionally be narrowed to float32.
+
+A hit returns the cached figure object itself, shared by every session:
+copying a figure costs about a third of building it. Treat returned figures
+as read-only and pass ``copy=True`` to get a private copy to modify.
+``st.plotly_chart`` serializes whatever it is given on every call (a
+pre-serialized dict would be re-validated into a figure, which is slower
+than serializing the figure), so that step is not cached here.
+
+Usage:
+    fig = cached_figure(
+        'daily_trend',
+        lambda: px.line(daily_sales, x='date', y='sales', title='Daily Sales Trend'),
+        data=(daily_sales,),
+        style={'color': '#1f77b4'},
+    )
+    st.plotly_chart(fig, use_container_width=True)
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from instrumentation import span
+
+# Trace attributes that may hold data arrays worth encoding
+ARRAY_ATTRIBUTES = ('x', 'y', 'z', 'values', 'customdata', 'marker.color', 'marker.size')
+DEFAULT_MAX_ENTRIES = 128
+
+
+def fingerprint(*parts):
+    """Stable content hash of DataFrames, Series, arrays and plain values."""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        if isinstance(part, (pd.DataFrame, pd.Series)):
+            digest.update(pd.util.hash_pandas_object(part, index=True).to_numpy().tobytes())
+            names = part.columns if isinstance(part, pd.DataFrame) else [part.name]
+            digest.update(repr(list(names)).encode())
+        elif isinstance(part, np.ndarray):
+            digest.update(np.ascontiguousarray(part).tobytes())
+            digest.update(f"{part.dtype}{part.shape}".encode())
+        else:
+            digest.update(repr(part).encode())
+        digest.update(b'|')
+    return digest.hexdigest()
+
+
+def _datetime_values(values):
+    """Array as datetime64[ns] when it holds datetimes, else None."""
+    values = np.asarray(values)
+    if values.dtype.kind == 'M':
+        return values.astype('datetime64[ns]')
+    if values.dtype == object and len(values) and pd.api.types.infer_dtype(values, skipna=True) in ('datetime64', 'datetime', 'date'):
+        return pd.to_datetime(values).to_numpy(dtype='datetime64[ns]')
+    return None
+
+
+def compact_figure(fig, float32=False):
+    """Convert datetime x/y arrays to epoch milliseconds (and floats to float32), in place."""
+    for trace in fig.data:
+        for attribute in ARRAY_ATTRIBUTES:
+            try:
+                values = trace[attribute]
+            except (KeyError, ValueError):
+                continue
+            if values is None or isinstance(values, (str, dict)) or np.ndim(values) not in (1, 2):
+                continue
+            dates = _datetime_values(values)
+            if dates is not None and dates.ndim == 1 and attribute in ('x', 'y'):
+                # plotly.js reads numbers on a date axis as epoch milliseconds
+                axis_ref = getattr(trace, f"{attribute}axis", None)
+                if axis_ref is None:
+                    continue
+                fig.layout[f"{attribute}axis{axis_ref[1:]}"].type = 'date'
+                trace[attribute] = dates.astype(np.int64) / 1e6
+                continue
+            if float32:
+                values = np.asarray(values)
+                if values.dtype.kind == 'f':
+                    trace[attribute] = values.astype(np.float32)
+    return fig
+
+
+class FigureCache:
+    """Thread-safe LRU cache of built, compacted figures (shared, read-only)."""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(self, key, build, float32=False, copy=False):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                figure = self._entries[key]
+                return go.Figure(figure) if copy else figure
+        with span('figure_build') as build_span:
+            figure = compact_figure(build(), float32=float32)
+            build_span.count('traces', len(figure.data))
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = figure
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return go.Figure(figure) if copy else figure
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+FIGURE_CACHE = FigureCache()
+
+
+def cached_figure(chart_id, build, data=(), style=None, float32=False, cache=None, copy=False):
+    """Figure for ``chart_id`` built by ``build()`` unless an identical one is cached.
+
+    ``data`` lists everything the figure is computed from (frames, arrays,
+    scalars) and ``style`` the presentation parameters; together with the
+    chart id they form the cache key. The result is shared between sessions
+    unless ``copy`` is set.
+    """
+    style_key = tuple(sorted((style or {}).items()))
+    key = (chart_id, fingerprint(*data), repr(style_key), float32)
+    return (FIGURE_CACHE if cache is None else cache).get_or_build(key, build, float32=float32, copy=copy)
@@ -0,0 +1,164 @@
+"""
+Fused Multi-Predicate Filter Engine
+===================================
+
+Evaluates a conjunction of range predicates (``lo <= column <= hi``) and
+membership predicates (``column in {...}``) over a table's columns as NumPy
+arrays, producing matching row positions without building intermediate
+DataFrames.
+
+Predicates are ordered by selectivity measured on a fixed, evenly spaced row
+sample, most selective first. Two evaluation strategies:
+
+* fused — all predicates evaluated in a single blocked pass over the columns:
+  compiled into one ``numexpr`` expression when ``numexpr`` is installed,
+  otherwise by NumPy over cache-sized row blocks, ANDing every predicate into
+  the block's mask before moving on (membership tests are a lookup table
+  indexed by category code);
+* compacting — predicates applied in selectivity order, each one only to the
+  rows that survived the previous ones, so a selective first predicate makes
+  the remaining ones nearly free.
+
+The compacting path is used when the most selective predicate is expected to
+keep at most ``COMPACT_THRESHOLD`` of the rows; otherwise the fused pass wins.
+
+Usage:
+    engine = FilterEngine(df)
+    rows = engine.rows(ranges={'feature_0': (-1.0, 1.0)}, members={'category': ['A', 'B']})
+    filtered = df.iloc[rows]
+"""
+
+import numpy as np
+import pandas as pd
+
+try:
+    import numexpr
+except ImportError:  # optional: without it the fused pass runs block-wise in NumPy
+    numexpr = None
+
+SAMPLE_SIZE = 4096
+COMPACT_THRESHOLD = 0.25
+BLOCK_ROWS = 65536   # rows per block of the NumPy fused pass (fits in L2 for a few columns)
+
+
+class FilterEngine:
+    """Column arrays of a table plus a selectivity-ordered predicate evaluator."""
+
+    def __init__(self, df, columns=None, sample_size=SAMPLE_SIZE):
+        self.n_rows = len(df)
+        self.values = {}   # numeric column -> array
+        self.codes = {}    # other columns -> (integer codes, uniques)
+        for column in (columns if columns is not None else df.columns):
+            series = df[column]
+            if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+                self.values[column] = series.to_numpy()
+            else:
+                codes, uniques = pd.factorize(series)
+                self.codes[column] = (codes, uniques)
+        step = max(self.n_rows // sample_size, 1)
+        self.sample = np.arange(0, self.n_rows, step)[:sample_size]
+        self.last_plan = None
+
+    def _predicates(self, ranges, members):
+        predicates = []
+        for column, (lo, hi) in (ranges or {}).items():
+            predicates.append(('range', column, (lo, hi)))
+        for column, wanted in (members or {}).items():
+            if column not in self.codes:
+                raise KeyError(f"No membership index for column: {column!r}")
+            _, uniques = self.codes[column]
+            wanted_codes = np.flatnonzero(pd.Index(uniques).isin(list(wanted)))
+            predicates.append(('member', column, wanted_codes))
+        return predicates
+
+    def _passes(self, predicate, positions=None):
+        """Boolean result of one predicate over ``positions`` (all rows when None)."""
+        kind, column, argument = predicate
+        if kind == 'range':
+            values = self.values[column] if positions is None else self.values[column][positions]
+            lo, hi = argument
+            return (values >= lo) & (values <= hi)
+        codes = self.codes[column][0] if positions is None else self.codes[column][0][positions]
+        return np.isin(codes, argument)
+
+    def order(self, predicates):
+        """Predicates with their sample pass rates, most selective first."""
+        rated = [(self._passes(predicate, self.sample).mean() if len(self.sample) else 1.0, predicate)
+                 for predicate in predicates]
+        rated.sort(key=lambda item: item[0])
+        return rated
+
+    def _fused_mask(self, predicates):
+        if numexpr is None:
+            return self._blocked_mask(predicates)
+        terms = []
+        local_dict = {}
+        for i, (kind, column, argument) in enumerate(predicates):
+            name = f"c{i}"
+            if kind == 'range':
+                local_dict[name] = self.values[column]
+                local_dict[f"lo{i}"], local_dict[f"hi{i}"] = argument
+                terms.append(f"(({name} >= lo{i}) & ({name} <= hi{i}))")
+            else:
+                local_dict[name] = self.codes[column][0]
+                if len(argument) == 0:
+                    return np.zeros(self.n_rows, dtype=bool)
+                terms.append("(" + " | ".join(f"({name} == {int(code)})" for code in argument) + ")")
+        return numexpr.evaluate(" & ".join(terms), local_dict=local_dict)
+
+    def _blocked_mask(self, predicates):
+        """NumPy fused pass: every predicate applied to one row block at a time."""
+        lookups = {}
+        for kind, column, argument in predicates:
+            if kind == 'member':
+                # Code -1 (missing) indexes the trailing False entry
+                allowed = np.zeros(len(self.codes[column][1]) + 1, dtype=bool)
+                allowed[argument] = True
+                lookups[column] = allowed
+        mask = np.empty(self.n_rows, dtype=bool)
+        scratch = np.empty(min(BLOCK_ROWS, self.n_rows), dtype=bool)
+        for start in range(0, self.n_rows, BLOCK_ROWS):
+            stop = min(start + BLOCK_ROWS, self.n_rows)
+            block = mask[start:stop]
+            block.fill(True)
+            test = scratch[:stop - start]
+            for kind, column, argument in predicates:
+                if kind == 'range':
+                    values = self.values[column][start:stop]
+                    lo, hi = argument
+                    np.greater_equal(values, lo, out=test)
+                    block &= test
+                    np.less_equal(values, hi, out=test)
+                    block &= test
+                else:
+                    block &= lookups[column][self.codes[column][0][start:stop]]
+        return mask
+
+    def rows(self, ranges=None, members=None):
+        """Positions of the rows satisfying every predicate, in table order."""
+        rated = self.order(self._predicates(ranges, members))
+        if not rated:
+            self.last_plan = {'strategy': 'none', 'order': []}
+            return np.arange(self.n_rows)
+        predicates = [predicate for _, predicate in rated]
+        compact = rated[0][0] <= COMPACT_THRESHOLD
+        self.last_plan = {
+            'strategy': 'compacting' if compact else 'fused',
+            'backend': 'numexpr' if numexpr is not None else 'numpy',
+            'order': [(predicate[1], rate) for rate, predicate in rated],
+        }
+        if not compact:
+            return np.flatnonzero(self._fused_mask(predicates))
+
+        positions = np.flatnonzero(self._passes(predicates[0]))
+        for predicate in predicates[1:]:
+            if len(positions) == 0:
+                break
+            positions = positions[self._passes(predicate, positions)]
+        return positions
+
+    def mask(self, ranges=None, members=None):
+        """Boolean mask form of ``rows``."""
+        mask = np.zeros(self.n_rows, dtype=bool)
+        mask[self.rows(ranges, members)] = True
+        return mask
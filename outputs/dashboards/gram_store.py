@@ -0,0 +1,180 @@
+"""
+Gram-Matrix Store for Correlations Without Row Scans
+====================================================
+
+Keeps the sufficient statistics of every feature pair per category partition:
+the row count ``n``, the column sums ``Σx`` and the Gram matrix ``Σxxᵀ``,
+along with each feature's minimum and maximum. The
+covariance or correlation matrix of any feature subset over any combination
+of partitions is then assembled from those sums in O(k²) for k features,
+without touching the raw rows; appending rows only adds their sums to the
+partitions they fall in.
+
+The same sums give the least-squares line of every feature on every other one
+per partition: ``regressions`` returns slope, intercept, r, r² and the
+slope's p-value for all (x, y, partition) combinations in one vectorized
+pass, including the identity fit of each feature on itself.
+
+The sums are accumulated around a fixed per-feature shift (the column means
+seen at build time), which keeps ``Σxxᵀ - n·x̄x̄ᵀ`` well conditioned when
+feature means are large compared to their spread.
+
+Usage:
+    store = GramStore.build(df, feature_columns, partition='category')
+    store.correlation(['feature_0', 'feature_3'], partitions=['A', 'C'])
+    store.covariance(partitions=['B'])
+    store.regressions()     # one row per (x, y, partition), plus pooled rows
+    store.ranges('feature_0')   # per-partition min/max
+    store.append(new_rows)
+"""
+
+import numpy as np
+import pandas as pd
+
+POOLED = '(all)'   # partition label of fits over every partition together
+
+
+class GramStore:
+    """Per-partition count, sums and Gram matrices of a set of features."""
+
+    def __init__(self, features, partition, shift):
+        self.features = list(features)
+        self.partition = partition
+        self.shift = np.asarray(shift, dtype=float)
+        self._positions = {feature: i for i, feature in enumerate(self.features)}
+        self.partitions = []
+        k = len(self.features)
+        self.counts = np.zeros(0)
+        self.sums = np.zeros((0, k))
+        self.grams = np.zeros((0, k, k))
+        self.minima = np.zeros((0, k))
+        self.maxima = np.zeros((0, k))
+
+    @classmethod
+    def build(cls, df, features, partition):
+        """Store over ``df`` with one set of sums per value of ``partition``."""
+        store = cls(features, partition, df[list(features)].mean().to_numpy(dtype=float))
+        store.append(df)
+        return store
+
+    def append(self, df):
+        """Add the sums of newly arrived rows to their partitions."""
+        values = df[self.features].to_numpy(dtype=float) - self.shift
+        for member, positions in df.groupby(self.partition, observed=True, sort=True).indices.items():
+            block = values[positions]
+            index = self._partition_index(member)
+            self.counts[index] += len(block)
+            self.sums[index] += block.sum(axis=0)
+            self.grams[index] += block.T @ block
+            self.minima[index] = np.minimum(self.minima[index], block.min(axis=0) + self.shift)
+            self.maxima[index] = np.maximum(self.maxima[index], block.max(axis=0) + self.shift)
+
+    def _partition_index(self, member):
+        if member not in self.partitions:
+            k = len(self.features)
+            self.partitions.append(member)
+            self.counts = np.append(self.counts, 0.0)
+            self.sums = np.vstack([self.sums, np.zeros((1, k))])
+            self.grams = np.concatenate([self.grams, np.zeros((1, k, k))])
+            self.minima = np.vstack([self.minima, np.full((1, k), np.inf)])
+            self.maxima = np.vstack([self.maxima, np.full((1, k), -np.inf)])
+        return self.partitions.index(member)
+
+    def _merged(self, features, partitions):
+        """(n, Σx, Σxxᵀ) over the selected partitions, restricted to ``features``."""
+        features = self.features if features is None else list(features)
+        columns = [self._positions[feature] for feature in features]
+        if partitions is None:
+            rows = slice(None)
+        else:
+            wanted = set(partitions)
+            rows = [i for i, member in enumerate(self.partitions) if member in wanted]
+        n = self.counts[rows].sum()
+        sums = self.sums[rows][:, columns].sum(axis=0)
+        gram = self.grams[rows][:, columns][:, :, columns].sum(axis=0)
+        return features, n, sums, gram
+
+    def count(self, partitions=None):
+        """Number of rows in the selected partitions."""
+        return int(self._merged([], partitions)[1])
+
+    def ranges(self, feature):
+        """Minimum and maximum of ``feature`` per partition."""
+        column = self._positions[feature]
+        return pd.DataFrame(
+            {'min': self.minima[:, column], 'max': self.maxima[:, column]},
+            index=pd.Index(self.partitions, name=self.partition),
+        )
+
+    def covariance(self, features=None, partitions=None, ddof=1):
+        """Covariance matrix of ``features`` over the selected partitions."""
+        features, n, sums, gram = self._merged(features, partitions)
+        if n <= ddof:
+            covariance = np.full(gram.shape, np.nan)
+        else:
+            covariance = (gram - np.outer(sums, sums) / n) / (n - ddof)
+        return pd.DataFrame(covariance, index=features, columns=features)
+
+    def correlation(self, features=None, partitions=None):
+        """Pearson correlation matrix, like ``DataFrame.corr()`` on the selected rows."""
+        covariance = self.covariance(features, partitions)
+        std = np.sqrt(np.diag(covariance.to_numpy()))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            correlation = covariance.to_numpy() / np.outer(std, std)
+        np.fill_diagonal(correlation, np.where(std > 0, 1.0, np.nan))
+        return pd.DataFrame(np.clip(correlation, -1.0, 1.0), index=covariance.index, columns=covariance.columns)
+
+    def regressions(self, features=None, pooled=True):
+        """Least-squares fit of every feature on every other one, per partition.
+
+        One row per (x, y, partition) with ``n``, ``slope``, ``intercept``,
+        ``r``, ``r2`` and the two-sided ``p_value`` of the slope; with
+        ``pooled`` also one row per pair over all partitions (partition
+        ``POOLED``). A feature against itself gets the identity fit (slope 1,
+        intercept 0, r 1).
+        """
+        from scipy import stats
+
+        features = self.features if features is None else list(features)
+        columns = [self._positions[feature] for feature in features]
+        counts = self.counts
+        sums = self.sums[:, columns]
+        grams = self.grams[:, columns][:, :, columns]
+        labels = list(self.partitions)
+        if pooled:
+            counts = np.append(counts, counts.sum())
+            sums = np.vstack([sums, sums.sum(axis=0)])
+            grams = np.concatenate([grams, grams.sum(axis=0)[None]])
+            labels.append(POOLED)
+
+        # cross[p, i, j]: centered cross-products of x = feature i and y = feature j
+        n = counts[:, None, None]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            cross = grams - sums[:, :, None] * sums[:, None, :] / n
+            squares = np.diagonal(cross, axis1=1, axis2=2)
+            slope = cross / squares[:, :, None]
+            r = np.clip(cross / np.sqrt(squares[:, :, None] * squares[:, None, :]), -1.0, 1.0)
+            dof = np.broadcast_to(n - 2, r.shape)
+            t = r * np.sqrt(dof / (1 - r ** 2))
+            p_value = np.where(dof > 0, 2 * stats.t.sf(np.abs(t), np.maximum(dof, 1)), np.nan)
+            means = sums / counts[:, None] + self.shift[columns]
+        intercept = means[:, None, :] - slope * means[:, :, None]
+        diagonal = np.arange(len(features))
+        slope[:, diagonal, diagonal] = 1.0
+        intercept[:, diagonal, diagonal] = 0.0
+        r[:, diagonal, diagonal] = 1.0
+        p_value[:, diagonal, diagonal] = np.where(counts > 2, 0.0, np.nan)[:, None]
+
+        partition, x, y = np.nonzero(np.ones((len(labels), len(features), len(features)), dtype=bool))
+        names = np.array(features, dtype=object)
+        return pd.DataFrame({
+            'x': names[x],
+            'y': names[y],
+            'partition': np.array(labels, dtype=object)[partition],
+            'n': counts[partition].astype(int),
+            'slope': slope[partition, x, y],
+            'intercept': intercept[partition, x, y],
+            'r': r[partition, x, y],
+            'r2': r[partition, x, y] ** 2,
+            'p_value': p_value[partition, x, y],
+        })
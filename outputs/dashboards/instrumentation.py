@@ -0,0 +1,299 @@
+"""
+Rerun Performance Instrumentation
+=================================
+
+Nested timing spans for dashboard reruns. Each rerun is a *run* made of spans
+(``load``, ``filter``, ``aggregate``, ``fit``, ``figure_build``,
+``serialize``, ...), which nest: a span opened inside another is recorded
+under the path ``outer/inner``. Every span records its wall time and any
+counters attached to it (rows scanned, cache hits, points drawn).
+
+With ``DASHBOARD_TRACE_MEMORY=1`` spans also record their peak traced memory
+above the level at which they started (``tracemalloc``). Tracing is off by
+default because it slows down every allocation. The tracemalloc peak counter
+is process-wide and each span resets it, so ``peak_bytes`` is only
+meaningful while a single span runs at a time: concurrent sessions or
+background speculation threads overwrite each other's peaks.
+
+Finished runs are kept in a bounded per-dashboard history, from which
+``summary`` gives p50/p90/p99 latency per span path. Runs can be exported as
+JSON lines (one object per run) and as a Prometheus textfile for
+node_exporter's textfile collector. The exported quantiles cover the recent
+history only, while ``_sum`` and ``_count`` are running totals since the
+process started, as Prometheus summaries require.
+
+Spans are tracked per thread, so concurrent Streamlit sessions do not mix
+their runs.
+
+Usage:
+    TRACER.start_run('sales_dashboard')
+    with span('load'):
+        df = load_data()
+    with span('filter', rows=len(df)) as filter_span:
+        filtered = df[mask]
+        filter_span.count('matched', len(filtered))
+    plotly_chart(fig, use_container_width=True)   # st.plotly_chart inside a 'serialize' span
+    TRACER.finish_run()
+    show_performance(st.sidebar, 'sales_dashboard')
+
+Configuration (environment variables):
+    DASHBOARD_METRICS_JSONL   append every finished run to this JSON-lines file
+    DASHBOARD_METRICS_PROM    rewrite this Prometheus textfile after every run
+    DASHBOARD_TRACE_MEMORY    set to 1 to record span peak memory with tracemalloc (default: 0)
+"""
+
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_HISTORY = 200
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+class Span:
+    """One timed stage of a run."""
+
+    def __init__(self, name, path, counters):
+        self.name = name
+        self.path = path
+        self.counters = dict(counters)
+        self.start = time.perf_counter()
+        self.duration = None
+        self.start_bytes = 0
+        self.peak_bytes = 0      # highest traced memory seen inside this span so far
+        self.peak_delta = None
+
+    def count(self, counter, value=1):
+        """Add ``value`` to one of this span's counters."""
+        self.counters[counter] = self.counters.get(counter, 0) + value
+
+    def record(self):
+        return {'name': self.name, 'path': self.path, 'seconds': self.duration,
+                'peak_bytes': self.peak_delta, 'counters': self.counters}
+
+
+class Tracer:
+    """Collects spans of the current run per thread and keeps recent runs."""
+
+    def __init__(self, history=DEFAULT_HISTORY, jsonl_path=None, prometheus_path=None, trace_memory=None):
+        self.history = history
+        self.jsonl_path = jsonl_path or os.environ.get('DASHBOARD_METRICS_JSONL')
+        self.prometheus_path = prometheus_path or os.environ.get('DASHBOARD_METRICS_PROM')
+        if trace_memory is None:
+            trace_memory = os.environ.get('DASHBOARD_TRACE_MEMORY', '0') == '1'
+        self.trace_memory = trace_memory
+        self.runs = defaultdict(lambda: deque(maxlen=self.history))
+        self.totals = defaultdict(lambda: [0.0, 0])   # (dashboard, path) -> [seconds, reruns], never evicted
+        self._local = threading.local()
+        self._lock = threading.RLock()
+
+    # Run lifecycle -----------------------------------------------------------
+
+    def start_run(self, dashboard):
+        """Begin a rerun (an unfinished previous run on this thread is dropped)."""
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self._local.run = {'dashboard': dashboard, 'started': time.time(),
+                           'start': time.perf_counter(), 'spans': []}
+        self._local.stack = []
+
+    def finish_run(self):
+        """Close the current run, store it and export it; returns its record."""
+        run = getattr(self._local, 'run', None)
+        if run is None:
+            return None
+        while self._local.stack:
+            self._close(self._local.stack[-1])
+        record = {
+            'dashboard': run['dashboard'],
+            'timestamp': run['started'],
+            'seconds': time.perf_counter() - run['start'],
+            'spans': run['spans'],
+        }
+        self._local.run = None
+        per_path = defaultdict(float, {'(rerun)': record['seconds']})
+        for span_record in record['spans']:
+            per_path[span_record['path']] += span_record['seconds']
+        with self._lock:
+            self.runs[record['dashboard']].append(record)
+            for path, seconds in per_path.items():
+                total = self.totals[(record['dashboard'], path)]
+                total[0] += seconds
+                total[1] += 1
+            if self.jsonl_path:
+                self.write_jsonl(record, self.jsonl_path)
+            if self.prometheus_path:
+                self.write_prometheus(self.prometheus_path)
+        return record
+
+    # Spans -------------------------------------------------------------------
+
+    @contextmanager
+    def span(self, name, **counters):
+        """Time a stage; no-op bookkeeping-wise when no run is active."""
+        stack = getattr(self._local, 'stack', None)
+        if stack is None or getattr(self._local, 'run', None) is None:
+            detached = Span(name, name, counters)
+            try:
+                yield detached
+            finally:
+                detached.duration = time.perf_counter() - detached.start
+            return
+        path = '/'.join([s.name for s in stack] + [name])
+        current = Span(name, path, counters)
+        if self.trace_memory and tracemalloc.is_tracing():
+            traced, peak = tracemalloc.get_traced_memory()
+            # Keep the parent's peak before resetting the shared peak counter
+            if stack:
+                stack[-1].peak_bytes = max(stack[-1].peak_bytes, peak)
+            tracemalloc.reset_peak()
+            current.start_bytes = current.peak_bytes = traced
+        stack.append(current)
+        try:
+            yield current
+        finally:
+            if stack and stack[-1] is current:
+                self._close(current)
+
+    def _close(self, current):
+        stack = self._local.stack
+        stack.pop()
+        current.duration = time.perf_counter() - current.start
+        if self.trace_memory and tracemalloc.is_tracing():
+            peak = max(current.peak_bytes, tracemalloc.get_traced_memory()[1])
+            current.peak_delta = peak - current.start_bytes
+            if stack:
+                stack[-1].peak_bytes = max(stack[-1].peak_bytes, peak)
+        self._local.run['spans'].append(current.record())
+
+    # Views and exports -------------------------------------------------------
+
+    def span_totals(self, dashboard):
+        """One row per (run, span path): summed seconds, max peak bytes, summed counters."""
+        rows = []
+        with self._lock:
+            runs = list(self.runs.get(dashboard, ()))
+        for run_id, run in enumerate(runs):
+            rows.append({'run': run_id, 'path': '(rerun)', 'seconds': run['seconds'], 'peak_bytes': np.nan})
+            for span_record in run['spans']:
+                rows.append({'run': run_id, 'path': span_record['path'], 'seconds': span_record['seconds'],
+                             'peak_bytes': span_record['peak_bytes'], **span_record['counters']})
+        if not rows:
+            return pd.DataFrame(columns=['run', 'path', 'seconds', 'peak_bytes'])
+        frame = pd.DataFrame(rows)
+        grouped = frame.groupby(['run', 'path'], sort=False)
+        # min_count keeps counters a span never reported as NaN rather than 0
+        totals = grouped.sum(min_count=1)
+        totals['peak_bytes'] = grouped['peak_bytes'].max()
+        return totals.reset_index()
+
+    def summary(self, dashboard, quantiles=QUANTILES):
+        """Latency percentiles (ms) and mean peak memory per span path over recent runs."""
+        totals = self.span_totals(dashboard)
+        if totals.empty:
+            return pd.DataFrame()
+        grouped = totals.groupby('path', sort=False)
+        summary = grouped['seconds'].quantile(list(quantiles)).unstack() * 1000
+        summary.columns = [f"p{q * 100:g} ms" for q in quantiles]
+        summary.insert(0, 'runs', grouped['run'].nunique())
+        summary['peak MB'] = grouped['peak_bytes'].mean() / 1024 ** 2
+        return summary
+
+    def write_jsonl(self, record, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open('a') as sink:
+            sink.write(json.dumps(record) + '\n')
+
+    def prometheus_text(self):
+        """All dashboards' span metrics in the Prometheus text exposition format."""
+        lines = [
+            '# HELP dashboard_span_seconds Span wall time per rerun (quantiles over recent reruns)',
+            '# TYPE dashboard_span_seconds summary',
+        ]
+        memory_lines = [
+            '# HELP dashboard_span_peak_bytes Peak traced memory above the span start, latest rerun',
+            '# TYPE dashboard_span_peak_bytes gauge',
+        ]
+        counter_lines = [
+            '# HELP dashboard_span_counter Per-span counters summed over recent reruns',
+            '# TYPE dashboard_span_counter gauge',
+        ]
+        with self._lock:
+            dashboards = list(self.runs)
+            totals_by_path = {key: tuple(total) for key, total in self.totals.items()}
+        for dashboard in dashboards:
+            totals = self.span_totals(dashboard)
+            for path, group in totals.groupby('path', sort=False):
+                labels = f'dashboard="{dashboard}",span="{path}"'
+                for q in QUANTILES:
+                    lines.append(f'dashboard_span_seconds{{{labels},quantile="{q}"}} '
+                                 f'{group["seconds"].quantile(q):.6f}')
+                seconds, count = totals_by_path[(dashboard, path)]
+                lines.append(f'dashboard_span_seconds_sum{{{labels}}} {seconds:.6f}')
+                lines.append(f'dashboard_span_seconds_count{{{labels}}} {count}')
+                latest_peak = group['peak_bytes'].iloc[-1]
+                if not pd.isna(latest_peak):
+                    memory_lines.append(f'dashboard_span_peak_bytes{{{labels}}} {int(latest_peak)}')
+                for counter in group.columns.drop(['run', 'path', 'seconds', 'peak_bytes']):
+                    if group[counter].notna().any():
+                        counter_lines.append(f'dashboard_span_counter{{{labels},counter="{counter}"}} '
+                                             f'{group[counter].sum():g}')
+        return '\n'.join(lines + memory_lines + counter_lines) + '\n'
+
+    def write_prometheus(self, path):
+        """Atomically rewrite a textfile-collector file."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + '.tmp')
+        tmp_path.write_text(self.prometheus_text())
+        os.replace(tmp_path, path)
+
+
+TRACER = Tracer()
+
+
+def span(name, **counters):
+    """Span on the shared tracer."""
+    return TRACER.span(name, **counters)
+
+
+def plotly_chart(fig, **kwargs):
+    """``st.plotly_chart`` timed as a 'serialize' span."""
+    import streamlit as st
+
+    with span('serialize', traces=len(fig.data)):
+        return st.plotly_chart(fig, **kwargs)
+
+
+def show_performance(container, dashboard, tracer=None):
+    """Expander with the latest rerun's spans and percentiles over recent reruns."""
+    tracer = tracer or TRACER
+    panel = container.expander("⏱️ Rerun Performance")
+    runs = tracer.runs.get(dashboard)
+    if not runs:
+        panel.caption("No finished reruns yet")
+        return
+    latest = runs[-1]
+    latest_spans = pd.DataFrame([
+        {'span': record['path'], 'ms': record['seconds'] * 1000,
+         'peak MB': (record['peak_bytes'] or 0) / 1024 ** 2}
+        for record in latest['spans']
+    ])
+    summary = tracer.summary(dashboard)
+    if not tracer.trace_memory:
+        latest_spans = latest_spans.drop(columns='peak MB', errors='ignore')
+        summary = summary.drop(columns='peak MB', errors='ignore')
+    panel.markdown(f"**Last rerun:** {latest['seconds'] * 1000:.0f} ms")
+    if not latest_spans.empty:
+        panel.dataframe(latest_spans.round(2), hide_index=True)
+    panel.markdown(f"**Recent reruns ({len(runs)})**")
+    panel.dataframe(summary.round(2))
@@ -6,6 +6,16 @@ import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
 
+from bitmap_index import BitmapIndex
+from compact_dtypes import COMPACT_DTYPES, compact_frame
+from disk_cache import disk_cached
+from downsample import DEFAULT_POINT_BUDGET, downsample
+from figure_cache import cached_figure
+from instrumentation import TRACER, plotly_chart, show_performance, span
+from moving_stats import MovingStats
+from scatter_layer import scatter
+from time_index import TimeIndex, sort_by_time
+
 # Configure the page
 st.set_page_config(
     page_title="Multi-Page Dashboard",
@@ -13,6 +23,7 @@ st.set_page_config(
     layout="wide",
     initial_sidebar_state="expanded"
 )
+TRACER.start_run('multipage_dashboard')
 
 # Initialize session state
 if 'page' not in st.session_state:
@@ -30,9 +41,19 @@ pages = {
 selected_page = st.sidebar.radio("Go to:", list(pages.keys()))
 st.session_state.page = pages[selected_page]
 
+# Line charts are downsampled (LTTB) to this many points before plotting
+point_budget = st.sidebar.number_input(
+    "Max Chart Points",
+    min_value=100,
+    max_value=20000,
+    value=DEFAULT_POINT_BUDGET,
+    step=100
+)
+
 # Sample data
 @st.cache_data
-def generate_sample_data():
+@disk_cached
+def generate_sample_data(compact=COMPACT_DTYPES):
     np.random.seed(42)
     dates = pd.date_range('2024-01-01', periods=365, freq='D')
     data = pd.DataFrame({
@@ -42,9 +63,25 @@ def generate_sample_data():
         'category': np.random.choice(['X', 'Y', 'Z'], 365),
         'region': np.random.choice(['North', 'South', 'East', 'West'], 365)
     })
-    return data
+    if compact:
+        data = compact_frame(data)
+    return sort_by_time(data, 'date')
+
+@st.cache_resource
+def load_sample_index():
+    """Bitmap index over the low-cardinality filter columns"""
+    return BitmapIndex(generate_sample_data(compact=COMPACT_DTYPES), ['category', 'region'])
 
-df = generate_sample_data()
+@st.cache_resource
+def load_metric_stats():
+    """Prefix sums of metric A so any moving-average window is a cheap difference"""
+    return MovingStats(generate_sample_data(compact=COMPACT_DTYPES)['metric_a'])
+
+with span('load') as load_span:
+    df = generate_sample_data(compact=COMPACT_DTYPES)
+    sample_index = load_sample_index()
+    time_index = TimeIndex(df, 'date')
+    load_span.count('rows', len(df))
 
 # Page content
 if st.session_state.page == "Overview":
@@ -66,13 +103,22 @@ if st.session_state.page == "Overview":
     col1, col2 = st.columns(2)
     
     with col1:
-        fig1 = px.line(df, x='date', y='metric_a', title='Metric A Trend')
-        st.plotly_chart(fig1, use_container_width=True)
+        overview_df = downsample(df, 'date', 'metric_a', point_budget)
+        fig1 = cached_figure(
+            'metric_a_trend',
+            lambda: px.line(overview_df, x='date', y='metric_a', title='Metric A Trend'),
+            data=(overview_df,)
+        )
+        plotly_chart(fig1, use_container_width=True)
     
     with col2:
         category_counts = df['category'].value_counts()
-        fig2 = px.pie(values=category_counts.values, names=category_counts.index, title='Category Distribution')
-        st.plotly_chart(fig2, use_container_width=True)
+        fig2 = cached_figure(
+            'category_pie',
+            lambda: px.pie(values=category_counts.values, names=category_counts.index, title='Category Distribution'),
+            data=(category_counts,)
+        )
+        plotly_chart(fig2, use_container_width=True)
 
 elif st.session_state.page == "Analytics":
     st.title("📈 Advanced Analytics")
@@ -92,53 +138,71 @@ elif st.session_state.page == "Analytics":
         default=df['category'].unique()
     )
     
-    # Filter data
-    if len(date_range) == 2:
-        filtered_df = df[
-            (df['date'] >= pd.to_datetime(date_range[0])) &
-            (df['date'] <= pd.to_datetime(date_range[1])) &
-            (df['category'].isin(selected_categories))
-        ]
-    else:
-        filtered_df = df[df['category'].isin(selected_categories)]
+    # Filter data: binary-search the date window, then filter inside it
+    with span('filter') as filter_span:
+        if len(date_range) == 2:
+            lo, hi = time_index.bounds(pd.to_datetime(date_range[0]), pd.to_datetime(date_range[1]))
+        else:
+            lo, hi = 0, len(df)
+        filtered_df = df.iloc[lo:hi][sample_index.mask_range(lo, hi, category=selected_categories)]
+        filter_span.count('matched', len(filtered_df))
     
     # Analytics content
     tab1, tab2, tab3 = st.tabs(["📊 Trends", "🔍 Correlations", "📋 Statistics"])
     
     with tab1:
-        fig = px.line(filtered_df, x='date', y=['metric_a', 'metric_b'], title='Metrics Over Time')
-        st.plotly_chart(fig, use_container_width=True)
+        trend_df = downsample(filtered_df, 'date', ['metric_a', 'metric_b'], point_budget)
+        fig = cached_figure(
+            'metrics_over_time',
+            lambda: px.line(trend_df, x='date', y=['metric_a', 'metric_b'], title='Metrics Over Time'),
+            data=(trend_df,)
+        )
+        plotly_chart(fig, use_container_width=True)
         
         # Regional analysis
-        regional_data = filtered_df.groupby(['region', 'category']).agg({
-            'metric_a': 'mean',
-            'metric_b': 'mean'
-        }).reset_index()
+        with span('aggregate'):
+            regional_data = filtered_df.groupby(['region', 'category'], observed=True).agg({
+                'metric_a': 'mean',
+                'metric_b': 'mean'
+            }).reset_index()
         
-        fig_region = px.bar(
-            regional_data, 
-            x='region', 
-            y='metric_a', 
-            color='category',
-            title='Average Metric A by Region and Category'
+        fig_region = cached_figure(
+            'regional_metric_a',
+            lambda: px.bar(
+                regional_data, 
+                x='region', 
+                y='metric_a', 
+                color='category',
+                title='Average Metric A by Region and Category'
+            ),
+            data=(regional_data,)
         )
-        st.plotly_chart(fig_region, use_container_width=True)
+        plotly_chart(fig_region, use_container_width=True)
     
     with tab2:
         # Correlation analysis
-        correlation = filtered_df[['metric_a', 'metric_b']].corr()
-        fig_corr = px.imshow(correlation, text_auto=True, title='Metric Correlation')
-        st.plotly_chart(fig_corr, use_container_width=True)
+        with span('aggregate'):
+            correlation = filtered_df[['metric_a', 'metric_b']].corr()
+        fig_corr = cached_figure(
+            'metric_correlation',
+            lambda: px.imshow(correlation, text_auto=True, title='Metric Correlation'),
+            data=(correlation,)
+        )
+        plotly_chart(fig_corr, use_container_width=True)
         
         # Scatter plot
-        fig_scatter = px.scatter(
-            filtered_df, 
-            x='metric_a', 
-            y='metric_b', 
-            color='category',
-            title='Metric A vs Metric B'
+        fig_scatter = cached_figure(
+            'metric_scatter',
+            lambda: scatter(
+                filtered_df, 
+                x='metric_a', 
+                y='metric_b', 
+                color='category',
+                title='Metric A vs Metric B'
+            ),
+            data=(filtered_df[['metric_a', 'metric_b', 'category']],)
         )
-        st.plotly_chart(fig_scatter, use_container_width=True)
+        plotly_chart(fig_scatter, use_container_width=True)
     
     with tab3:
         st.subheader("📊 Summary Statistics")
@@ -154,12 +218,13 @@ elif st.session_state.page == "Predictions":
     # Simple moving average prediction
     window = st.slider("Moving Average Window", 5, 50, 20)
     
-    df_pred = df.copy()
-    df_pred['ma_metric_a'] = df_pred['metric_a'].rolling(window=window).mean()
+    with span('aggregate'):
+        ma_metric_a = load_metric_stats().mean(window)
     
     # Simple linear extrapolation for demo
-    last_values = df_pred['metric_a'].tail(window).values
-    trend = np.polyfit(range(window), last_values, 1)
+    with span('fit'):
+        last_values = df['metric_a'].tail(window).values
+        trend = np.polyfit(range(window), last_values, 1)
     future_dates = pd.date_range(df['date'].max() + timedelta(days=1), periods=30, freq='D')
     future_values = [trend[0] * (window + i) + trend[1] for i in range(30)]
     
@@ -170,23 +235,41 @@ elif st.session_state.page == "Predictions":
         'predicted': [np.nan] * len(df) + future_values
     })
     
-    fig_pred = go.Figure()
-    fig_pred.add_trace(go.Scatter(
-        x=pred_df['date'][:len(df)],
-        y=pred_df['metric_a'][:len(df)],
-        mode='lines',
-        name='Historical',
-        line=dict(color='blue')
-    ))
-    fig_pred.add_trace(go.Scatter(
-        x=pred_df['date'][len(df):],
-        y=pred_df['predicted'][len(df):],
-        mode='lines',
-        name='Predicted',
-        line=dict(color='red', dash='dash')
-    ))
-    fig_pred.update_layout(title='Metric A: Historical vs Predicted')
-    st.plotly_chart(fig_pred, use_container_width=True)
+    history_df = downsample(df, 'date', 'metric_a', point_budget)
+    
+    def build_prediction_figure():
+        fig_pred = go.Figure()
+        fig_pred.add_trace(go.Scatter(
+            x=history_df['date'],
+            y=history_df['metric_a'],
+            mode='lines',
+            name='Historical',
+            line=dict(color='blue')
+        ))
+        fig_pred.add_trace(go.Scatter(
+            x=history_df['date'],
+            y=ma_metric_a[df.index.get_indexer(history_df.index)],
+            mode='lines',
+            name=f'{window}-Day Moving Average',
+            line=dict(color='orange')
+        ))
+        fig_pred.add_trace(go.Scatter(
+            x=pred_df['date'][len(df):],
+            y=pred_df['predicted'][len(df):],
+            mode='lines',
+            name='Predicted',
+            line=dict(color='red', dash='dash')
+        ))
+        fig_pred.update_layout(title='Metric A: Historical vs Predicted')
+        return fig_pred
+    
+    fig_pred = cached_figure(
+        'prediction',
+        build_prediction_figure,
+        data=(history_df, ma_metric_a, future_values),
+        style={'window': window}
+    )
+    plotly_chart(fig_pred, use_container_width=True)
 
 else:  # Settings
     st.title("⚙️ Dashboard Settings")
@@ -215,3 +298,7 @@ else:  # Settings
 st.sidebar.markdown("---")
 st.sidebar.markdown("**Multi-Page Dashboard** | Built with Streamlit")
 st.sidebar.markdown(f"Current time: {datetime.now().strftime('%H:%M:%S')}")
+
+# Rerun timings (shown for the finished rerun, exported when configured)
+TRACER.finish_run()
+show_performance(st.sidebar, 'multipage_dashboard')
@@ -1,13 +1,25 @@
 
+import uuid
+
 import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from sklearn.datasets import make_classification
-from sklearn.preprocessing import StandardScaler
-from sklearn.decomposition import PCA
-import time
+
+from analysis_cache import DEFAULT_MAX_BYTES, POLICIES, AnalysisCache
+from compact_dtypes import COMPACT_DTYPES, compact_frame, memory_report, precision_check
+from dataset_handle import cache_on_handles
+from dataset_store import DATASET_STORE
+from disk_cache import disk_cached
+from figure_cache import cached_figure
+from filter_engine import FilterEngine
+from instrumentation import TRACER, plotly_chart, show_performance, span
+from gram_store import GramStore
+from pca_engine import MODES as PCA_MODES, PCAEngine
+from scatter_layer import scatter
+from speculation import SPECULATOR
 
 # Configure page with performance settings
 st.set_page_config(
@@ -16,9 +28,11 @@ st.set_page_config(
     layout="wide",
     initial_sidebar_state="expanded"
 )
+TRACER.start_run('optimized_dashboard')
 
 # Performance monitoring
 @st.cache_data
+@disk_cached
 def generate_large_dataset(n_samples=10000):
     """Generate large dataset with caching"""
     X, y = make_classification(
@@ -37,37 +51,79 @@ def generate_large_dataset(n_samples=10000):
     
     return df
 
-@st.cache_data
-def compute_pca_analysis(data, n_components=2):
-    """Cached PCA computation"""
-    scaler = StandardScaler()
-    data_scaled = scaler.fit_transform(data)
-    
-    pca = PCA(n_components=n_components)
-    pca_result = pca.fit_transform(data_scaled)
-    
-    return pca_result, pca.explained_variance_ratio_
+def build_dataset(n_samples=10000, compact=COMPACT_DTYPES):
+    """Generated dataset, optionally as float32 features and categorical codes"""
+    df = generate_large_dataset(n_samples)
+    return compact_frame(df) if compact else df
+
+def load_dataset(n_samples=10000, compact=COMPACT_DTYPES):
+    """Handle on the process-wide read-only copy of the dataset, shared by every session"""
+    return DATASET_STORE.get(
+        f'load_dataset({n_samples}, compact={compact})',
+        build_dataset, n_samples, compact
+    )
 
 @st.cache_data
-def filter_data(df, selected_categories, feature_range):
-    """Cached data filtering"""
-    filtered_df = df[df['category'].isin(selected_categories)]
-    
-    # Apply feature range filtering if provided
-    if feature_range:
-        for feature, (min_val, max_val) in feature_range.items():
-            filtered_df = filtered_df[
-                (filtered_df[feature] >= min_val) & 
-                (filtered_df[feature] <= max_val)
-            ]
+def compact_dtypes_report(n_samples=10000):
+    """Per-column memory savings and PCA/correlation precision of the compact mode"""
+    df = generate_large_dataset(n_samples)
+    compact = load_dataset(n_samples, compact=True).frame
+    feature_names = [col for col in df.columns if col.startswith('feature_')]
+    return memory_report(df, compact), precision_check(df, compact, feature_names)
+
+@st.cache_resource
+def load_gram_store(n_samples=10000, compact=COMPACT_DTYPES):
+    """Per-category Gram matrices so any feature-subset correlation skips the row scan"""
+    df = load_dataset(n_samples, compact).frame
+    feature_names = [col for col in df.columns if col.startswith('feature_')]
+    return GramStore.build(df, feature_names, 'category')
+
+def run_pca(frame, n_components=2, mode='auto', columns=None):
+    """PCA projection, explained variance ratio and engine report"""
+    engine = PCAEngine(n_components=n_components, mode=mode).fit(frame, columns=columns)
+    pca_result = engine.transform(frame, columns=columns)
     
-    return filtered_df
+    return pca_result, engine.explained_variance_ratio_, engine.report
+
+@cache_on_handles
+def compute_pca_analysis(data, n_components=2, mode='auto'):
+    """Cached PCA computation, keyed on the dataset handle's fingerprint"""
+    return run_pca(data.frame, n_components, mode)
+
+def feature_correlation(filtered_df, features, categories, gram_store=None):
+    """Correlation matrix from the Gram store, or from the filtered rows without one"""
+    if gram_store is None:
+        return filtered_df[features].corr()
+    return gram_store.correlation(features, partitions=categories)
+
+@cache_on_handles(resource=True)
+def load_filter_engine(dataset):
+    """Column arrays and predicate planner shared by every filter of a dataset"""
+    return FilterEngine(dataset.frame)
+
+@cache_on_handles
+def feature_bounds(dataset):
+    """Min/max of every feature, for the range sliders"""
+    features = dataset.frame.filter(like='feature_')
+    return {feature: (float(low), float(high))
+            for feature, low, high in zip(features.columns, features.min(), features.max())}
+
+@cache_on_handles
+def filter_rows(dataset, selected_categories, feature_range):
+    """Cached data filtering, returning the positions of matching rows and the filter plan"""
+    engine = load_filter_engine(dataset)
+    rows = engine.rows(ranges=feature_range, members={'category': selected_categories})
+    return rows, engine.last_plan
 
 # Initialize session state
 if 'data_loaded' not in st.session_state:
     st.session_state.data_loaded = False
 if 'analysis_cache' not in st.session_state:
-    st.session_state.analysis_cache = {}
+    st.session_state.analysis_cache = AnalysisCache()
+if 'session_id' not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
+analysis_cache = st.session_state.analysis_cache
+session_id = st.session_state.session_id
 
 # Title and description
 st.title("⚡ High-Performance Dashboard")
@@ -76,18 +132,29 @@ st.markdown("**Demonstration of optimized Streamlit techniques for large dataset
 # Performance metrics in sidebar
 st.sidebar.header("📊 Performance Metrics")
 
-# Data loading with progress
-if not st.session_state.data_loaded:
+# Memory mode: float32 features, categorical codes, smallest integer targets
+compact_mode = st.sidebar.toggle(
+    "Compact dtypes (float32)",
+    value=COMPACT_DTYPES,
+    key="compact_mode"
+)
+
+# Data loading with progress (reloaded when the memory mode changes)
+if not st.session_state.data_loaded or st.session_state.dataset_compact != compact_mode:
     with st.spinner("Loading dataset..."):
-        start_time = time.time()
-        df = generate_large_dataset(10000)
-        load_time = time.time() - start_time
+        with span('load') as load_span:
+            # The session keeps a handle on the shared copy, not a copy of its own
+            dataset = load_dataset(10000, compact_mode)
+            load_span.count('rows', len(dataset))
         st.session_state.data_loaded = True
-        st.session_state.df = df
-        st.sidebar.success(f"Data loaded in {load_time:.2f}s")
+        st.session_state.dataset = dataset
+        st.session_state.dataset_compact = compact_mode
+        st.sidebar.success(f"Data loaded in {load_span.duration:.2f}s")
 else:
-    df = st.session_state.df
+    dataset = st.session_state.dataset
     st.sidebar.info("Data loaded from cache")
+df = dataset.frame
+DATASET_STORE.touch(session_id)
 
 # Sidebar controls
 st.sidebar.header("🔧 Controls")
@@ -109,6 +176,22 @@ selected_features = st.sidebar.multiselect(
     key="feature_selection"
 )
 
+# Range filters for the selected features (only narrowed ranges become predicates)
+bounds = feature_bounds(dataset)
+feature_range = {}
+with st.sidebar.expander("🎚️ Feature Ranges"):
+    for feature in selected_features:
+        col_min, col_max = bounds[feature]
+        low, high = st.slider(
+            feature,
+            min_value=col_min,
+            max_value=col_max,
+            value=(col_min, col_max),
+            key=f"range_{feature}"
+        )
+        if low > col_min or high < col_max:
+            feature_range[feature] = (low, high)
+
 # Analysis type
 analysis_type = st.sidebar.selectbox(
     "Analysis Type",
@@ -116,18 +199,69 @@ analysis_type = st.sidebar.selectbox(
     key="analysis_type"
 )
 
-# Only filter data when selections change
-filter_key = f"{tuple(selected_categories)}_{tuple(selected_features)}"
-if filter_key not in st.session_state.analysis_cache:
+# PCA solver (auto picks exact / randomized / incremental by table size)
+pca_mode = st.sidebar.selectbox(
+    "PCA Mode",
+    PCA_MODES,
+    format_func=str.title,
+    key="pca_mode"
+)
+
+# Analysis cache budget and eviction
+st.sidebar.header("🗄️ Analysis Cache")
+cache_budget_mb = st.sidebar.number_input(
+    "Memory Budget (MB)",
+    min_value=1,
+    max_value=4096,
+    value=DEFAULT_MAX_BYTES // 1024 ** 2,
+    key="cache_budget"
+)
+cache_policy = st.sidebar.selectbox(
+    "Eviction Policy",
+    POLICIES,
+    format_func=str.upper,
+    key="cache_policy"
+)
+cache_ttl = st.sidebar.number_input(
+    "Entry TTL (seconds, 0 = never expire)",
+    min_value=0,
+    value=0,
+    step=60,
+    key="cache_ttl"
+)
+analysis_cache.configure(cache_budget_mb * 1024 ** 2, cache_policy, cache_ttl or None)
+
+# Background precompute of the analyses likely to be opened next
+speculate = st.sidebar.toggle(
+    "Precompute likely next analyses",
+    value=True,
+    key="speculate"
+)
+
+def selection_key(features):
+    """Cache key of the filtered rows for a feature selection under the current filters"""
+    return f"{compact_mode}_{tuple(selected_categories)}_{tuple(features)}_{tuple(sorted(feature_range.items()))}"
+
+# Only filter data when selections change; the cache keeps row positions, not copies
+filter_key = selection_key(selected_features)
+
+# Speculative jobs for a previous selection are stale: stop them before working on this one
+if speculate:
+    SPECULATOR.retarget(session_id, f"{filter_key}_{pca_mode}")
+else:
+    SPECULATOR.cancel(session_id)
+filtered_rows = analysis_cache.get(filter_key)
+if filtered_rows is None:
     with st.spinner("Filtering data..."):
-        start_time = time.time()
-        filtered_df = filter_data(df, selected_categories, None)
-        filter_time = time.time() - start_time
-        st.session_state.analysis_cache[filter_key] = filtered_df
-        st.sidebar.info(f"Filter time: {filter_time:.3f}s")
+        with span('filter') as filter_span:
+            filtered_rows, filter_plan = filter_rows(dataset, selected_categories, feature_range)
+            filter_span.count('matched', len(filtered_rows))
+        analysis_cache.put(filter_key, filtered_rows)
+        st.sidebar.info(f"Filter time: {filter_span.duration:.3f}s ({filter_plan['strategy']})")
 else:
-    filtered_df = st.session_state.analysis_cache[filter_key]
     st.sidebar.info("Filtered data from cache")
+# A selection of every row uses the shared frame itself instead of a copy
+filtered_df = df if len(filtered_rows) == len(df) else df.iloc[filtered_rows]
 
 # Display metrics
 col1, col2, col3, col4 = st.columns(4)
@@ -138,7 +272,7 @@ with col2:
 with col3:
     st.metric("Selected Features", len(selected_features))
 with col4:
-    st.metric("Cache Entries", len(st.session_state.analysis_cache))
+    st.metric("Cache Entries", len(analysis_cache))
 
 # Main content based on analysis type
 if analysis_type == "Overview":
@@ -150,43 +284,81 @@ if analysis_type == "Overview":
     with col1:
         # Category distribution
         category_counts = filtered_df['category'].value_counts()
-        fig_pie = px.pie(
-            values=category_counts.values,
-            names=category_counts.index,
-            title="Category Distribution"
+        fig_pie = cached_figure(
+            'category_pie',
+            lambda: px.pie(
+                values=category_counts.values,
+                names=category_counts.index,
+                title="Category Distribution"
+            ),
+            data=(category_counts,)
         )
-        st.plotly_chart(fig_pie, use_container_width=True, key="category_pie")
+        plotly_chart(fig_pie, use_container_width=True, key="category_pie")
     
     with col2:
         # Target distribution
         target_counts = filtered_df['target'].value_counts()
-        fig_bar = px.bar(
-            x=target_counts.index,
-            y=target_counts.values,
-            title="Target Distribution"
+        fig_bar = cached_figure(
+            'target_bar',
+            lambda: px.bar(
+                x=target_counts.index,
+                y=target_counts.values,
+                title="Target Distribution"
+            ),
+            data=(target_counts,)
         )
-        st.plotly_chart(fig_bar, use_container_width=True, key="target_bar")
+        plotly_chart(fig_bar, use_container_width=True, key="target_bar")
+    
+    # Memory footprint of the compact dtypes mode and its effect on results
+    with st.expander("💾 Compact Dtypes Memory Report", expanded=compact_mode):
+        column_report, precision_report = compact_dtypes_report(len(df))
+        total = column_report.loc['Total']
+        st.metric(
+            "Dataset Memory",
+            f"{total['compact MB']:.2f} MB compact",
+            delta=f"-{total['saved %']:.0f}% vs {total['MB']:.2f} MB full precision"
+        )
+        st.dataframe(column_report.round(3), use_container_width=True)
+        st.markdown("**Precision check** (compact vs full precision, all features)")
+        st.dataframe(precision_report, use_container_width=True)
 
 elif analysis_type == "PCA Analysis":
     if len(selected_features) >= 2:
         st.subheader("🎯 Principal Component Analysis")
         
         # Cached PCA computation
-        pca_key = f"pca_{filter_key}_{tuple(selected_features)}"
-        if pca_key not in st.session_state.analysis_cache:
+        pca_key = f"pca_{filter_key}_{tuple(selected_features)}_{pca_mode}"
+        cached_pca = analysis_cache.get(pca_key)
+        if cached_pca is None and SPECULATOR.claim(session_id, pca_key):
+            cached_pca = analysis_cache.get(pca_key)
+        if cached_pca is None:
             with st.spinner("Computing PCA..."):
-                start_time = time.time()
-                pca_result, variance_ratio = compute_pca_analysis(
-                    filtered_df[selected_features], 
-                    n_components=min(3, len(selected_features))
-                )
-                pca_time = time.time() - start_time
-                st.session_state.analysis_cache[pca_key] = (pca_result, variance_ratio)
-                st.sidebar.info(f"PCA time: {pca_time:.3f}s")
+                with span('fit') as fit_span:
+                    pca_input = dataset.derive(
+                        ('pca_input', filter_key),
+                        filtered_df[selected_features]
+                    )
+                    pca_result, variance_ratio, pca_report = compute_pca_analysis(
+                        pca_input, 
+                        n_components=min(3, len(selected_features)),
+                        mode=pca_mode
+                    )
+                    fit_span.count('rows', len(pca_result))
+                analysis_cache.put(pca_key, (pca_result, variance_ratio, pca_report))
+                st.sidebar.info(f"PCA time: {fit_span.duration:.3f}s")
         else:
-            pca_result, variance_ratio = st.session_state.analysis_cache[pca_key]
+            pca_result, variance_ratio, pca_report = cached_pca
             st.sidebar.info("PCA from cache")
         
+        pca_memory = (
+            f", peak memory {pca_report['peak_bytes'] / 1024 ** 2:.1f} MB"
+            if pca_report['peak_bytes'] is not None else ""
+        )
+        st.caption(
+            f"{pca_report['mode'].title()} PCA on {pca_report['rows']:,} × {pca_report['features']} "
+            f"in {pca_report['seconds']:.3f}s{pca_memory}"
+        )
+        
         # Explained variance
         col1, col2 = st.columns(2)
         
@@ -195,13 +367,17 @@ elif analysis_type == "PCA Analysis":
                 'Component': [f'PC{i+1}' for i in range(len(variance_ratio))],
                 'Explained_Variance': variance_ratio
             })
-            fig_var = px.bar(
-                variance_df,
-                x='Component',
-                y='Explained_Variance',
-                title='Explained Variance by Component'
+            fig_var = cached_figure(
+                'explained_variance',
+                lambda: px.bar(
+                    variance_df,
+                    x='Component',
+                    y='Explained_Variance',
+                    title='Explained Variance by Component'
+                ),
+                data=(variance_df,)
             )
-            st.plotly_chart(fig_var, use_container_width=True)
+            plotly_chart(fig_var, use_container_width=True)
         
         with col2:
             # PCA scatter plot
@@ -209,15 +385,19 @@ elif analysis_type == "PCA Analysis":
             pca_df['category'] = filtered_df['category'].values
             pca_df['target'] = filtered_df['target'].values
             
-            fig_pca = px.scatter(
-                pca_df,
-                x='PC1',
-                y='PC2',
-                color='category',
-                symbol='target',
-                title='PCA Visualization'
+            fig_pca = cached_figure(
+                'pca_scatter',
+                lambda: scatter(
+                    pca_df,
+                    x='PC1',
+                    y='PC2',
+                    color='category',
+                    symbol='target',
+                    title='PCA Visualization'
+                ),
+                data=(pca_df,)
             )
-            st.plotly_chart(fig_pca, use_container_width=True)
+            plotly_chart(fig_pca, use_container_width=True)
     else:
         st.warning("Please select at least 2 features for PCA analysis")
 
@@ -227,35 +407,96 @@ else:  # Feature Correlation
         
         # Cached correlation computation
         corr_key = f"corr_{filter_key}_{tuple(selected_features)}"
-        if corr_key not in st.session_state.analysis_cache:
+        correlation_matrix = analysis_cache.get(corr_key)
+        if correlation_matrix is None and SPECULATOR.claim(session_id, corr_key):
+            correlation_matrix = analysis_cache.get(corr_key)
+        if correlation_matrix is None:
             with st.spinner("Computing correlations..."):
-                start_time = time.time()
-                correlation_matrix = filtered_df[selected_features].corr()
-                corr_time = time.time() - start_time
-                st.session_state.analysis_cache[corr_key] = correlation_matrix
-                st.sidebar.info(f"Correlation time: {corr_time:.3f}s")
+                with span('aggregate') as corr_span:
+                    # Range predicates cut across categories, so the Gram store cannot serve them
+                    gram_store = None if feature_range else load_gram_store(len(df), compact_mode)
+                    correlation_matrix = feature_correlation(
+                        filtered_df, selected_features, selected_categories, gram_store
+                    )
+                analysis_cache.put(corr_key, correlation_matrix)
+                st.sidebar.info(f"Correlation time: {corr_span.duration:.3f}s")
         else:
-            correlation_matrix = st.session_state.analysis_cache[corr_key]
             st.sidebar.info("Correlation from cache")
         
         # Correlation heatmap
-        fig_corr = px.imshow(
-            correlation_matrix,
-            text_auto=True,
-            aspect="auto",
-            title="Feature Correlation Matrix"
+        fig_corr = cached_figure(
+            'feature_correlation',
+            lambda: px.imshow(
+                correlation_matrix,
+                text_auto=True,
+                aspect="auto",
+                title="Feature Correlation Matrix"
+            ),
+            data=(correlation_matrix,)
         )
-        st.plotly_chart(fig_corr, use_container_width=True)
+        plotly_chart(fig_corr, use_container_width=True)
     else:
         st.warning("Please select at least 2 features for correlation analysis")
 
+# While the user reads this view, precompute PCA and correlation for the current
+# selection and for its neighbours with one more feature (same rows: the added
+# feature has its full range)
+if speculate and len(selected_features) >= 2:
+    gram_store = None if feature_range else load_gram_store(len(df), compact_mode)
+    unselected = [col for col in feature_columns if col not in selected_features]
+    jobs = []
+    for features in [selected_features] + [selected_features + [col] for col in unselected[:2]]:
+        key = selection_key(features)
+        jobs.append((
+            f"pca_{key}_{tuple(features)}_{pca_mode}",
+            run_pca,
+            (filtered_df, min(3, len(features)), pca_mode, features)
+        ))
+        jobs.append((
+            f"corr_{key}_{tuple(features)}",
+            feature_correlation,
+            (filtered_df, features, selected_categories, gram_store)
+        ))
+    SPECULATOR.schedule(session_id, f"{filter_key}_{pca_mode}", analysis_cache, jobs)
+
 # Performance summary
 st.sidebar.markdown("---")
 st.sidebar.subheader("⚡ Performance Summary")
-st.sidebar.info(f"Cache size: {len(st.session_state.analysis_cache)} entries")
+cache_stats = analysis_cache.stats()
+st.sidebar.info(
+    f"Cache size: {cache_stats['entries']} entries, "
+    f"{cache_stats['bytes'] / 1024 ** 2:.2f} / {cache_stats['max_bytes'] / 1024 ** 2:.0f} MB"
+)
+st.sidebar.info(
+    f"Hits: {cache_stats['hits']} | Misses: {cache_stats['misses']} "
+    f"({cache_stats['hit_rate']:.0%} hit rate)"
+)
+st.sidebar.info(f"Evictions: {cache_stats['evictions']} | Expired: {cache_stats['expirations']}")
+speculation_stats = SPECULATOR.stats(session_id)
+st.sidebar.info(
+    f"Precomputed: {speculation_stats['completed']} | Pending: {speculation_stats['pending']} | "
+    f"Cancelled: {speculation_stats['cancelled'] + speculation_stats['discarded']}"
+)
 st.sidebar.info(f"Total records: {len(df):,}")
 
+# Shared datasets are split across active sessions; the rest is this session's own
+store_stats = DATASET_STORE.stats()
+private_bytes = DATASET_STORE.session_bytes(st.session_state)
+st.sidebar.metric(
+    "Memory per Session",
+    f"{(private_bytes + store_stats['bytes'] / max(store_stats['sessions'], 1)) / 1024 ** 2:.2f} MB",
+    help="This session's private state plus its share of the shared datasets"
+)
+st.sidebar.info(
+    f"Shared datasets: {store_stats['bytes'] / 1024 ** 2:.1f} MB across "
+    f"{store_stats['sessions']} active sessions | Private: {private_bytes / 1024 ** 2:.2f} MB"
+)
+
 # Clear cache button
 if st.sidebar.button("Clear Cache"):
-    st.session_state.analysis_cache.clear()
+    analysis_cache.clear()
     st.sidebar.success("Cache cleared!")
+
+# Rerun timings (shown for the finished rerun, exported when configured)
+TRACER.finish_run()
+show_performance(st.sidebar, 'optimized_dashboard')
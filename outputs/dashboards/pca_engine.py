@@ -0,0 +1,233 @@
+"""
+PCA Engine with Exact, Randomized and Out-of-Core Modes
+=======================================================
+
+Standardize-then-PCA for feature tables of any size:
+
+* ``'exact'`` — full SVD, for tables that comfortably fit in memory;
+* ``'randomized'`` — randomized SVD (Halko et al.), much faster when only a
+  few components of a large in-memory table are needed;
+* ``'incremental'`` — ``IncrementalPCA`` fed batch by batch, streaming the
+  rows from a Parquet file when given a path, so memory stays bounded by the
+  batch size.
+
+``mode='auto'`` picks one from the table size. The fitted engine keeps the
+standardization and components, so new rows are projected with ``transform``
+without refitting. Every fit records its mode and duration in ``report``,
+plus the peak traced memory of its ``pca_fit`` span when it runs inside a
+rerun with memory tracing on (``None`` otherwise).
+
+``PCADecomposition`` fits every component once and serves any smaller number
+of components by slicing: the leading ``n`` components, scores and variance
+ratios of a full decomposition are exactly those of an ``n``-component PCA.
+
+Usage:
+    engine = PCAEngine(n_components=3).fit(df[features])
+    engine.transform(new_rows[features])
+    engine.report   # {'mode': 'exact', 'rows': 10000, 'seconds': 0.01, 'peak_bytes': ...}
+
+    engine = PCAEngine(n_components=3, mode='incremental').fit('data/features.parquet', columns=features)
+
+    decomposition = PCADecomposition.fit(df, columns=features)
+    decomposition.scores(2), decomposition.explained_variance_ratio(5)
+"""
+
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.decomposition import PCA, IncrementalPCA
+
+from instrumentation import span
+
+MODES = ('auto', 'exact', 'randomized', 'incremental')
+EXACT_MAX_CELLS = 5_000_000          # rows x features
+RANDOMIZED_MAX_CELLS = 200_000_000
+DEFAULT_BATCH_SIZE = 50_000
+
+
+def _is_path(source):
+    return isinstance(source, (str, Path))
+
+
+def source_shape(source, columns=None):
+    """(rows, features) of a frame, array or Parquet file without loading it."""
+    if _is_path(source):
+        import pyarrow.parquet as pq
+
+        metadata = pq.ParquetFile(source).metadata
+        n_features = len(columns) if columns is not None else metadata.num_columns
+        return metadata.num_rows, n_features
+    if isinstance(source, pd.DataFrame) and columns is not None:
+        return len(source), len(columns)
+    return np.shape(source)
+
+
+def iter_batches(source, columns=None, batch_size=DEFAULT_BATCH_SIZE):
+    """Yield float64 row batches from a frame, an array or a Parquet file."""
+    if _is_path(source):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(source).iter_batches(batch_size=batch_size, columns=columns):
+            yield batch.to_pandas().to_numpy(dtype=float)
+        return
+    if isinstance(source, pd.DataFrame):
+        source = source[columns] if columns is not None else source
+    for start in range(0, len(source), batch_size):
+        chunk = source[start:start + batch_size]
+        yield np.asarray(chunk, dtype=float)
+
+
+def choose_mode(n_rows, n_features):
+    """Mode ``'auto'`` resolves to for a table of the given shape."""
+    cells = n_rows * n_features
+    if cells <= EXACT_MAX_CELLS:
+        return 'exact'
+    if cells <= RANDOMIZED_MAX_CELLS:
+        return 'randomized'
+    return 'incremental'
+
+
+class PCAEngine:
+    """Standardization plus PCA, fitted in one of three modes."""
+
+    def __init__(self, n_components=2, mode='auto', batch_size=DEFAULT_BATCH_SIZE, random_state=42):
+        if mode not in MODES:
+            raise ValueError(f"Unknown PCA mode: {mode!r} (expected one of {MODES})")
+        self.n_components = n_components
+        self.mode = mode
+        self.batch_size = batch_size
+        self.random_state = random_state
+        self.mean_ = None
+        self.scale_ = None
+        self.model = None
+        self.report = {}
+
+    def fit(self, source, columns=None):
+        """Fit on a DataFrame, an array, or a Parquet path (``columns`` selects features)."""
+        n_rows, n_features = source_shape(source, columns)
+        mode = choose_mode(n_rows, n_features) if self.mode == 'auto' else self.mode
+
+        start_time = time.perf_counter()
+        with span('pca_fit', rows=int(n_rows)) as fit_span:
+            if mode == 'incremental':
+                self._fit_incremental(source, columns)
+            else:
+                self._fit_in_memory(self._load(source, columns), mode)
+
+        self.report = {
+            'mode': mode,
+            'rows': int(n_rows),
+            'features': int(n_features),
+            'seconds': time.perf_counter() - start_time,
+            'peak_bytes': fit_span.peak_delta,
+        }
+        return self
+
+    def _load(self, source, columns):
+        if _is_path(source):
+            import pyarrow.parquet as pq
+
+            return pq.read_table(source, columns=columns).to_pandas().to_numpy(dtype=float)
+        if isinstance(source, pd.DataFrame) and columns is not None:
+            source = source[columns]
+        return np.asarray(source, dtype=float)
+
+    def _set_scaling(self, mean, variance):
+        self.mean_ = mean
+        scale = np.sqrt(variance)
+        # Constant columns are left unscaled, as StandardScaler does
+        self.scale_ = np.where(scale > 0, scale, 1.0)
+
+    def _fit_in_memory(self, X, mode):
+        self._set_scaling(X.mean(axis=0), X.var(axis=0))
+        solver = 'full' if mode == 'exact' else 'randomized'
+        self.model = PCA(n_components=self.n_components, svd_solver=solver, random_state=self.random_state)
+        self.model.fit((X - self.mean_) / self.scale_)
+
+    def _fit_incremental(self, source, columns):
+        # Pass 1: column means and variances, merged batch by batch (Chan et al.)
+        count, mean, m2 = 0, 0.0, 0.0
+        for batch in iter_batches(source, columns, self.batch_size):
+            batch_count = len(batch)
+            batch_mean = batch.mean(axis=0)
+            batch_m2 = ((batch - batch_mean) ** 2).sum(axis=0)
+            delta = batch_mean - mean
+            total = count + batch_count
+            mean = mean + delta * batch_count / total
+            m2 = m2 + batch_m2 + delta ** 2 * count * batch_count / total
+            count = total
+        self._set_scaling(mean, m2 / count)
+
+        # Pass 2: partial fits on standardized batches
+        # (each batch is held back one step so a short final batch can join the one before it,
+        # as partial_fit needs at least n_components rows)
+        self.model = IncrementalPCA(n_components=self.n_components)
+        pending = None
+        for batch in iter_batches(source, columns, self.batch_size):
+            batch = (batch - self.mean_) / self.scale_
+            if pending is None:
+                pending = batch
+            elif len(batch) < self.n_components:
+                pending = np.vstack([pending, batch])
+            else:
+                self.model.partial_fit(pending)
+                pending = batch
+        self.model.partial_fit(pending)
+
+    @property
+    def explained_variance_ratio_(self):
+        return self.model.explained_variance_ratio_
+
+    @property
+    def components_(self):
+        return self.model.components_
+
+    def transform(self, source, columns=None):
+        """Project rows onto the fitted components (streamed batch-wise for paths)."""
+        if self.model is None:
+            raise RuntimeError("PCAEngine.transform called before fit")
+        projected = [
+            ((batch - self.mean_) / self.scale_ - self.model.mean_) @ self.model.components_.T
+            for batch in iter_batches(source, columns, self.batch_size)
+        ]
+        if not projected:
+            return np.empty((0, self.model.n_components_))
+        return np.vstack(projected)
+
+    def fit_transform(self, source, columns=None):
+        return self.fit(source, columns).transform(source, columns)
+
+
+class PCADecomposition:
+    """All principal components of a table, computed once; smaller PCAs are slices of it."""
+
+    def __init__(self, engine, scores):
+        self.engine = engine
+        self._scores = scores
+        self.n_components = scores.shape[1]
+
+    @classmethod
+    def fit(cls, source, columns=None, mode='auto', batch_size=DEFAULT_BATCH_SIZE):
+        engine = PCAEngine(n_components=None, mode=mode, batch_size=batch_size).fit(source, columns)
+        return cls(engine, engine.transform(source, columns))
+
+    def _check(self, n_components):
+        if not 1 <= n_components <= self.n_components:
+            raise ValueError(f"n_components must be between 1 and {self.n_components}, got {n_components}")
+        return n_components
+
+    def scores(self, n_components):
+        """Scores on the leading components (a view, not a copy)."""
+        return self._scores[:, :self._check(n_components)]
+
+    def explained_variance_ratio(self, n_components):
+        return self.engine.explained_variance_ratio_[:self._check(n_components)]
+
+    def components(self, n_components):
+        return self.engine.components_[:self._check(n_components)]
+
+    @property
+    def report(self):
+        return self.engine.report
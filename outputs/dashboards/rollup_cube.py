@@ -0,0 +1,112 @@
+"""
+Rollup Cube for Dashboard Aggregates
+====================================
+
+Pre-aggregates a transaction table once into one cell per combination of
+dimension values (sum, count, sum of squares and max of the measure), so
+that KPI cards, group-by charts and summary tables can be answered from the
+cells instead of rescanning raw rows on every Streamlit rerun.
+
+Usage:
+    cube = RollupCube.build(df, dimensions=SALES_DIMENSIONS, measure='sales')
+    view = cube.select(date_range=(start, end), region=['North'])
+    view.totals()           # {'sum': ..., 'count': ..., 'mean': ..., 'std': ..., 'max': ...}
+    view.rollup('product')  # one row per product with sum/count/mean/std/max
+"""
+
+import numpy as np
+import pandas as pd
+
+from time_index import date_bounds
+
+SALES_DIMENSIONS = ('date', 'region', 'product', 'sales_rep')
+
+
+def _finalize(stats):
+    """Derive mean and sample std (ddof=1, like pandas) from additive cell statistics."""
+    count = stats['count'].to_numpy(dtype=float)
+    total = stats['sum'].to_numpy(dtype=float)
+    sumsq = stats['sumsq'].to_numpy(dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = total / count
+        variance = np.maximum(sumsq - total * mean, 0.0) / (count - 1)
+    stats['mean'] = mean
+    stats['std'] = np.where(count > 1, np.sqrt(variance), np.nan)
+    return stats
+
+
+class RollupCube:
+    """Additive per-cell statistics of one measure over a set of dimensions."""
+
+    def __init__(self, cells, dimensions, measure):
+        self.cells = cells
+        self.dimensions = tuple(dimensions)
+        self.measure = measure
+
+    @classmethod
+    def build(cls, df, dimensions=SALES_DIMENSIONS, measure='sales'):
+        """Aggregate raw rows into cube cells (one pass over the data)."""
+        values = df[measure].to_numpy(dtype=float)
+        work = df[list(dimensions)].copy()
+        work['_value'] = values
+        work['_square'] = values * values
+        cells = (
+            work.groupby(list(dimensions), observed=True, sort=True)
+            .agg(sum=('_value', 'sum'), count=('_value', 'size'),
+                 sumsq=('_square', 'sum'), max=('_value', 'max'))
+            .reset_index()
+        )
+        return cls(cells, dimensions, measure)
+
+    def __len__(self):
+        return len(self.cells)
+
+    def select(self, date_range=None, **members):
+        """Restrict the cube to a date range and/or dimension members.
+
+        ``date_range`` is an inclusive ``(start, end)`` pair applied to the
+        ``date`` dimension; each keyword maps a dimension to the values to
+        keep (``None`` keeps every value).
+        """
+        cells = self.cells
+        if date_range is not None:
+            if self.dimensions[0] != 'date':
+                raise ValueError("date_range requires 'date' as the leading cube dimension")
+            # Cells are sorted with date as the leading key: binary-search the range
+            lo, hi = date_bounds(cells['date'], *date_range)
+            cells = cells.iloc[lo:hi]
+        mask = np.ones(len(cells), dtype=bool)
+        for dimension, values in members.items():
+            if dimension not in self.dimensions:
+                raise KeyError(f"Unknown cube dimension: {dimension!r}")
+            if values is not None:
+                mask &= cells[dimension].isin(list(values)).to_numpy()
+        return RollupCube(cells[mask], self.dimensions, self.measure)
+
+    def totals(self):
+        """Grand totals over all selected cells."""
+        cells = self.cells
+        stats = pd.DataFrame({
+            'sum': [cells['sum'].sum()],
+            'count': [cells['count'].sum()],
+            'sumsq': [cells['sumsq'].sum()],
+            'max': [cells['max'].max() if len(cells) else np.nan],
+        })
+        return _finalize(stats).drop(columns='sumsq').iloc[0].to_dict()
+
+    def rollup(self, *by):
+        """Collapse the selected cells onto ``by`` dimensions.
+
+        Returns one row per group with ``sum``, ``count``, ``mean``, ``std``
+        and ``max`` columns, sorted by the group keys.
+        """
+        unknown = [dimension for dimension in by if dimension not in self.dimensions]
+        if unknown:
+            raise KeyError(f"Unknown cube dimension(s): {unknown}")
+        stats = (
+            self.cells.groupby(list(by), observed=True, sort=True)
+            .agg(sum=('sum', 'sum'), count=('count', 'sum'),
+                 sumsq=('sumsq', 'sum'), max=('max', 'max'))
+            .reset_index()
+        )
+        return _finalize(stats).drop(columns='sumsq')
@@ -1,4 +1,7 @@
 
+import os
+from pathlib import Path
+
 import streamlit as st
 import pandas as pd
 import numpy as np
@@ -7,6 +10,19 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 from datetime import datetime, timedelta
 
+from bitmap_index import BitmapIndex
+from compact_dtypes import COMPACT_DTYPES, compact_frame
+from disk_cache import disk_cached
+from downsample import DEFAULT_POINT_BUDGET, downsample
+from figure_cache import cached_figure
+from instrumentation import TRACER, plotly_chart, show_performance, span
+from moving_stats import MovingStats
+from rollup_cube import RollupCube
+from sales_generator import DEFAULT_OUTPUT, generate_sales_data
+from sketches import PartitionedSummary
+from time_index import TimeIndex, sort_by_time
+from topk import Leaderboard, top_k
+
 # Configure page
 st.set_page_config(
     page_title="Sales Analytics Dashboard",
@@ -14,6 +30,7 @@ st.set_page_config(
     layout="wide",
     initial_sidebar_state="expanded"
 )
+TRACER.start_run('sales_dashboard')
 
 # Custom CSS for styling
 st.markdown("""
@@ -36,30 +53,61 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Sample data generation (same as in notebook)
+# Sales transactions: a Parquet file written by sales_generator.py when present
+# (any volume, e.g. python sales_generator.py --transactions-per-day 1000),
+# otherwise one generated transaction per day as in the notebook
+SALES_DATA_PATH = Path(os.environ.get('SALES_DATA_PATH', DEFAULT_OUTPUT))
+LEADERBOARD_CAPACITY = 200   # Space-Saving counters per leaderboard
+LEADERBOARD_LABELS = {'sales_rep': 'Sales Representatives', 'product': 'Products', 'region': 'Regions'}
+
+def sales_source():
+    """Identity of the sales Parquet file (path, mtime, size), None when absent"""
+    if not SALES_DATA_PATH.exists():
+        return None
+    stat = SALES_DATA_PATH.stat()
+    return (str(SALES_DATA_PATH), stat.st_mtime_ns, stat.st_size)
+
 @st.cache_data
-def load_sales_data():
-    np.random.seed(42)
-    dates = pd.date_range('2023-01-01', '2024-12-31', freq='D')
-    n_days = len(dates)
-    
-    trend = np.linspace(1000, 1500, n_days)
-    seasonality = 200 * np.sin(2 * np.pi * np.arange(n_days) / 365.25)
-    weekly_pattern = 100 * np.sin(2 * np.pi * np.arange(n_days) / 7)
-    noise = np.random.normal(0, 50, n_days)
-    
-    sales_data = pd.DataFrame({
-        'date': dates,
-        'sales': trend + seasonality + weekly_pattern + noise,
-        'region': np.random.choice(['North', 'South', 'East', 'West'], n_days),
-        'product': np.random.choice(['Product A', 'Product B', 'Product C', 'Product D'], n_days),
-        'sales_rep': np.random.choice([f'Rep {i}' for i in range(1, 11)], n_days)
-    })
-    sales_data['sales'] = np.maximum(sales_data['sales'], 100)
-    return sales_data
-
-# Load data
-df = load_sales_data()
+@disk_cached
+def load_sales_data(source=None, compact=COMPACT_DTYPES):
+    if source is not None:
+        sales_data = pd.read_parquet(source[0])
+    else:
+        sales_data = generate_sales_data(transactions_per_day=1)
+    if compact:
+        sales_data = compact_frame(sales_data)
+    return sort_by_time(sales_data, 'date')
+
+@st.cache_resource
+def load_sales_cube(source=None):
+    """Pre-aggregate sales once so reruns scale with cube cells, not raw rows"""
+    return RollupCube.build(load_sales_data(source, compact=COMPACT_DTYPES))
+
+@st.cache_resource
+def load_sales_index(source=None):
+    """Bitmap index so region/product filters are bitwise ops, not string scans"""
+    return BitmapIndex(load_sales_data(source, compact=COMPACT_DTYPES), ['region', 'product', 'sales_rep'])
+
+@st.cache_resource
+def load_sales_summary(source=None):
+    """Mergeable moment and quantile sketches per (date, region, product) partition"""
+    return PartitionedSummary.build(
+        load_sales_data(source, compact=COMPACT_DTYPES), ('date', 'region', 'product'), 'sales'
+    )
+
+@st.cache_resource
+def sales_leaderboard(path, dimension):
+    """Shared Space-Saving leaderboard of total sales, grown only by newly appended rows"""
+    return Leaderboard(dimension, 'sales', capacity=LEADERBOARD_CAPACITY)
+
+# Load data (keyed on the source file so a regenerated file is picked up)
+with span('load') as load_span:
+    data_source = sales_source()
+    df = load_sales_data(data_source, compact=COMPACT_DTYPES)
+    sales_cube = load_sales_cube(data_source)
+    sales_index = load_sales_index(data_source)
+    time_index = TimeIndex(df, 'date')
+    load_span.count('rows', len(df))
 
 # Header
 st.markdown('<h1 class="main-header">📊 Sales Analytics Dashboard</h1>', unsafe_allow_html=True)
@@ -79,45 +127,74 @@ date_range = st.sidebar.date_input(
 # Region selector
 regions = st.sidebar.multiselect(
     "Select Regions",
-    options=df['region'].unique(),
-    default=df['region'].unique()
+    options=sales_index.values('region'),
+    default=sales_index.values('region')
 )
 
 # Product selector
 products = st.sidebar.multiselect(
     "Select Products",
-    options=df['product'].unique(),
-    default=df['product'].unique()
+    options=sales_index.values('product'),
+    default=sales_index.values('product')
+)
+
+# Chart detail: traces are downsampled to this many points before plotting
+st.sidebar.markdown("---")
+st.sidebar.subheader("📉 Chart Detail")
+point_budget = st.sidebar.number_input(
+    "Max Points per Trace",
+    min_value=100,
+    max_value=20000,
+    value=DEFAULT_POINT_BUDGET,
+    step=100
+)
+downsample_method = st.sidebar.selectbox(
+    "Downsampling Method",
+    options=['lttb', 'minmax'],
+    format_func={'lttb': 'LTTB (preserve shape)', 'minmax': 'Min/Max (preserve spikes)'}.get
 )
 
 # Filter data based on selections
 if len(date_range) == 2:
-    filtered_df = df[
-        (df['date'] >= pd.to_datetime(date_range[0])) &
-        (df['date'] <= pd.to_datetime(date_range[1])) &
-        (df['region'].isin(regions)) &
-        (df['product'].isin(products))
-    ]
+    selected_dates = (pd.to_datetime(date_range[0]), pd.to_datetime(date_range[1]))
 else:
-    filtered_df = df[
-        (df['region'].isin(regions)) &
-        (df['product'].isin(products))
-    ]
+    selected_dates = None
+
+with span('filter') as filter_span:
+    cube_view = sales_cube.select(date_range=selected_dates, region=regions, product=products)
+    filter_span.count('cube_cells', len(cube_view.cells))
+
+@st.cache_data
+def load_daily_sales(source, selected_dates, regions, products):
+    """Daily totals for a filter selection plus their prefix sums for moving stats"""
+    view = load_sales_cube(source).select(date_range=selected_dates, region=regions, product=products)
+    daily = view.rollup('date')[['date', 'sum']].rename(columns={'sum': 'sales'})
+    return daily, MovingStats(daily['sales'])
+
+def filter_raw_rows():
+    """Raw-row filter, only needed for row-level views (describe, raw table)"""
+    lo, hi = time_index.bounds(*(selected_dates or (None, None)))
+    window = df.iloc[lo:hi]
+    return window[sales_index.mask_range(lo, hi, region=regions, product=products)]
 
 # Key Metrics Row
 st.subheader("📈 Key Performance Indicators")
 col1, col2, col3, col4 = st.columns(4)
 
-total_sales = filtered_df['sales'].sum()
-avg_daily_sales = filtered_df['sales'].mean()
-max_daily_sales = filtered_df['sales'].max()
-total_days = len(filtered_df)
+# Daily totals (several transactions may share a date)
+with span('aggregate'):
+    daily_sales, daily_stats = load_daily_sales(data_source, selected_dates, regions, products)
+    
+    total_sales = cube_view.totals()['sum']
+    total_days = len(daily_sales)
+    avg_daily_sales = total_sales / total_days if total_days else np.nan
+    max_daily_sales = daily_sales['sales'].max()
 
 with col1:
     st.metric(
         label="Total Sales",
         value=f"${total_sales:,.0f}",
-        delta=f"{total_sales/len(filtered_df)*30:,.0f} (30-day proj.)"
+        delta=f"{avg_daily_sales*30:,.0f} (30-day proj.)"
     )
 
 with col2:
@@ -147,66 +224,115 @@ col1, col2 = st.columns([2, 1])
 
 with col1:
     # Time series chart
-    daily_sales = filtered_df.groupby('date')['sales'].sum().reset_index()
-    fig_ts = px.line(
-        daily_sales, 
-        x='date', 
-        y='sales',
-        title='Daily Sales Trend',
-        color_discrete_sequence=['#1f77b4']
+    if len(daily_sales) > 1:
+        zoom_range = st.slider(
+            "Zoom Chart Range",
+            min_value=daily_sales['date'].min().date(),
+            max_value=daily_sales['date'].max().date(),
+            value=(daily_sales['date'].min().date(), daily_sales['date'].max().date())
+        )
+    else:
+        zoom_range = None
+    # Re-fetch full detail inside the zoom window, then cut to the point budget
+    with span('downsample') as downsample_span:
+        chart_sales = downsample(daily_sales, 'date', 'sales', point_budget, downsample_method, x_range=zoom_range)
+        downsample_span.count('points', len(chart_sales))
+    fig_ts = cached_figure(
+        'daily_sales_trend',
+        lambda: px.line(
+            chart_sales, 
+            x='date', 
+            y='sales',
+            title='Daily Sales Trend',
+            color_discrete_sequence=['#1f77b4']
+        ).update_layout(
+            xaxis_title="Date",
+            yaxis_title="Sales ($)",
+            hovermode='x unified'
+        ),
+        data=(chart_sales,)
     )
-    fig_ts.update_layout(
-        xaxis_title="Date",
-        yaxis_title="Sales ($)",
-        hovermode='x unified'
-    )
-    st.plotly_chart(fig_ts, use_container_width=True)
+    plotly_chart(fig_ts, use_container_width=True)
 
 with col2:
     # Regional distribution
-    regional_sales = filtered_df.groupby('region')['sales'].sum().reset_index()
-    fig_pie = px.pie(
-        regional_sales,
-        values='sales',
-        names='region',
-        title='Sales by Region'
+    with span('aggregate'):
+        regional_sales = cube_view.rollup('region')[['region', 'sum']].rename(columns={'sum': 'sales'})
+    fig_pie = cached_figure(
+        'regional_sales_pie',
+        lambda: px.pie(
+            regional_sales,
+            values='sales',
+            names='region',
+            title='Sales by Region'
+        ),
+        data=(regional_sales,)
     )
-    st.plotly_chart(fig_pie, use_container_width=True)
+    plotly_chart(fig_pie, use_container_width=True)
 
 # Charts Row 2
 col1, col2 = st.columns(2)
 
 with col1:
     # Product performance
-    product_sales = filtered_df.groupby('product')['sales'].agg(['sum', 'mean', 'count']).reset_index()
-    product_sales.columns = ['product', 'total_sales', 'avg_sales', 'transaction_count']
+    with span('aggregate'):
+        product_sales = cube_view.rollup('product')[['product', 'sum', 'mean', 'count']]
+        product_sales.columns = ['product', 'total_sales', 'avg_sales', 'transaction_count']
     
-    fig_bar = px.bar(
-        product_sales,
-        x='product',
-        y='total_sales',
-        title='Total Sales by Product',
-        color='avg_sales',
-        color_continuous_scale='viridis'
+    fig_bar = cached_figure(
+        'product_sales_bar',
+        lambda: px.bar(
+            product_sales,
+            x='product',
+            y='total_sales',
+            title='Total Sales by Product',
+            color='avg_sales',
+            color_continuous_scale='viridis'
+        ),
+        data=(product_sales,)
     )
-    st.plotly_chart(fig_bar, use_container_width=True)
+    plotly_chart(fig_bar, use_container_width=True)
 
 with col2:
-    # Sales rep performance
-    rep_performance = filtered_df.groupby('sales_rep')['sales'].agg(['sum', 'count']).reset_index()
-    rep_performance.columns = ['sales_rep', 'total_sales', 'transaction_count']
-    rep_performance = rep_performance.sort_values('total_sales', ascending=True).tail(10)
+    # Top 10 leaderboard (sales reps by default)
+    rank_dimension = st.selectbox(
+        "Rank by",
+        options=list(LEADERBOARD_LABELS),
+        format_func=LEADERBOARD_LABELS.get
+    )
+    with span('aggregate') as rank_span:
+        whole_history = (
+            set(regions) == set(sales_index.values('region'))
+            and set(products) == set(sales_index.values('product'))
+            and time_index.bounds(*(selected_dates or (None, None))) == (0, len(df))
+        )
+        if whole_history:
+            # Unfiltered: the shared leaderboard only folds in rows appended since the last rerun
+            board = sales_leaderboard(data_source[0] if data_source else None, rank_dimension)
+            board.catch_up(df)
+            leaders = board.top(10)[[rank_dimension, 'sales']].iloc[::-1]
+            rank_span.count('leaderboard_rows', board.rows)
+        else:
+            # Filtered: argpartition over the cube's groups, only the 10 winners are sorted
+            leaders = cube_view.rollup(rank_dimension)[[rank_dimension, 'sum']]
+            leaders = top_k(leaders, 'sum', k=10, ascending=True)
+        leaders.columns = [rank_dimension, 'total_sales']
     
-    fig_horizontal = px.bar(
-        rep_performance,
-        x='total_sales',
-        y='sales_rep',
-        orientation='h',
-        title='Top 10 Sales Representatives',
-        color='total_sales',
-        color_continuous_scale='plasma'
+    fig_horizontal = cached_figure(
+        'top_sales_leaders',
+        lambda: px.bar(
+            leaders,
+            x='total_sales',
+            y=rank_dimension,
+            orientation='h',
+            title=f'Top 10 {LEADERBOARD_LABELS[rank_dimension]}',
+            color='total_sales',
+            color_continuous_scale='plasma'
+        ),
+        data=(leaders,),
+        style={'dimension': rank_dimension}
     )
-    st.plotly_chart(fig_horizontal, use_container_width=True)
+    plotly_chart(fig_horizontal, use_container_width=True)
 
 # Advanced Analytics Section
 st.subheader("🧪 Advanced Analytics")
@@ -215,53 +341,99 @@ st.subheader("🧪 Advanced Analytics")
 st.subheader("📈 Moving Average Analysis")
 ma_days = st.slider("Moving Average Days", min_value=7, max_value=60, value=30)
 
-daily_sales_ma = daily_sales.copy()
-daily_sales_ma[f'MA_{ma_days}'] = daily_sales_ma['sales'].rolling(window=ma_days).mean()
-
-fig_ma = go.Figure()
-fig_ma.add_trace(go.Scatter(
-    x=daily_sales_ma['date'],
-    y=daily_sales_ma['sales'],
-    mode='lines',
-    name='Daily Sales',
-    line=dict(color='lightblue', width=1),
-    opacity=0.7
-))
-fig_ma.add_trace(go.Scatter(
-    x=daily_sales_ma['date'],
-    y=daily_sales_ma[f'MA_{ma_days}'],
-    mode='lines',
-    name=f'{ma_days}-Day Moving Average',
-    line=dict(color='red', width=3)
-))
-fig_ma.update_layout(
-    title=f'Sales Trend with {ma_days}-Day Moving Average',
-    xaxis_title='Date',
-    yaxis_title='Sales ($)'
+ma_compare = st.multiselect(
+    "Compare with other windows",
+    options=[d for d in (7, 14, 30, 60, 90) if d != ma_days],
+    default=[]
 )
-st.plotly_chart(fig_ma, use_container_width=True)
+
+# Every window is a difference of cached prefix sums; all overlays in one pass
+ma_windows = [ma_days] + ma_compare
+with span('aggregate'):
+    ma_values = daily_stats.means(ma_windows)[:, daily_sales.index.get_indexer(chart_sales.index)]
+
+def build_ma_figure():
+    fig_ma = go.Figure()
+    fig_ma.add_trace(go.Scatter(
+        x=chart_sales['date'],
+        y=chart_sales['sales'],
+        mode='lines',
+        name='Daily Sales',
+        line=dict(color='lightblue', width=1),
+        opacity=0.7
+    ))
+    fig_ma.add_trace(go.Scatter(
+        x=chart_sales['date'],
+        y=ma_values[0],
+        mode='lines',
+        name=f'{ma_days}-Day Moving Average',
+        line=dict(color='red', width=3)
+    ))
+    for window, values in zip(ma_compare, ma_values[1:]):
+        fig_ma.add_trace(go.Scatter(
+            x=chart_sales['date'],
+            y=values,
+            mode='lines',
+            name=f'{window}-Day Moving Average',
+            line=dict(width=1.5, dash='dot')
+        ))
+    fig_ma.update_layout(
+        title=f'Sales Trend with {ma_days}-Day Moving Average',
+        xaxis_title='Date',
+        yaxis_title='Sales ($)'
+    )
+    return fig_ma
+
+fig_ma = cached_figure(
+    'moving_average',
+    build_ma_figure,
+    data=(chart_sales, ma_values),
+    style={'ma_days': ma_days, 'compare': tuple(ma_compare)}
+)
+plotly_chart(fig_ma, use_container_width=True)
 
 # Data Table
 st.subheader("📋 Detailed Data")
 if st.checkbox("Show raw data"):
+    with span('filter'):
+        raw_rows = filter_raw_rows()
     st.dataframe(
-        filtered_df.head(100),
+        raw_rows.head(100),
         use_container_width=True
     )
 
 # Summary statistics
 st.subheader("📊 Summary Statistics")
+stats_mode = st.radio(
+    "Statistics Mode",
+    ["Approximate (sketches)", "Exact (raw rows)"],
+    horizontal=True,
+    help="Approximate merges per-partition sketches: count, mean, std, min and max "
+         "are exact, percentiles come from t-digests (rank error well under 2%)."
+)
+with span('aggregate'):
+    summary_view = load_sales_summary(data_source).select(
+        date_range=selected_dates, region=regions, product=products
+    )
+    if stats_mode.startswith("Exact"):
+        sales_statistics = filter_raw_rows()['sales'].describe()
+    else:
+        sales_statistics = summary_view.describe()
+    regional_stats = summary_view.grouped_moments('region')[['count', 'mean', 'std']].round(2)
 col1, col2 = st.columns(2)
 
 with col1:
     st.write("**Sales Statistics**")
-    st.write(filtered_df['sales'].describe())
+    st.write(sales_statistics)
 
 with col2:
     st.write("**Regional Breakdown**")
-    regional_stats = filtered_df.groupby('region')['sales'].agg(['count', 'mean', 'std']).round(2)
     st.write(regional_stats)
 
 # Footer
 st.markdown("---")
 st.markdown("**Dashboard Created with Streamlit** | Last Updated: " + datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+
+# Rerun timings (shown for the finished rerun, exported when configured)
+TRACER.finish_run()
+show_performance(st.sidebar, 'sales_dashboard')
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Scalable Sales Transaction Generator
+====================================
+
+Vectorized generator for the sales dashboard's synthetic data: N transactions
+per day across regions, products and sales reps, following the same
+trend + yearly seasonality + weekly pattern + noise model as the original
+one-row-per-day ``load_sales_data``. Each day's total follows that model
+exactly and is split over the day's transactions with random weights, so
+daily aggregates look the same whatever the number of transactions per day.
+
+Rows are produced in fixed-size chunks of whole days. Each chunk has its own
+deterministic seed derived from ``(seed, chunk_id)``, so the output is the
+same no matter how many worker processes produce it. Chunks are streamed
+straight into a Parquet file, which keeps memory bounded even at 100M rows.
+
+Usage:
+    python sales_generator.py --transactions-per-day 1000 --output data/sales_transactions.parquet
+    python sales_generator.py --transactions-per-day 137000 --workers 8   # ~100M rows
+"""
+
+import argparse
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+REGIONS = ['North', 'South', 'East', 'West']
+PRODUCTS = ['Product A', 'Product B', 'Product C', 'Product D']
+DEFAULT_START = '2023-01-01'
+DEFAULT_END = '2024-12-31'
+DEFAULT_CHUNK_ROWS = 2_000_000
+DEFAULT_OUTPUT = Path(__file__).parent / "data" / "sales_transactions.parquet"
+
+
+def sales_reps(n_reps):
+    return [f'Rep {i}' for i in range(1, n_reps + 1)]
+
+
+def generate_chunk(day_start, day_stop, n_days, start, transactions_per_day, n_reps, seed, chunk_id):
+    """Transactions for days ``day_start..day_stop-1`` of an ``n_days`` period."""
+    rng = np.random.default_rng([seed, chunk_id])
+    days = np.arange(day_start, day_stop)
+    trend = 1000 + 500 * days / max(n_days - 1, 1)
+    seasonality = 200 * np.sin(2 * np.pi * days / 365.25)
+    weekly_pattern = 100 * np.sin(2 * np.pi * days / 7)
+    noise = rng.normal(0, 50, len(days))
+    daily_total = np.maximum(trend + seasonality + weekly_pattern + noise, 100)
+
+    # Split each day's total over its transactions with random (gamma) weights
+    weights = rng.gamma(4.0, 0.25, (len(days), transactions_per_day))
+    weights /= weights.sum(axis=1, keepdims=True)
+    sales = (daily_total[:, None] * weights).ravel()
+
+    day_index = np.repeat(days, transactions_per_day)
+    n_rows = len(day_index)
+
+    return pd.DataFrame({
+        'date': (np.datetime64(start, 'D') + day_index).astype('datetime64[ns]'),
+        'sales': sales,
+        'region': pd.Categorical.from_codes(rng.integers(0, len(REGIONS), n_rows), REGIONS),
+        'product': pd.Categorical.from_codes(rng.integers(0, len(PRODUCTS), n_rows), PRODUCTS),
+        'sales_rep': pd.Categorical.from_codes(rng.integers(0, n_reps, n_rows), sales_reps(n_reps)),
+    })
+
+
+def _generate_chunk_task(args):
+    return generate_chunk(*args)
+
+
+def iter_sales_chunks(start=DEFAULT_START, end=DEFAULT_END, transactions_per_day=1, n_reps=10,
+                      seed=42, chunk_rows=DEFAULT_CHUNK_ROWS, workers=1):
+    """Yield transaction chunks in date order.
+
+    With ``workers > 1`` chunks are produced by a process pool, with at most
+    ``2 * workers`` chunks in flight so a slow consumer never lets finished
+    chunks pile up in memory.
+    """
+    n_days = (pd.Timestamp(end) - pd.Timestamp(start)).days + 1
+    days_per_chunk = max(chunk_rows // transactions_per_day, 1)
+    tasks = [
+        (day_start, min(day_start + days_per_chunk, n_days), n_days, str(pd.Timestamp(start).date()),
+         transactions_per_day, n_reps, seed, chunk_id)
+        for chunk_id, day_start in enumerate(range(0, n_days, days_per_chunk))
+    ]
+    if workers <= 1:
+        for task in tasks:
+            yield _generate_chunk_task(task)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        task_iter = iter(tasks)
+        for task in task_iter:
+            pending.append(pool.submit(_generate_chunk_task, task))
+            if len(pending) >= 2 * workers:
+                break
+        while pending:
+            chunk = pending.popleft().result()
+            next_task = next(task_iter, None)
+            if next_task is not None:
+                pending.append(pool.submit(_generate_chunk_task, next_task))
+            yield chunk
+
+
+def generate_sales_data(**kwargs):
+    """Materialize every chunk into one frame (for sizes that fit in memory)."""
+    return pd.concat(list(iter_sales_chunks(**kwargs)), ignore_index=True)
+
+
+def write_sales_parquet(path=DEFAULT_OUTPUT, **kwargs):
+    """Stream generated chunks into a Parquet file, one row group per chunk.
+
+    The file is written under a temporary name and renamed when complete; an
+    empty date range still produces a file with the transaction schema.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + '.tmp')
+    writer = None
+    n_rows = 0
+    try:
+        try:
+            for chunk in iter_sales_chunks(**kwargs):
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(tmp_path, table.schema, compression='zstd')
+                writer.write_table(table)
+                n_rows += len(chunk)
+            if writer is None:
+                empty = generate_chunk(0, 0, 1, DEFAULT_START, 1, kwargs.get('n_reps', 10), 0, 0)
+                pq.write_table(pa.Table.from_pandas(empty, preserve_index=False), tmp_path, compression='zstd')
+        finally:
+            if writer is not None:
+                writer.close()
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return n_rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic sales transactions as Parquet")
+    parser.add_argument('--output', type=Path, default=DEFAULT_OUTPUT, help='Parquet file to write')
+    parser.add_argument('--transactions-per-day', type=int, default=1000)
+    parser.add_argument('--start', default=DEFAULT_START)
+    parser.add_argument('--end', default=DEFAULT_END)
+    parser.add_argument('--reps', type=int, default=10, help='Number of sales representatives')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    n_rows = write_sales_parquet(
+        args.output,
+        start=args.start,
+        end=args.end,
+        transactions_per_day=args.transactions_per_day,
+        n_reps=args.reps,
+        seed=args.seed,
+        chunk_rows=args.chunk_rows,
+        workers=args.workers,
+    )
+    print(f"✅ Wrote {n_rows:,} transactions to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
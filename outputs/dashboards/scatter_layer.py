@@ -0,0 +1,195 @@
+"""
+Point-Count Aware Scatter Rendering
+===================================
+
+``scatter`` is a drop-in for ``px.scatter`` that picks a renderer from the
+number of points:
+
+* up to ``SVG_MAX_POINTS`` — regular SVG markers;
+* up to ``WEBGL_MAX_POINTS`` — ``Scattergl`` (``render_mode='webgl'``), same
+  figure API, drawn on the GPU;
+* beyond that — rasterized on the server into a fixed-size image. Points are
+  counted per pixel and per ``color`` category (with datashader when it is
+  installed, NumPy otherwise); pixel colours blend the category colours by
+  count, opacity grows with log density. A coarser invisible heatmap on top
+  provides hover with the point count of each cell and its breakdown by
+  category. Numeric ``color`` columns with many distinct values are shown as
+  the per-pixel mean instead.
+
+Rasterized figures keep the colour legend but drop marker symbols and per-point
+hover data, since no individual points remain.
+
+Usage:
+    fig = scatter(pca_df, x='PC1', y='PC2', color='category', symbol='target', title='PCA')
+    fig.layout.meta   # {'render_mode': 'svg' | 'webgl' | 'raster', 'points': n}
+"""
+
+import base64
+import io
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+try:
+    import datashader
+except ImportError:  # optional: the NumPy rasterizer gives the same result, more slowly
+    datashader = None
+
+SVG_MAX_POINTS = 10_000
+WEBGL_MAX_POINTS = 300_000
+RASTER_WIDTH = 600
+RASTER_HEIGHT = 400
+HOVER_CELL = 8            # raster pixels per hover cell side
+MAX_COLOR_CATEGORIES = 20
+
+
+def render_mode_for(n_points, svg_max=SVG_MAX_POINTS, webgl_max=WEBGL_MAX_POINTS):
+    """Renderer used for a scatter of ``n_points`` points."""
+    if n_points <= svg_max:
+        return 'svg'
+    if n_points <= webgl_max:
+        return 'webgl'
+    return 'raster'
+
+
+def _is_categorical(series):
+    return (not pd.api.types.is_numeric_dtype(series)
+            or pd.api.types.is_bool_dtype(series)
+            or series.nunique() <= MAX_COLOR_CATEGORIES)
+
+
+def _extent(values):
+    low, high = float(np.nanmin(values)), float(np.nanmax(values))
+    if high <= low:
+        high = low + 1.0
+    return low, high
+
+
+def _pixel_index(values, extent, size):
+    low, high = extent
+    index = ((values - low) / (high - low) * size).astype(np.int64)
+    return np.clip(index, 0, size - 1)
+
+
+def rasterize_counts(x, y, codes, n_categories, x_extent, y_extent, width=RASTER_WIDTH, height=RASTER_HEIGHT):
+    """Point counts per (row, column, category); row 0 is the lowest y."""
+    valid = ~(np.isnan(x) | np.isnan(y))
+    if datashader is not None:
+        frame = pd.DataFrame({'x': x[valid], 'y': y[valid],
+                              'c': pd.Categorical.from_codes(codes[valid], range(n_categories))})
+        canvas = datashader.Canvas(plot_width=width, plot_height=height,
+                                   x_range=x_extent, y_range=y_extent)
+        return canvas.points(frame, 'x', 'y', agg=datashader.count_cat('c')).values.astype(np.int64)
+    ix = _pixel_index(x[valid], x_extent, width)
+    iy = _pixel_index(y[valid], y_extent, height)
+    flat = (iy * width + ix) * n_categories + codes[valid]
+    counts = np.bincount(flat, minlength=height * width * n_categories)
+    return counts.reshape(height, width, n_categories)
+
+
+def shade(counts, palette):
+    """RGBA image blending category colours by count, alpha by log density."""
+    total = counts.sum(axis=2)
+    rgb = np.array([px.colors.hex_to_rgb(color) if color.startswith('#') else px.colors.unlabel_rgb(color)
+                    for color in palette], dtype=float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        blended = (counts @ rgb) / total[..., None]
+    blended = np.nan_to_num(blended)
+    density = np.log1p(total) / np.log1p(total.max()) if total.max() > 0 else total * 0.0
+    alpha = np.where(total > 0, 0.35 + 0.65 * density, 0.0)
+    image = np.concatenate([blended, alpha[..., None] * 255], axis=2)
+    return image.round().astype(np.uint8)
+
+
+def _image_payload(image):
+    """Image trace data: a PNG data URI (a fraction of the JSON pixel list) when Pillow is available."""
+    try:
+        from PIL import Image
+    except ImportError:
+        return {'z': image, 'colormodel': 'rgba'}
+    buffer = io.BytesIO()
+    Image.fromarray(image, mode='RGBA').save(buffer, format='PNG')
+    return {'source': 'data:image/png;base64,' + base64.b64encode(buffer.getvalue()).decode('ascii')}
+
+
+def _coarsen(counts, cell):
+    height, width = counts.shape[:2]
+    trimmed = counts[:height - height % cell, :width - width % cell]
+    shape = (trimmed.shape[0] // cell, cell, trimmed.shape[1] // cell, cell) + trimmed.shape[2:]
+    return trimmed.reshape(shape).sum(axis=(1, 3))
+
+
+def raster_scatter(data, x, y, color=None, title=None, width=RASTER_WIDTH, height=RASTER_HEIGHT):
+    """Server-side rasterized scatter with aggregated hover."""
+    xs = data[x].to_numpy(dtype=float)
+    ys = data[y].to_numpy(dtype=float)
+    x_extent, y_extent = _extent(xs), _extent(ys)
+    dx = (x_extent[1] - x_extent[0]) / width
+    dy = (y_extent[1] - y_extent[0]) / height
+    fig = go.Figure()
+
+    if color is not None and not _is_categorical(data[color]):
+        # Continuous colour: mean value per pixel, at half resolution to keep the payload small
+        width, height = width // 2, height // 2
+        dx, dy = dx * 2, dy * 2
+        values = data[color].to_numpy(dtype=float)
+        ix, iy = _pixel_index(xs, x_extent, width), _pixel_index(ys, y_extent, height)
+        flat = iy * width + ix
+        count = np.bincount(flat, minlength=width * height)
+        total = np.bincount(flat, weights=values, minlength=width * height)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = (total / count).reshape(height, width)
+        fig.add_trace(go.Heatmap(
+            z=mean, x0=x_extent[0] + dx / 2, dx=dx, y0=y_extent[0] + dy / 2, dy=dy,
+            colorscale='Viridis', colorbar=dict(title=color),
+            hovertemplate=f"{x}: %{{x:.3g}}<br>{y}: %{{y:.3g}}<br>mean {color}: %{{z:.3g}}<extra></extra>",
+        ))
+    else:
+        if color is None:
+            codes, categories = np.zeros(len(data), dtype=np.int64), np.array(['points'], dtype=object)
+        else:
+            codes, categories = pd.factorize(data[color], sort=True)
+            codes = codes.astype(np.int64)
+        palette = [px.colors.qualitative.Plotly[i % len(px.colors.qualitative.Plotly)]
+                   for i in range(len(categories))]
+        counts = rasterize_counts(xs, ys, codes, len(categories), x_extent, y_extent, width, height)
+        fig.add_trace(go.Image(
+            **_image_payload(shade(counts, palette)),
+            x0=x_extent[0] + dx / 2, dx=dx, y0=y_extent[0] + dy / 2, dy=dy,
+            hoverinfo='skip',
+        ))
+        # Invisible coarse heatmap carrying the hover: total and per-category counts
+        hover_counts = _coarsen(counts, HOVER_CELL)
+        breakdown = "".join(f"<br>{category}: %{{customdata[{i}]:,}}" for i, category in enumerate(categories)
+                            if color is not None)
+        fig.add_trace(go.Heatmap(
+            z=hover_counts.sum(axis=2), customdata=hover_counts,
+            x0=x_extent[0] + dx * HOVER_CELL / 2, dx=dx * HOVER_CELL,
+            y0=y_extent[0] + dy * HOVER_CELL / 2, dy=dy * HOVER_CELL,
+            opacity=0, showscale=False,
+            hovertemplate=f"{x}: %{{x:.3g}}<br>{y}: %{{y:.3g}}<br>points: %{{z:,}}{breakdown}<extra></extra>",
+        ))
+        if color is not None:
+            for category, swatch in zip(categories, palette):
+                fig.add_trace(go.Scatter(x=[None], y=[None], mode='markers', name=str(category),
+                                         marker=dict(color=swatch), legendgroup=str(category)))
+            fig.update_layout(legend_title_text=color)
+
+    fig.update_layout(title=title, xaxis_title=x, yaxis_title=y)
+    fig.update_yaxes(autorange=True)
+    return fig
+
+
+def scatter(data, x, y, color=None, symbol=None, title=None, hover_data=None, mode='auto', **kwargs):
+    """``px.scatter`` replacement choosing SVG, WebGL or rasterized output by point count."""
+    n_points = len(data)
+    render_mode = render_mode_for(n_points) if mode == 'auto' else mode
+    if render_mode == 'raster':
+        fig = raster_scatter(data, x, y, color=color, title=title)
+    else:
+        fig = px.scatter(data, x=x, y=y, color=color, symbol=symbol, title=title,
+                         hover_data=hover_data, render_mode=render_mode, **kwargs)
+    fig.update_layout(meta={'render_mode': render_mode, 'points': n_points})
+    return fig
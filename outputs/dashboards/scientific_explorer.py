@@ -6,16 +6,25 @@ import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 from sklearn.datasets import load_iris, load_wine
-from sklearn.preprocessing import StandardScaler
-from sklearn.decomposition import PCA
-from sklearn.cluster import KMeans
 import seaborn as sns
 
+from cluster_engine import KMeansSweep
+from box_summary import BoxSummary, box_figure
+from compact_dtypes import COMPACT_DTYPES, compact_frame
+from disk_cache import disk_cached
+from figure_cache import cached_figure
+from gram_store import POOLED, GramStore
+from histograms import HistogramSet
+from instrumentation import TRACER, plotly_chart, show_performance, span
+from pca_engine import PCADecomposition
+from scatter_layer import scatter
+
 st.set_page_config(
     page_title="Scientific Data Explorer",
     page_icon="🔬",
     layout="wide"
 )
+TRACER.start_run('scientific_explorer')
 
 st.title("🔬 Scientific Data Explorer")
 st.markdown("**Interactive analysis of scientific datasets with machine learning insights**")
@@ -28,21 +37,73 @@ dataset_choice = st.sidebar.selectbox(
 )
 
 @st.cache_data
-def load_scientific_data(dataset_name):
+@disk_cached
+def load_scientific_data(dataset_name, compact=COMPACT_DTYPES):
     if dataset_name == "Iris Flower Dataset":
         data = load_iris()
         df = pd.DataFrame(data.data, columns=data.feature_names)
         df['target'] = data.target
         df['species'] = [data.target_names[i] for i in data.target]
-        return df, data.feature_names, 'species'
+        target_col = 'species'
     else:  # Wine dataset
         data = load_wine()
         df = pd.DataFrame(data.data, columns=data.feature_names)
         df['target'] = data.target
         df['wine_class'] = [f'Class {i}' for i in data.target]
-        return df, data.feature_names, 'wine_class'
+        target_col = 'wine_class'
+    if compact:
+        df = compact_frame(df)
+    return df, data.feature_names, target_col
+
+@st.cache_resource
+def load_gram_store(dataset_name):
+    """Per-class Gram matrices so correlations of any feature subset skip the row scan"""
+    df, feature_names, target_col = load_scientific_data(dataset_name, compact=COMPACT_DTYPES)
+    return GramStore.build(df, feature_names, target_col)
 
-df, feature_names, target_col = load_scientific_data(dataset_choice)
+@st.cache_resource
+def load_histograms(dataset_name):
+    """Per-class histograms of every feature on shared bin edges, counted in one pass"""
+    df, feature_names, target_col = load_scientific_data(dataset_name, compact=COMPACT_DTYPES)
+    return HistogramSet.build(df, feature_names, target_col)
+
+@st.cache_resource
+def load_box_summaries(dataset_name):
+    """Quartiles, whiskers and capped outliers of every feature per class"""
+    df, feature_names, target_col = load_scientific_data(dataset_name, compact=COMPACT_DTYPES)
+    return BoxSummary.build(df, feature_names, target_col)
+
+@st.cache_data
+def load_relationships(dataset_name):
+    """Slope, intercept, r, r² and p-value of every feature pair, per class and pooled"""
+    return load_gram_store(dataset_name).regressions()
+
+@st.cache_resource
+def pca_decomposition(dataset_name, features):
+    """Every principal component of one feature set, fitted once; any component count is a slice"""
+    df, feature_names, target_col = load_scientific_data(dataset_name, compact=COMPACT_DTYPES)
+    return PCADecomposition.fit(df, columns=list(features))
+
+@st.cache_data
+def pca_projection(dataset_name, features, dims):
+    """Leading ``dims`` component scores with the class column, for the 2D/3D views"""
+    df, feature_names, target_col = load_scientific_data(dataset_name, compact=COMPACT_DTYPES)
+    scores = pca_decomposition(dataset_name, features).scores(dims)
+    pca_df = pd.DataFrame(scores, columns=[f'PC{i+1}' for i in range(dims)])
+    pca_df[target_col] = df[target_col].values
+    return pca_df
+
+@st.cache_resource
+def cluster_sweep(dataset_name, features):
+    """K-means for every k from 2 to 10 on one feature set, fitted once and shared"""
+    df, feature_names, target_col = load_scientific_data(dataset_name, compact=COMPACT_DTYPES)
+    return KMeansSweep().fit(df[list(features)])
+
+with span('load') as load_span:
+    df, feature_names, target_col = load_scientific_data(dataset_choice, compact=COMPACT_DTYPES)
+    gram_store = load_gram_store(dataset_choice)
+    relationships = load_relationships(dataset_choice)
+    load_span.count('rows', len(df))
 
 # Analysis options
 st.sidebar.header("🔍 Analysis Options")
@@ -71,105 +132,156 @@ if analysis_type == "Exploratory Data Analysis":
     )
     
     if selected_features:
-        # Distribution plots
+        # Distribution plots, drawn from pre-binned counts
         st.subheader("📈 Feature Distributions")
-        fig_dist = make_subplots(
-            rows=2, cols=2,
-            subplot_titles=selected_features[:4],
-            specs=[[{"type": "xy"}, {"type": "xy"}],
-                   [{"type": "xy"}, {"type": "xy"}]]
-        )
+        show_kde = st.checkbox("Overlay density estimate (KDE)")
+        with span('aggregate'):
+            histograms = load_histograms(dataset_choice)
+        class_colors = px.colors.qualitative.Plotly
+        
+        def build_distribution_figure():
+            fig_dist = make_subplots(
+                rows=2, cols=2,
+                subplot_titles=selected_features[:4],
+                specs=[[{"type": "xy"}, {"type": "xy"}],
+                       [{"type": "xy"}, {"type": "xy"}]]
+            )
         
-        for i, feature in enumerate(selected_features[:4]):
-            row = i // 2 + 1
-            col = i % 2 + 1
+            for i, feature in enumerate(selected_features[:4]):
+                row = i // 2 + 1
+                col = i % 2 + 1
+                counts = histograms.counts(feature)
+                if show_kde:
+                    grid, density = histograms.kde(feature, scale='counts')
             
-            for class_name in df[target_col].unique():
-                class_data = df[df[target_col] == class_name][feature]
-                fig_dist.add_trace(
-                    go.Histogram(
-                        x=class_data,
-                        name=f"{class_name}",
-                        opacity=0.7,
-                        legendgroup=class_name,
-                        showlegend=(i == 0)
-                    ),
-                    row=row, col=col
-                )
+                for j, class_name in enumerate(histograms.classes):
+                    color = class_colors[j % len(class_colors)]
+                    fig_dist.add_trace(
+                        go.Bar(
+                            x=histograms.centers(feature),
+                            y=counts[j],
+                            width=histograms.width(feature),
+                            name=f"{class_name}",
+                            marker_color=color,
+                            opacity=0.7,
+                            legendgroup=str(class_name),
+                            showlegend=(i == 0)
+                        ),
+                        row=row, col=col
+                    )
+                    if show_kde:
+                        fig_dist.add_trace(
+                            go.Scatter(
+                                x=grid,
+                                y=density[j],
+                                mode='lines',
+                                line=dict(color=color),
+                                name=f"{class_name} KDE",
+                                legendgroup=str(class_name),
+                                showlegend=False
+                            ),
+                            row=row, col=col
+                        )
+        
+            fig_dist.update_layout(
+                title="Feature Distributions by Class",
+                height=600,
+                barmode='overlay'
+            )
+            return fig_dist
         
-        fig_dist.update_layout(
-            title="Feature Distributions by Class",
-            height=600,
-            barmode='overlay'
+        fig_dist = cached_figure(
+            'feature_distributions',
+            build_distribution_figure,
+            data=tuple(histograms.counts(feature) for feature in selected_features[:4]),
+            style={'features': selected_features[:4], 'kde': show_kde}
         )
-        st.plotly_chart(fig_dist, use_container_width=True)
+        plotly_chart(fig_dist, use_container_width=True)
         
         # Correlation matrix
         st.subheader("🔗 Feature Correlation Matrix")
-        corr_matrix = df[selected_features].corr()
+        with span('aggregate'):
+            corr_matrix = gram_store.correlation(selected_features)
         
-        fig_corr = px.imshow(
-            corr_matrix,
-            text_auto=True,
-            aspect="auto",
-            title="Feature Correlation Heatmap",
-            color_continuous_scale="RdBu"
+        fig_corr = cached_figure(
+            'feature_correlation',
+            lambda: px.imshow(
+                corr_matrix,
+                text_auto=True,
+                aspect="auto",
+                title="Feature Correlation Heatmap",
+                color_continuous_scale="RdBu"
+            ),
+            data=(corr_matrix,)
         )
-        st.plotly_chart(fig_corr, use_container_width=True)
+        plotly_chart(fig_corr, use_container_width=True)
 
 elif analysis_type == "Principal Component Analysis":
     st.header("🎯 Principal Component Analysis")
     
-    # PCA computation
-    X = df[feature_names]
-    scaler = StandardScaler()
-    X_scaled = scaler.fit_transform(X)
-    
+    # PCA computation: the full decomposition is fitted once per feature set,
+    # the slider only slices it
     n_components = st.slider("Number of PCA Components", 2, min(len(feature_names), 10), 3)
-    pca = PCA(n_components=n_components)
-    X_pca = pca.fit_transform(X_scaled)
+    with span('fit'):
+        decomposition = pca_decomposition(dataset_choice, tuple(feature_names))
+        explained_variance_ratio = decomposition.explained_variance_ratio(n_components)
     
     # Explained variance
     st.subheader("📊 Explained Variance")
     variance_df = pd.DataFrame({
         'Component': [f'PC{i+1}' for i in range(n_components)],
-        'Explained_Variance': pca.explained_variance_ratio_,
-        'Cumulative_Variance': np.cumsum(pca.explained_variance_ratio_)
+        'Explained_Variance': explained_variance_ratio,
+        'Cumulative_Variance': np.cumsum(explained_variance_ratio)
     })
     
-    fig_var = px.bar(
-        variance_df,
-        x='Component',
-        y='Explained_Variance',
-        title='Explained Variance by Principal Component'
+    fig_var = cached_figure(
+        'explained_variance',
+        lambda: px.bar(
+            variance_df,
+            x='Component',
+            y='Explained_Variance',
+            title='Explained Variance by Principal Component'
+        ),
+        data=(variance_df,)
     )
-    st.plotly_chart(fig_var, use_container_width=True)
+    plotly_chart(fig_var, use_container_width=True)
     
-    # PCA scatter plot
+    # PCA scatter plot (both projections are cached, so switching views is free)
     st.subheader("🎨 PCA Visualization")
-    if n_components >= 2:
-        pca_df = pd.DataFrame(X_pca[:, :3], columns=[f'PC{i+1}' for i in range(min(3, n_components))])
-        pca_df[target_col] = df[target_col]
-        
-        if n_components >= 3:
-            fig_3d = px.scatter_3d(
+    projection = st.radio(
+        "Projection",
+        ["2D", "3D"] if len(feature_names) >= 3 else ["2D"],
+        horizontal=True
+    )
+    if projection == "3D":
+        pca_df = pca_projection(dataset_choice, tuple(feature_names), 3)
+        fig_3d = cached_figure(
+            'pca_3d',
+            lambda: px.scatter_3d(
                 pca_df,
                 x='PC1',
                 y='PC2',
                 z='PC3',
                 color=target_col,
                 title='3D PCA Visualization'
-            )
-            st.plotly_chart(fig_3d, use_container_width=True)
-        
-        fig_2d = px.scatter(
-            pca_df,
-            x='PC1',
-            y='PC2',
-            color=target_col,
-            title='2D PCA Visualization'
+            ),
+            data=(pca_df,)
         )
-        st.plotly_chart(fig_2d, use_container_width=True)
+        plotly_chart(fig_3d, use_container_width=True)
+    else:
+        pca_df = pca_projection(dataset_choice, tuple(feature_names), 2)
+        fig_2d = cached_figure(
+            'pca_2d',
+            lambda: scatter(
+                pca_df,
+                x='PC1',
+                y='PC2',
+                color=target_col,
+                title='2D PCA Visualization'
+            ),
+            data=(pca_df,)
+        )
+        plotly_chart(fig_2d, use_container_width=True)
 
 elif analysis_type == "Clustering Analysis":
     st.header("🎯 K-Means Clustering Analysis")
@@ -182,16 +294,45 @@ elif analysis_type == "Clustering Analysis":
     )
     
     if clustering_features:
-        X_cluster = df[clustering_features]
-        scaler = StandardScaler()
-        X_scaled = scaler.fit_transform(X_cluster)
-        
         # Number of clusters
         n_clusters = st.slider("Number of Clusters", 2, 10, 3)
         
-        # Perform clustering
-        kmeans = KMeans(n_clusters=n_clusters, random_state=42)
-        cluster_labels = kmeans.fit_predict(X_scaled)
+        # Every k is fitted on the first visit of a feature set; moving the slider is a lookup
+        with span('fit') as fit_span:
+            sweep = cluster_sweep(dataset_choice, tuple(clustering_features))
+            cluster_labels = sweep.labels(n_clusters)
+            fit_span.count('rows', len(cluster_labels))
+        st.caption(
+            f"{sweep.report['algorithm']} sweep of k={sweep.k_values[0]}–{sweep.k_values[-1]} "
+            f"on {sweep.report['rows']:,} rows in {sweep.report['seconds']:.2f}s "
+            f"({sweep.report['workers']} worker{'s' if sweep.report['workers'] > 1 else ''})"
+        )
+        
+        # Elbow and silhouette curves over the whole sweep
+        def build_k_curves_figure():
+            fig_k = make_subplots(
+                rows=1, cols=2,
+                subplot_titles=["Inertia (elbow)", "Silhouette score"]
+            )
+            fig_k.add_trace(
+                go.Scatter(x=sweep.curves['k'], y=sweep.curves['inertia'], mode='lines+markers', name='Inertia'),
+                row=1, col=1
+            )
+            fig_k.add_trace(
+                go.Scatter(x=sweep.curves['k'], y=sweep.curves['silhouette'], mode='lines+markers', name='Silhouette'),
+                row=1, col=2
+            )
+            fig_k.add_vline(x=n_clusters, line_dash="dash", line_color="gray")
+            fig_k.update_layout(title="Choosing k", height=350, showlegend=False)
+            return fig_k
+        
+        fig_k = cached_figure(
+            'kmeans_k_curves',
+            build_k_curves_figure,
+            data=(sweep.curves,),
+            style={'n_clusters': n_clusters}
+        )
+        plotly_chart(fig_k, use_container_width=True)
         
         # Add cluster labels to dataframe
         df_clustered = df.copy()
@@ -199,21 +340,26 @@ elif analysis_type == "Clustering Analysis":
         
         # Visualization
         if len(clustering_features) >= 2:
-            fig_cluster = px.scatter(
-                df_clustered,
-                x=clustering_features[0],
-                y=clustering_features[1],
-                color='Cluster',
-                symbol=target_col,
-                title=f'K-Means Clustering (k={n_clusters})',
-                hover_data=clustering_features[2:] if len(clustering_features) > 2 else None
+            fig_cluster = cached_figure(
+                'kmeans_clusters',
+                lambda: scatter(
+                    df_clustered,
+                    x=clustering_features[0],
+                    y=clustering_features[1],
+                    color='Cluster',
+                    symbol=target_col,
+                    title=f'K-Means Clustering (k={n_clusters})',
+                    hover_data=clustering_features[2:] if len(clustering_features) > 2 else None
+                ),
+                data=(df_clustered[clustering_features + ['Cluster', target_col]],),
+                style={'n_clusters': n_clusters}
             )
-            st.plotly_chart(fig_cluster, use_container_width=True)
+            plotly_chart(fig_cluster, use_container_width=True)
         
         # Cluster centers
         st.subheader("🎯 Cluster Centers")
         centers_df = pd.DataFrame(
-            scaler.inverse_transform(kmeans.cluster_centers_),
+            sweep.centers(n_clusters),
             columns=clustering_features,
             index=[f'Cluster {i}' for i in range(n_clusters)]
         )
@@ -229,34 +375,97 @@ else:  # Feature Relationships
     with col2:
         y_feature = st.selectbox("Select Y-axis feature:", feature_names, index=1)
     
-    # Scatter plot with regression
-    fig_scatter = px.scatter(
-        df,
-        x=x_feature,
-        y=y_feature,
-        color=target_col,
-        trendline="ols",
-        title=f'{x_feature} vs {y_feature}',
-        hover_data=feature_names
+    # Precomputed least-squares fits of the selected pair, per class and pooled
+    with span('aggregate'):
+        pair_fits = relationships[
+            (relationships['x'] == x_feature) & (relationships['y'] == y_feature)
+        ].set_index('partition')
+        x_ranges = gram_store.ranges(x_feature)
+    
+    # Scatter plot with per-class trendlines drawn from the fitted coefficients
+    def build_relationship_figure():
+        fig_scatter = scatter(
+            df,
+            x=x_feature,
+            y=y_feature,
+            color=target_col,
+            title=f'{x_feature} vs {y_feature}',
+            hover_data=feature_names
+        )
+        colors = {trace.name: trace.marker.color for trace in fig_scatter.data if trace.mode == 'markers'}
+        for class_name, (x_min, x_max) in x_ranges.iterrows():
+            fit = pair_fits.loc[class_name]
+            fig_scatter.add_trace(go.Scatter(
+                x=[x_min, x_max],
+                y=[fit['intercept'] + fit['slope'] * x_min, fit['intercept'] + fit['slope'] * x_max],
+                mode='lines',
+                line=dict(color=colors.get(str(class_name))),
+                name=f"{class_name} trend",
+                legendgroup=str(class_name),
+                showlegend=False,
+                hovertemplate=(
+                    f"{class_name}<br>y = {fit['slope']:.3g}·x + {fit['intercept']:.3g}"
+                    f"<br>R² = {fit['r2']:.3f}<extra></extra>"
+                )
+            ))
+        return fig_scatter
+    
+    fig_scatter = cached_figure(
+        'feature_scatter',
+        build_relationship_figure,
+        data=(df,),
+        style={'x': x_feature, 'y': y_feature}
     )
-    st.plotly_chart(fig_scatter, use_container_width=True)
+    plotly_chart(fig_scatter, use_container_width=True)
     
     # Statistical summary
     st.subheader("📊 Statistical Summary")
-    correlation = df[x_feature].corr(df[y_feature])
-    st.metric("Pearson Correlation", f"{correlation:.3f}")
+    pooled_fit = pair_fits.loc[POOLED]
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Pearson Correlation", f"{pooled_fit['r']:.3f}")
+    with col2:
+        st.metric("R²", f"{pooled_fit['r2']:.3f}")
+    with col3:
+        st.metric("Slope", f"{pooled_fit['slope']:.3g}")
+    with col4:
+        st.metric("p-value", f"{pooled_fit['p_value']:.2g}")
+    st.dataframe(
+        pair_fits[['n', 'slope', 'intercept', 'r', 'r2', 'p_value']].round(4),
+        use_container_width=True
+    )
+    
+    # Every pair was fitted at load time, so ranking them costs a sort
+    st.subheader("🏆 Strongest Relationships")
+    pooled_fits = relationships[(relationships['partition'] == POOLED) & (relationships['x'] < relationships['y'])]
+    strongest = pooled_fits.reindex(pooled_fits['r'].abs().sort_values(ascending=False).index).head(10)
+    st.dataframe(
+        strongest[['x', 'y', 'r', 'r2', 'p_value']].round(4),
+        use_container_width=True,
+        hide_index=True
+    )
     
-    # Box plots
+    # Box plots from server-side summaries (no raw samples sent)
     st.subheader("📦 Distribution by Class")
+    with span('aggregate'):
+        box_summaries = load_box_summaries(dataset_choice)
     col1, col2 = st.columns(2)
     
     with col1:
-        fig_box1 = px.box(df, x=target_col, y=x_feature, title=f'{x_feature} by Class')
-        st.plotly_chart(fig_box1, use_container_width=True)
+        fig_box1 = cached_figure(
+            'class_box_x',
+            lambda: box_figure(box_summaries, x_feature, title=f'{x_feature} by Class'),
+            data=(dataset_choice, x_feature)
+        )
+        plotly_chart(fig_box1, use_container_width=True, key="class_box_x")
     
     with col2:
-        fig_box2 = px.box(df, x=target_col, y=y_feature, title=f'{y_feature} by Class')
-        st.plotly_chart(fig_box2, use_container_width=True)
+        fig_box2 = cached_figure(
+            'class_box_y',
+            lambda: box_figure(box_summaries, y_feature, title=f'{y_feature} by Class'),
+            data=(dataset_choice, y_feature)
+        )
+        plotly_chart(fig_box2, use_container_width=True, key="class_box_y")
 
 # Raw data display
 st.sidebar.markdown("---")
@@ -266,3 +475,7 @@ if st.sidebar.checkbox("Show Raw Data"):
 
 st.markdown("---")
 st.markdown("**Scientific Data Explorer** | Built with Streamlit & Scikit-learn")
+
+# Rerun timings (shown for the finished rerun, exported when configured)
+TRACER.finish_run()
+show_performance(st.sidebar, 'scientific_explorer')
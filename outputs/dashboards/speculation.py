@@ -0,0 +1,168 @@
+"""
+Speculative Background Precomputation
+=====================================
+
+While the user looks at one view, the analyses they are likely to ask for
+next are computed on a small background thread pool and stored in the
+session's ``AnalysisCache`` under the same keys the page looks up, so that
+switching views becomes a cache hit instead of a wait.
+
+Jobs are scheduled per *scope* (one per browser session) for a *selection*
+(a key describing the current filters). Scheduling for a different selection,
+or calling ``retarget`` with one, cancels the scope's earlier jobs: queued
+jobs never start, and a job already running finishes its computation but
+discards the result. Jobs whose key is already cached are skipped. When the
+page needs a result that is being computed speculatively, ``claim`` waits for
+the running job rather than starting a duplicate, and withdraws a job that
+has not started yet so the page can compute it right away.
+
+Speculation is capped in two ways. The pool has ``max_workers`` threads
+shared by all sessions, and after each job a worker pauses long enough to
+keep its busy share at ``cpu_fraction``. Threads are used rather than
+processes because results must land in the in-process cache, and the heavy
+lifting (NumPy, scikit-learn) releases the GIL.
+
+Usage:
+    SPECULATOR.retarget(scope, selection)          # early in the rerun
+    ...
+    SPECULATOR.schedule(scope, selection, cache, [
+        (pca_key, run_pca, (frame, 3, 'auto', features)),
+        (corr_key, frame[features].corr, ()),
+    ])
+    result = cache.get(pca_key)
+    if result is None and SPECULATOR.claim(scope, pca_key):
+        result = cache.get(pca_key)   # None if the job failed or was discarded
+    SPECULATOR.stats(scope)   # {'scheduled': ..., 'completed': ..., 'pending': ...}
+
+Configuration (environment variables):
+    DASHBOARD_SPECULATION_WORKERS   background threads shared by all sessions (default: 1)
+    DASHBOARD_SPECULATION_CPU       busy fraction allowed per worker, 0-1 (default: 0.5)
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_WORKERS = int(os.environ.get('DASHBOARD_SPECULATION_WORKERS', '1'))
+DEFAULT_CPU_FRACTION = float(os.environ.get('DASHBOARD_SPECULATION_CPU', '0.5'))
+MAX_PAUSE = 5.0   # seconds; longest pause a worker takes after one job
+COUNTERS = ('scheduled', 'completed', 'skipped', 'cancelled', 'discarded', 'failed')
+
+
+class _Scope:
+    """Speculative jobs of one session for its current selection."""
+
+    def __init__(self, selection):
+        self.selection = selection
+        self.cancelled = threading.Event()
+        self.futures = {}   # cache key -> Future
+        self.finished = {}  # cache key -> Event set once the computation is over
+        self.counts = dict.fromkeys(COUNTERS, 0)
+
+
+class Speculator:
+    """Background pool filling analysis caches ahead of the user."""
+
+    def __init__(self, max_workers=DEFAULT_WORKERS, cpu_fraction=DEFAULT_CPU_FRACTION):
+        if not 0 < cpu_fraction <= 1:
+            raise ValueError(f"cpu_fraction must be in (0, 1], got {cpu_fraction!r}")
+        self.max_workers = max_workers
+        self.cpu_fraction = cpu_fraction
+        self._executor = None
+        self._scopes = {}
+        self._lock = threading.Lock()
+
+    def _pool(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix='speculate')
+        return self._executor
+
+    def _cancel(self, state):
+        state.cancelled.set()
+        for future in state.futures.values():
+            if not future.cancelled() and future.cancel():
+                state.counts['cancelled'] += 1
+
+    def retarget(self, scope, selection):
+        """Cancel the scope's jobs unless they were scheduled for ``selection``."""
+        with self._lock:
+            state = self._scopes.get(scope)
+            if state is not None and state.selection != selection:
+                self._cancel(state)
+
+    def cancel(self, scope):
+        """Cancel all of the scope's jobs."""
+        with self._lock:
+            state = self._scopes.get(scope)
+            if state is not None:
+                self._cancel(state)
+
+    def schedule(self, scope, selection, cache, jobs):
+        """Queue ``(key, func, args)`` jobs whose results go to ``cache[key]``."""
+        with self._lock:
+            state = self._scopes.get(scope)
+            if state is None or state.selection != selection or state.cancelled.is_set():
+                if state is not None:
+                    self._cancel(state)
+                counts = state.counts if state is not None else None
+                state = self._scopes[scope] = _Scope(selection)
+                if counts is not None:
+                    state.counts = counts
+            for key, func, args in jobs:
+                running = state.futures.get(key)
+                if key in cache or (running is not None and not running.done()):
+                    continue
+                state.finished[key] = threading.Event()
+                state.futures[key] = self._pool().submit(self._run, state, cache, key, func, args)
+                state.counts['scheduled'] += 1
+
+    def claim(self, scope, key):
+        """Wait for a running job for ``key`` (True once it is over); withdraw a queued one."""
+        with self._lock:
+            state = self._scopes.get(scope)
+            future = state.futures.get(key) if state is not None and not state.cancelled.is_set() else None
+            if future is None or future.cancel():
+                if future is not None:
+                    state.counts['cancelled'] += 1
+                return False
+        state.finished[key].wait()
+        return True
+
+    def _run(self, state, cache, key, func, args):
+        try:
+            if state.cancelled.is_set():
+                return self._count(state, 'cancelled')
+            if key in cache:
+                return self._count(state, 'skipped')
+            start = time.perf_counter()
+            try:
+                value = func(*args)
+            except Exception:
+                # The page computes the same analysis itself and surfaces the error there
+                return self._count(state, 'failed')
+            elapsed = time.perf_counter() - start
+            stored = not state.cancelled.is_set() and cache.put(key, value)
+            self._count(state, 'completed' if stored else 'discarded')
+        finally:
+            state.finished[key].set()
+        # Idle long enough to keep this worker's busy share at cpu_fraction
+        state.cancelled.wait(min(elapsed * (1 / self.cpu_fraction - 1), MAX_PAUSE))
+        return stored
+
+    def _count(self, state, counter):
+        with self._lock:
+            state.counts[counter] += 1
+        return False
+
+    def stats(self, scope):
+        """Job counters of a scope plus its number of unfinished jobs."""
+        with self._lock:
+            state = self._scopes.get(scope)
+            if state is None:
+                return {**dict.fromkeys(COUNTERS, 0), 'pending': 0}
+            pending = sum(not future.done() for future in state.futures.values())
+            return {**state.counts, 'pending': pending}
+
+
+SPECULATOR = Speculator()
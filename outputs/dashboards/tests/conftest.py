@@ -0,0 +1,15 @@
+import os
+import sys
+
+import pytest
+
+# The dashboard modules import each other as top-level modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def sales():
+    """Small time-sorted sales table with several transactions per day."""
+    from sales_generator import generate_sales_data
+
+    return generate_sales_data(start='2024-01-01', end='2024-03-31', transactions_per_day=4, n_reps=5, seed=7)
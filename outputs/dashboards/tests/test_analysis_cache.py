@@ -0,0 +1,59 @@
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis_cache import AnalysisCache, entry_size
+
+
+def _frame(rows):
+    return pd.DataFrame({'value': np.arange(rows, dtype=float), 'label': ['x'] * rows})
+
+
+def test_entry_size_matches_memory_usage():
+    frame = _frame(1000)
+    assert entry_size(frame) == frame.memory_usage(index=True, deep=True).sum()
+    values = frame['value'].to_numpy()
+    assert entry_size((frame, values)) == sys.getsizeof((frame, values)) + entry_size(frame) + values.nbytes
+
+
+def test_hit_returns_the_stored_result(sales):
+    cache = AnalysisCache()
+    summary = sales.groupby('region', observed=True)['sales'].agg(['sum', 'mean'])
+    cache.put('summary', summary)
+    expected = sales.groupby('region', observed=True)['sales'].agg(['sum', 'mean'])
+    pd.testing.assert_frame_equal(cache.get('summary'), expected)
+    assert cache.stats()['hits'] == 1
+
+
+@pytest.mark.parametrize('policy', ['lru', 'lfu'])
+def test_eviction_stays_within_budget(policy):
+    frame = _frame(1000)
+    cache = AnalysisCache(max_bytes=2.5 * entry_size(frame), policy=policy)
+    cache.put('a', frame)
+    cache.put('b', frame)
+    cache.get('a')          # 'a' is now both more recent and more frequent than 'b'
+    cache.put('c', frame)
+    assert cache.get('a') is frame and cache.get('b') is None
+    assert cache.stats()['bytes'] <= cache.max_bytes and cache.evictions == 1
+
+
+def test_lfu_keeps_frequent_entries_over_recent_ones():
+    frame = _frame(1000)
+    cache = AnalysisCache(max_bytes=2.5 * entry_size(frame), policy='lfu')
+    cache.put('a', frame)
+    for _ in range(3):
+        cache.get('a')
+    cache.put('b', frame)
+    cache.put('c', frame)
+    assert cache.get('a') is frame and cache.get('b') is None
+
+
+def test_expired_entries_are_misses(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr('analysis_cache.time.monotonic', lambda: clock[0])
+    cache = AnalysisCache(ttl=10)
+    cache.put('a', 1)
+    clock[0] += 11
+    assert cache.get('a') is None and cache.expirations == 1
@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+from bitmap_index import BitmapIndex
+
+
+@pytest.fixture
+def frame(sales):
+    # Object-dtype strings with missing values, as the dashboards' original filters saw them
+    frame = sales.astype({'region': object, 'product': object})
+    frame.loc[::13, 'region'] = None
+    return frame
+
+
+@pytest.mark.parametrize('selections', [
+    {'region': ['North', 'East']},
+    {'region': ['South'], 'product': ['Product A', 'Product D']},
+    {'region': [], 'product': ['Product B']},
+    {'product': ['Product Z']},
+])
+def test_mask_matches_isin(frame, selections):
+    index = BitmapIndex(frame, ['region', 'product'])
+    expected = np.ones(len(frame), dtype=bool)
+    for column, wanted in selections.items():
+        expected &= frame[column].isin(wanted).to_numpy()
+    np.testing.assert_array_equal(index.mask(**selections), expected)
+    assert index.count(**selections) == expected.sum()
+    np.testing.assert_array_equal(index.mask_range(100, 250, **selections), expected[100:250])
+
+
+def test_values_lists_distinct_members(frame):
+    index = BitmapIndex(frame, ['region', 'product'])
+    assert sorted(index.values('product')) == sorted(frame['product'].dropna().unique())
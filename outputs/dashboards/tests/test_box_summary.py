@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from box_summary import BoxSummary
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(6)
+    return pd.DataFrame({
+        'value': np.concatenate([rng.normal(size=400), rng.standard_t(3, size=5000)]),
+        'group': ['small'] * 400 + ['large'] * 5000,
+    })
+
+
+def test_exact_summary_matches_pandas(frame):
+    summary = BoxSummary.build(frame, ['value'], 'group', exact_max_rows=10000)
+    for name, values in frame.groupby('group')['value']:
+        stats = summary.stats('value', name)
+        q1, median, q3 = values.quantile([0.25, 0.5, 0.75])
+        assert (stats['q1'], stats['median'], stats['q3']) == pytest.approx((q1, median, q3))
+        inside = values.between(q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1))
+        assert stats['lowerfence'] == values[inside].min() and stats['upperfence'] == values[inside].max()
+        assert stats['n_outliers'] == (~inside).sum()
+        assert stats['mean'] == pytest.approx(values.mean()) and stats['sd'] == pytest.approx(values.std())
+
+
+def test_large_groups_use_a_digest_close_to_pandas(frame):
+    summary = BoxSummary.build(frame, ['value'], 'group', exact_max_rows=1000, max_outliers=20)
+    stats = summary.stats('value', 'large')
+    values = np.sort(frame.loc[frame['group'] == 'large', 'value'].to_numpy())
+    assert stats['method'] == 't-digest'
+    for q, estimate in zip((0.25, 0.5, 0.75), (stats['q1'], stats['median'], stats['q3'])):
+        assert abs(np.searchsorted(values, estimate) / len(values) - q) < 0.01
+    assert len(stats['outliers']) <= 20
+    assert summary.stats('value', 'small')['method'] == 'exact'
@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from compact_dtypes import compact_frame, precision_check
+from disk_cache import DiskCache, disk_cached
+from sales_generator import generate_sales_data
+
+
+def _sales(compact=False):
+    sales = generate_sales_data(start='2024-01-01', end='2024-01-31', transactions_per_day=5)
+    sales['region'] = sales['region'].astype(str)
+    return compact_frame(sales) if compact else sales
+
+
+def test_compact_frame_narrows_floats_strings_and_integers():
+    df = pd.DataFrame({
+        'value': np.linspace(0, 1, 100),
+        'label': ['a', 'b'] * 50,
+        'count': np.arange(100, dtype=np.int64),
+    })
+    compact = compact_frame(df)
+    assert compact['value'].dtype == np.float32
+    assert isinstance(compact['label'].dtype, pd.CategoricalDtype)
+    assert compact['count'].dtype == np.uint8
+    pd.testing.assert_series_equal(compact['label'].astype(str), df['label'])
+    assert precision_check(df, compact, ['value', 'count'], n_components=1)['passed'].all()
+
+
+def test_cached_loader_returns_compact_dtypes_after_a_full_precision_entry(tmp_path):
+    pytest.importorskip('pyarrow')
+    load = disk_cached(_sales, cache=DiskCache(tmp_path))
+    assert load()['sales'].dtype == np.float64
+    compact = load(compact=True)
+    assert compact['sales'].dtype == np.float32
+    assert isinstance(compact['region'].dtype, pd.CategoricalDtype)
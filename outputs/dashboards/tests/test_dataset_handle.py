@@ -0,0 +1,34 @@
+import pandas as pd
+import pytest
+
+from dataset_handle import DatasetHandle, cache_on_handles
+
+pytest.importorskip('streamlit')
+
+
+def test_cached_results_follow_handle_versions(sales):
+    calls = []
+
+    @cache_on_handles
+    def regional_totals(data):
+        calls.append(1)
+        return data.frame.groupby('region', observed=True)['sales'].sum()
+
+    head = sales.iloc[:200]
+    handle = DatasetHandle(head.reset_index(drop=True), 'test_cached_results_follow_handle_versions')
+    pd.testing.assert_series_equal(regional_totals(handle), head.groupby('region', observed=True)['sales'].sum())
+    regional_totals(DatasetHandle(handle.frame.copy(), handle.source))   # same provenance: cache hit
+    assert len(calls) == 1
+
+    handle.append(sales.iloc[200:])
+    pd.testing.assert_series_equal(regional_totals(handle), sales.groupby('region', observed=True)['sales'].sum())
+    assert len(calls) == 2
+
+
+def test_derived_fingerprints_depend_on_parent_and_key(sales):
+    handle = DatasetHandle(sales, 'sales')
+    first = handle.derive(('columns', ('sales',)), sales[['sales']])
+    assert first.fingerprint == handle.derive(('columns', ('sales',)), sales[['sales']]).fingerprint
+    assert first.fingerprint != handle.derive(('columns', ('date',)), sales[['date']]).fingerprint
+    handle.replace(sales.iloc[:10])
+    assert first.fingerprint != handle.derive(('columns', ('sales',)), handle.frame[['sales']]).fingerprint
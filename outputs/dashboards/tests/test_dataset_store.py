@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from dataset_store import DatasetStore
+
+
+def _load(sales):
+    return sales.astype({'region': str})
+
+
+@pytest.mark.parametrize('memory_map', [True, False])
+def test_shared_frame_matches_loader_output(sales, tmp_path, memory_map):
+    if memory_map:
+        pytest.importorskip('pyarrow')
+    store = DatasetStore(tmp_path, memory_map=memory_map)
+    handle = store.get('sales', _load, sales)
+    expected = _load(sales)
+    pd.testing.assert_frame_equal(handle.frame, expected, check_dtype=False, check_categorical=False)
+    assert store.get('sales', _load, sales) is handle
+    assert not handle.frame['sales'].to_numpy().flags.writeable
+    with pytest.raises(ValueError):
+        handle.frame['sales'].to_numpy()[0] = 0.0
+    np.testing.assert_allclose(handle.frame.groupby('region')['sales'].sum(),
+                               expected.groupby('region')['sales'].sum())
+
+
+def test_rebuilt_file_replaces_the_superseded_one(sales, tmp_path, monkeypatch):
+    pytest.importorskip('pyarrow')
+    DatasetStore(tmp_path).get('sales', _load, sales)
+    DatasetStore(tmp_path).get('other', _load, sales)
+    monkeypatch.setattr('dataset_store.chain_hash', lambda loader: 'edited')
+    DatasetStore(tmp_path).get('sales', _load, sales)
+    assert len(list(tmp_path.glob('*.arrow'))) == 2
+    assert len(list(tmp_path.glob('*-edited.arrow'))) == 1
@@ -0,0 +1,51 @@
+import importlib
+import sys
+
+import pandas as pd
+import pytest
+
+from disk_cache import DiskCache, disk_cached
+
+pytest.importorskip('pyarrow')
+
+LOADER_SOURCE = '''
+import pandas as pd
+
+FLAG = {flag}
+
+
+def helper():
+    return {value}
+
+
+def load(compact=FLAG):
+    return pd.DataFrame({{'value': [helper()], 'compact': [compact]}})
+'''
+
+
+def _load_module(tmp_path, monkeypatch, flag=False, value=1.0):
+    (tmp_path / 'loader_module.py').write_text(LOADER_SOURCE.format(flag=flag, value=value))
+    monkeypatch.syspath_prepend(str(tmp_path))
+    sys.modules.pop('loader_module', None)
+    importlib.invalidate_caches()
+    return importlib.import_module('loader_module')
+
+
+def test_key_includes_unpassed_defaults(tmp_path, monkeypatch):
+    cache = DiskCache(tmp_path / 'cache')
+    plain = disk_cached(_load_module(tmp_path, monkeypatch, flag=False).load, cache=cache)
+    assert not plain()['compact'].iloc[0]
+    flipped = disk_cached(_load_module(tmp_path, monkeypatch, flag=True).load, cache=cache)
+    assert flipped()['compact'].iloc[0]
+    # Passing the default explicitly hits the same entry
+    assert len(cache.entries()) == 2
+    flipped(True)
+    assert len(cache.entries()) == 2
+
+
+def test_editing_a_helper_invalidates_entries(tmp_path, monkeypatch):
+    cache = DiskCache(tmp_path / 'cache')
+    first = disk_cached(_load_module(tmp_path, monkeypatch, value=1.0).load, cache=cache)
+    pd.testing.assert_series_equal(first()['value'], pd.Series([1.0], name='value'))
+    edited = disk_cached(_load_module(tmp_path, monkeypatch, value=2.0).load, cache=cache)
+    pd.testing.assert_series_equal(edited()['value'], pd.Series([2.0], name='value'))
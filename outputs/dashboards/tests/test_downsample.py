@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from downsample import downsample
+
+
+@pytest.fixture
+def series():
+    rng = np.random.default_rng(3)
+    y = np.cumsum(rng.normal(size=20000))
+    y[12345] += 80   # a one-point spike
+    return pd.DataFrame({'date': pd.date_range('2024-01-01', periods=len(y), freq='min'), 'value': y})
+
+
+@pytest.mark.parametrize('method', ['lttb', 'minmax'])
+def test_points_are_original_rows_within_budget(series, method):
+    thinned = downsample(series, 'date', 'value', max_points=500, method=method)
+    assert len(thinned) <= 500
+    pd.testing.assert_frame_equal(thinned, series.loc[thinned.index])
+    assert thinned.index[0] == 0 and thinned.index[-1] == len(series) - 1
+
+
+def test_minmax_keeps_every_extreme(series):
+    thinned = downsample(series, 'date', 'value', max_points=500, method='minmax')
+    assert thinned['value'].max() == series['value'].max()
+    assert thinned['value'].min() == series['value'].min()
+
+
+def test_zoomed_window_matches_date_mask_at_full_detail(series):
+    start, end = series['date'].iloc[5000], series['date'].iloc[5400]
+    zoomed = downsample(series, 'date', 'value', max_points=2000, x_range=(start, end))
+    pd.testing.assert_frame_equal(zoomed, series[series['date'].between(start, end)])
@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+import figure_cache
+from figure_cache import FigureCache, cached_figure
+
+
+def _daily():
+    return pd.DataFrame({'date': pd.date_range('2024-01-01', periods=30), 'sales': np.arange(30.0)})
+
+
+def test_hit_skips_build_and_encode(monkeypatch):
+    cache = FigureCache()
+    daily = _daily()
+    builds, encodes = [], []
+    compact = figure_cache.compact_figure
+    monkeypatch.setattr(figure_cache, 'compact_figure', lambda fig, **kw: encodes.append(1) or compact(fig, **kw))
+
+    def build():
+        builds.append(1)
+        return px.line(daily, x='date', y='sales')
+
+    first = cached_figure('trend', build, data=(daily,), cache=cache)
+    second = cached_figure('trend', build, data=(_daily(),), cache=cache)
+    assert second is first
+    assert (len(builds), len(encodes), cache.hits) == (1, 1, 1)
+    assert first.layout.xaxis.type == 'date'
+    np.testing.assert_allclose(first.data[0].x[:2], [1704067200000.0, 1704153600000.0])
+
+
+def test_copy_is_private():
+    cache = FigureCache()
+    daily = _daily()
+    build = lambda: px.line(daily, x='date', y='sales')
+    private = cached_figure('trend', build, data=(daily,), cache=cache, copy=True)
+    private.update_layout(title='mine')
+    assert cached_figure('trend', build, data=(daily,), cache=cache).layout.title.text is None
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import filter_engine
+from filter_engine import FilterEngine
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'x': rng.normal(size=5000),
+        'y': rng.uniform(0, 10, 5000).astype(np.float32),
+        'category': rng.choice(['A', 'B', 'C'], 5000),
+    })
+    df.loc[::97, 'category'] = None
+    return df
+
+
+def _pandas_rows(df, ranges, members):
+    mask = pd.Series(True, index=df.index)
+    for column, (lo, hi) in ranges.items():
+        mask &= df[column].between(lo, hi)
+    for column, wanted in members.items():
+        mask &= df[column].isin(wanted)
+    return np.flatnonzero(mask.to_numpy())
+
+
+@pytest.mark.parametrize('threshold, strategy', [(-1.0, 'fused'), (1.0, 'compacting')])
+def test_numpy_paths_match_pandas_mask(frame, monkeypatch, threshold, strategy):
+    monkeypatch.setattr(filter_engine, 'numexpr', None)
+    monkeypatch.setattr(filter_engine, 'COMPACT_THRESHOLD', threshold)
+    monkeypatch.setattr(filter_engine, 'BLOCK_ROWS', 700)   # several blocks, ragged last one
+    engine = FilterEngine(frame)
+    for ranges, members in [
+        ({'x': (-1.0, 1.5), 'y': (2.0, 9.0)}, {'category': ['A', 'C']}),
+        ({'x': (-0.5, 0.5)}, {}),
+        ({}, {'category': []}),
+    ]:
+        rows = engine.rows(ranges=ranges, members=members)
+        np.testing.assert_array_equal(rows, _pandas_rows(frame, ranges, members))
+        assert engine.last_plan['strategy'] == strategy
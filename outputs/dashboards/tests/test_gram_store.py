@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from gram_store import POOLED, GramStore
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(size=(200, 3)), columns=['a', 'b', 'c'])
+    df['b'] += 2 * df['a']
+    df['label'] = rng.choice(['x', 'y'], size=len(df))
+    return df
+
+
+def test_regressions_match_per_class_fits(frame):
+    fits = GramStore.build(frame, ['a', 'b', 'c'], 'label').regressions().set_index(['x', 'y', 'partition'])
+    for label, group in frame.groupby('label'):
+        slope, intercept = np.polyfit(group['a'], group['b'], 1)
+        fit = fits.loc[('a', 'b', label)]
+        assert fit['slope'] == pytest.approx(slope)
+        assert fit['intercept'] == pytest.approx(intercept)
+        assert fit['r'] == pytest.approx(group['a'].corr(group['b']))
+
+
+def test_regressions_include_identity_fit_of_a_feature_on_itself(frame):
+    fits = GramStore.build(frame, ['a', 'b', 'c'], 'label').regressions()
+    same = fits[(fits['x'] == 'b') & (fits['y'] == 'b')].set_index('partition')
+    assert set(same.index) == {'x', 'y', POOLED}
+    assert (same['slope'] == 1.0).all()
+    assert (same['intercept'] == 0.0).all()
+    assert (same['r'] == 1.0).all()
+
+
+def test_ranges_match_per_class_min_max(frame):
+    store = GramStore.build(frame.iloc[:100], ['a', 'b', 'c'], 'label')
+    store.append(frame.iloc[100:])
+    expected = frame.groupby('label')['c'].agg(['min', 'max'])
+    pd.testing.assert_frame_equal(store.ranges('c'), expected, check_names=False)
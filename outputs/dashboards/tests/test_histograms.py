@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from histograms import HistogramSet
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(5)
+    df = pd.DataFrame({
+        'a': rng.normal(size=3000),
+        'b': rng.gamma(2.0, size=3000),
+        'species': rng.choice(['x', 'y', 'z'], size=3000),
+    })
+    df.loc[::50, 'a'] = np.nan
+    return df
+
+
+@pytest.mark.parametrize('feature', ['a', 'b'])
+def test_counts_match_pandas_cut(frame, feature):
+    histograms = HistogramSet.build(frame, ['a', 'b'], 'species', bins=20)
+    edges = histograms.edges[histograms.features.index(feature)]
+    binned = pd.cut(frame[feature], edges, include_lowest=True)
+    expected = pd.crosstab(frame['species'], binned, dropna=False).reindex(columns=binned.cat.categories, fill_value=0)
+    np.testing.assert_array_equal(histograms.counts(feature), expected.to_numpy())
+    np.testing.assert_allclose(histograms.centers(feature), (edges[:-1] + edges[1:]) / 2)
+
+
+def test_kde_mass_stays_within_observed_range(frame):
+    histograms = HistogramSet.build(frame, ['a', 'b'], 'species')
+    grid, density = histograms.kde('a')
+    mass = density.sum(axis=1) * (grid[1] - grid[0])
+    # Density beyond the extreme values is not drawn, so a little mass is cut off
+    assert ((mass > 0.95) & (mass <= 1.0 + 1e-9)).all()
+    _, scaled = histograms.kde('a', scale='counts')
+    np.testing.assert_allclose(scaled.sum(axis=1) / histograms.oversample, mass * histograms.class_sizes[0])
@@ -0,0 +1,41 @@
+import re
+
+import pytest
+
+from instrumentation import Tracer
+
+
+def _metric(text, name, span_path):
+    match = re.search(rf'^{name}{{dashboard="demo",span="{re.escape(span_path)}"}} (\S+)$', text, re.M)
+    return float(match.group(1))
+
+
+def _rerun(tracer, spans):
+    tracer.start_run('demo')
+    for _ in range(spans):
+        with tracer.span('filter'):
+            pass
+    return tracer.finish_run()
+
+
+def test_summary_sum_and_count_survive_history_eviction():
+    tracer = Tracer(history=2)
+    records = [_rerun(tracer, spans) for spans in (1, 2, 3, 1)]
+    assert len(tracer.runs['demo']) == 2
+    text = tracer.prometheus_text()
+    assert _metric(text, 'dashboard_span_seconds_count', '(rerun)') == 4
+    assert _metric(text, 'dashboard_span_seconds_count', 'filter') == 4
+    assert _metric(text, 'dashboard_span_seconds_sum', '(rerun)') == pytest.approx(
+        sum(record['seconds'] for record in records), abs=1e-5)
+    filter_seconds = sum(s['seconds'] for record in records for s in record['spans'])
+    assert _metric(text, 'dashboard_span_seconds_sum', 'filter') == pytest.approx(filter_seconds, abs=1e-5)
+
+
+def test_counts_never_decrease_between_exports():
+    tracer = Tracer(history=1)
+    previous = 0
+    for _ in range(5):
+        _rerun(tracer, 1)
+        count = _metric(tracer.prometheus_text(), 'dashboard_span_seconds_count', 'filter')
+        assert count == previous + 1
+        previous = count
@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from moving_stats import MovingStats
+
+
+@pytest.mark.parametrize('window', [1, 7, 30, 91, 200])
+def test_means_and_stds_match_rolling(sales, window):
+    daily = sales.groupby('date')['sales'].sum()
+    stats = MovingStats(daily)
+    rolling = daily.rolling(window)
+    np.testing.assert_allclose(stats.mean(window), rolling.mean().to_numpy(), rtol=1e-9, equal_nan=True)
+    np.testing.assert_allclose(stats.std(window), rolling.std().to_numpy(), rtol=1e-7, atol=1e-9, equal_nan=True)
+
+
+def test_bollinger_bands(sales):
+    daily = sales.groupby('date')['sales'].sum()
+    middle, upper, lower = MovingStats(daily).bollinger(20, k=2)
+    rolling = daily.rolling(20)
+    np.testing.assert_allclose(upper, (rolling.mean() + 2 * rolling.std()).to_numpy(), rtol=1e-9, equal_nan=True)
+    np.testing.assert_allclose(lower, (rolling.mean() - 2 * rolling.std()).to_numpy(), rtol=1e-9, equal_nan=True)
+
+
+def test_rejects_empty_windows():
+    with pytest.raises(ValueError):
+        MovingStats(pd.Series([1.0, 2.0])).mean(0)
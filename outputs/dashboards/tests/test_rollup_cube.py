@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from rollup_cube import RollupCube
+
+SELECTION = {'date_range': (pd.Timestamp('2024-01-10'), pd.Timestamp('2024-02-20')),
+             'region': ['North', 'West'], 'product': ['Product A', 'Product C', 'Product D']}
+
+
+def _filtered(sales):
+    start, end = SELECTION['date_range']
+    return sales[sales['date'].between(start, end)
+                 & sales['region'].isin(SELECTION['region'])
+                 & sales['product'].isin(SELECTION['product'])]
+
+
+def test_totals_match_pandas(sales):
+    totals = RollupCube.build(sales).select(**SELECTION).totals()
+    rows = _filtered(sales)['sales']
+    assert totals['sum'] == pytest.approx(rows.sum())
+    assert totals['count'] == len(rows)
+    assert totals['mean'] == pytest.approx(rows.mean())
+    assert totals['std'] == pytest.approx(rows.std())
+    assert totals['max'] == pytest.approx(rows.max())
+
+
+@pytest.mark.parametrize('by', ['product', 'sales_rep', 'date'])
+def test_rollup_matches_groupby(sales, by):
+    rollup = RollupCube.build(sales).select(**SELECTION).rollup(by).set_index(by)
+    expected = _filtered(sales).groupby(by, observed=True)['sales'].agg(['sum', 'count', 'mean', 'std', 'max'])
+    pd.testing.assert_frame_equal(rollup[expected.columns], expected, check_dtype=False,
+                                  check_index_type=False, check_categorical=False, rtol=1e-9)
+
+
+def test_empty_selection(sales):
+    totals = RollupCube.build(sales).select(region=[]).totals()
+    assert totals['count'] == 0 and np.isnan(totals['mean'])
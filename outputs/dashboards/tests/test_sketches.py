@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from sketches import PartitionedSummary, TDigest
+
+DATES = (pd.Timestamp('2024-01-20'), pd.Timestamp('2024-03-10'))
+
+
+def _filtered(sales):
+    return sales[sales['date'].between(*DATES) & sales['region'].isin(['North', 'South'])]
+
+
+def test_describe_matches_pandas(sales):
+    view = PartitionedSummary.build(sales).select(date_range=DATES, region=['North', 'South'])
+    described = view.describe()
+    expected = _filtered(sales)['sales'].describe()
+    exact = ['count', 'mean', 'std', 'min', 'max']
+    np.testing.assert_allclose(described[exact], expected[exact], rtol=1e-9)
+    # Quartiles are approximate: compare by rank, not by value
+    values = np.sort(_filtered(sales)['sales'].to_numpy())
+    for label, q in [('25%', 0.25), ('50%', 0.5), ('75%', 0.75)]:
+        rank = np.searchsorted(values, described[label]) / len(values)
+        assert abs(rank - q) < 0.02
+
+
+def test_grouped_moments_match_groupby(sales):
+    view = PartitionedSummary.build(sales).select(date_range=DATES)
+    grouped = view.grouped_moments('product')
+    expected = sales[sales['date'].between(*DATES)].groupby('product', observed=True)['sales'].agg(
+        ['count', 'mean', 'std', 'min', 'max'])
+    pd.testing.assert_frame_equal(grouped, expected, check_dtype=False, check_index_type=False,
+                                  check_categorical=False, rtol=1e-9)
+
+
+def test_empty_selection_keeps_columns(sales):
+    grouped = PartitionedSummary.build(sales).select(region=[]).grouped_moments('region')
+    assert grouped.empty and list(grouped.columns) == ['count', 'mean', 'std', 'min', 'max']
+
+
+def test_merged_digests_track_quantiles():
+    rng = np.random.default_rng(4)
+    left, right = rng.exponential(size=20000), rng.normal(5, 1, size=20000)
+    merged = TDigest.from_values(left).merge(TDigest.from_values(right))
+    both = np.concatenate([left, right])
+    for q in (0.01, 0.5, 0.99):
+        assert merged.quantile([q])[0] == pytest.approx(np.quantile(both, q), rel=0.02)
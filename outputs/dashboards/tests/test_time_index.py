@@ -0,0 +1,29 @@
+import pandas as pd
+import pytest
+
+from time_index import TimeIndex, sort_by_time
+
+
+@pytest.mark.parametrize('start, end', [
+    ('2024-01-15', '2024-02-10'),
+    ('2023-12-01', '2024-01-03'),
+    (None, '2024-03-01'),
+    ('2024-03-31', None),
+    ('2024-02-10', '2024-02-01'),
+])
+def test_slice_matches_boolean_mask(sales, start, end):
+    shuffled = sales.sample(frac=1, random_state=0)
+    ordered = sort_by_time(shuffled, 'date')
+    window = TimeIndex(ordered, 'date').slice(start, end)
+
+    mask = pd.Series(True, index=ordered.index)
+    if start is not None:
+        mask &= ordered['date'] >= pd.Timestamp(start)
+    if end is not None:
+        mask &= ordered['date'] <= pd.Timestamp(end)
+    pd.testing.assert_frame_equal(window, ordered[mask])
+
+
+def test_sort_by_time_keeps_sorted_frames():
+    ordered = pd.DataFrame({'date': pd.date_range('2024-01-01', periods=5)})
+    assert sort_by_time(ordered) is ordered
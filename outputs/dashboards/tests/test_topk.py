@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+
+from topk import Leaderboard, SpaceSaving, top_k
+
+
+def test_top_k_matches_full_sort():
+    frame = pd.DataFrame({'sum': np.random.default_rng(0).permutation(50).astype(float)})
+    assert top_k(frame, 'sum', k=5)['sum'].tolist() == [49.0, 48.0, 47.0, 46.0, 45.0]
+
+
+def test_merge_of_disjoint_heavy_hitters_keeps_upper_bounds():
+    left = SpaceSaving(capacity=4)
+    left.update(['a'] * 10 + ['c'] * 9 + ['d', 'e'])
+    # 'c' is evicted from the smaller right summary, whose floor becomes 8
+    right = SpaceSaving(capacity=2)
+    right.update(['y'] * 10 + ['z'] * 8 + ['c'] * 3)
+    assert 'c' not in right.counts.index and right.floor == 8
+
+    left.merge(right)
+
+    truth = {'a': 10, 'c': 12, 'd': 1, 'e': 1, 'y': 10, 'z': 8}
+    board = left.top(4)
+    for key, row in board.iterrows():
+        assert row['guaranteed'] <= truth[key] <= row['count']
+    assert left.total_weight == sum(truth.values())
+
+
+def test_leaderboard_catch_up_matches_groupby_on_a_growing_table():
+    rng = np.random.default_rng(2)
+    table = pd.DataFrame({'rep': rng.choice([f'Rep {i}' for i in range(30)], 3000),
+                          'sales': rng.uniform(0, 100, 3000)})
+    board = Leaderboard('rep', 'sales', capacity=50)
+    for stop in (1000, 1000, 2500, 3000):
+        board.catch_up(table.iloc[:stop])
+    assert board.rows == len(table)
+
+    expected = table.groupby('rep')['sales'].sum().nlargest(5)
+    top = board.top(5).set_index('rep')
+    assert list(top.index) == list(expected.index)
+    np.testing.assert_allclose(top['sales'], expected.to_numpy())
+    assert (top['error'] == 0).all()
+
+    board.catch_up(table.iloc[:10])   # replaced by a shorter table: start over
+    assert board.rows == 10
@@ -0,0 +1,55 @@
+"""
+Sorted Time Index for Date-Range Filters
+========================================
+
+Keeps datasets ordered by timestamp so that a date-range filter becomes two
+binary searches (``searchsorted``) and a positional ``iloc`` slice, instead of
+two full-column comparisons. Other filters are then evaluated only on the
+rows inside the slice.
+
+Usage:
+    df = sort_by_time(df, 'date')
+    index = TimeIndex(df, 'date')
+    lo, hi = index.bounds(start, end)   # rows lo..hi-1 fall inside [start, end]
+    window = index.slice(start, end)    # df.iloc[lo:hi]
+"""
+
+import pandas as pd
+
+
+def sort_by_time(df, column='date'):
+    """Return ``df`` ordered by ``column`` (no copy when it already is)."""
+    if df[column].is_monotonic_increasing:
+        return df
+    return df.sort_values(column, kind='stable').reset_index(drop=True)
+
+
+def date_bounds(timestamps, start=None, end=None):
+    """Positional bounds ``[lo, hi)`` of the inclusive range ``[start, end]``.
+
+    ``timestamps`` must be sorted ascending; ``None`` leaves that side open.
+    """
+    timestamps = pd.DatetimeIndex(timestamps)
+    lo = 0 if start is None else int(timestamps.searchsorted(pd.Timestamp(start), side='left'))
+    hi = len(timestamps) if end is None else int(timestamps.searchsorted(pd.Timestamp(end), side='right'))
+    return lo, max(lo, hi)
+
+
+class TimeIndex:
+    """Binary-search date-range lookups over a time-sorted dataframe."""
+
+    def __init__(self, df, column='date'):
+        if not df[column].is_monotonic_increasing:
+            raise ValueError(f"Column {column!r} must be sorted; use sort_by_time() first")
+        self.df = df
+        self.column = column
+        self.timestamps = pd.DatetimeIndex(df[column])
+
+    def bounds(self, start=None, end=None):
+        """Positional bounds ``[lo, hi)`` of rows with ``start <= ts <= end``."""
+        return date_bounds(self.timestamps, start, end)
+
+    def slice(self, start=None, end=None):
+        """Rows inside the inclusive range, as a positional slice of the frame."""
+        lo, hi = self.bounds(start, end)
+        return self.df.iloc[lo:hi]
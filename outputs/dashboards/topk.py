@@ -0,0 +1,147 @@
+"""
+Top-K Leaderboards
+==================
+
+``top_k`` picks the k largest groups of an aggregate with ``np.argpartition``
+(O(n) selection) and sorts only those k rows, instead of sorting every group.
+
+``SpaceSaving`` maintains an approximate leaderboard incrementally (weighted
+Space-Saving, Metwally et al., merged batch-wise as in Agarwal et al.'s
+mergeable summaries): each appended batch of transactions is pre-aggregated
+and merged into at most ``capacity`` counters, so history is never rescanned.
+For every tracked key, ``count - error <= true total <= count``, so keys whose
+``error`` is zero are exact and the ranking is reliable wherever the bounds of
+neighbouring keys do not overlap.
+
+Usage:
+    top_reps = top_k(cube.rollup('sales_rep'), 'sum', k=10)
+
+    board = Leaderboard('sales_rep', 'sales', capacity=200)
+    for chunk in new_transaction_batches:
+        board.append(chunk)
+    board.top(10)
+
+    board.catch_up(transactions)   # append only the rows of a growing table not seen yet
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+
+def top_k(frame, measure, k=10, ascending=False):
+    """The ``k`` rows of ``frame`` with the largest ``measure``, best first.
+
+    ``ascending=True`` returns the same rows ordered smallest first (handy for
+    horizontal bar charts, which draw the last row on top).
+    """
+    values = frame[measure].to_numpy()
+    if len(values) > k:
+        picked = np.argpartition(-values, k - 1)[:k]
+    else:
+        picked = np.arange(len(values))
+    picked = picked[np.argsort(-values[picked], kind='stable')]
+    if ascending:
+        picked = picked[::-1]
+    return frame.iloc[picked]
+
+
+class SpaceSaving:
+    """Weighted Space-Saving summary with at most ``capacity`` counters."""
+
+    def __init__(self, capacity=100):
+        self.capacity = capacity
+        self.counts = pd.Series(dtype=float)
+        self.errors = pd.Series(dtype=float)
+        self.total_weight = 0.0
+
+    def update(self, keys, weights=None):
+        """Add a batch of (key, weight) observations."""
+        keys = pd.Series(np.asarray(keys))
+        weights = np.ones(len(keys)) if weights is None else np.asarray(weights, dtype=float)
+        batch = pd.Series(weights).groupby(keys.to_numpy(), sort=False).sum()
+        self.merge(batch, pd.Series(0.0, index=batch.index))
+
+    @property
+    def floor(self):
+        """Largest count an item this summary does not track may have had."""
+        return self.counts.min() if len(self.counts) >= self.capacity else 0.0
+
+    def merge(self, counts, errors=None, floor=0.0):
+        """Merge another summary (``counts``/``errors`` keyed by item, or a ``SpaceSaving``).
+
+        ``floor`` is the other summary's bound for items it does not track:
+        its minimum counter when it is full, 0 when it is exact (a raw batch).
+        """
+        if isinstance(counts, SpaceSaving):
+            other = counts
+            counts, errors, floor = other.counts, other.errors, other.floor
+            weight = other.total_weight
+        else:
+            weight = float(counts.sum() - errors.sum())
+        # Items absent from one side may have had up to that side's floor there
+        combined_counts = counts.add(self.counts, fill_value=0.0)
+        combined_errors = errors.add(self.errors, fill_value=0.0)
+        missing_here = ~combined_counts.index.isin(self.counts.index)
+        missing_there = ~combined_counts.index.isin(counts.index)
+        combined_counts[missing_here] += self.floor
+        combined_errors[missing_here] += self.floor
+        combined_counts[missing_there] += floor
+        combined_errors[missing_there] += floor
+        self.total_weight += weight
+
+        if len(combined_counts) > self.capacity:
+            values = combined_counts.to_numpy()
+            keep = np.argpartition(-values, self.capacity - 1)[:self.capacity]
+            combined_counts = combined_counts.iloc[keep]
+            combined_errors = combined_errors.loc[combined_counts.index]
+        self.counts = combined_counts
+        self.errors = combined_errors
+
+    def top(self, k=10):
+        """Top ``k`` items with estimated count and error bound, best first."""
+        table = pd.DataFrame({'count': self.counts, 'error': self.errors})
+        table['guaranteed'] = table['count'] - table['error']
+        return top_k(table, 'count', k)
+
+
+class Leaderboard:
+    """Incremental top-K of ``measure`` summed per ``dimension`` value."""
+
+    def __init__(self, dimension, measure, capacity=100):
+        self.dimension = dimension
+        self.measure = measure
+        self.capacity = capacity
+        self.summary = SpaceSaving(capacity)
+        self.rows = 0   # rows folded in so far
+        self._lock = threading.Lock()
+
+    def append(self, transactions):
+        """Fold newly arrived rows into the leaderboard."""
+        with self._lock:
+            self._append(transactions)
+
+    def _append(self, transactions):
+        if len(transactions):
+            self.summary.update(transactions[self.dimension].to_numpy(),
+                                transactions[self.measure].to_numpy())
+        self.rows += len(transactions)
+
+    def catch_up(self, transactions):
+        """Fold in the rows of an append-only table past those already seen.
+
+        A table shorter than what was seen has been replaced, so the
+        leaderboard starts over from its first row.
+        """
+        with self._lock:
+            if len(transactions) < self.rows:
+                self.summary = SpaceSaving(self.capacity)
+                self.rows = 0
+            self._append(transactions.iloc[self.rows:])
+
+    def top(self, k=10):
+        with self._lock:
+            table = self.summary.top(k).rename(columns={'count': self.measure})
+        table.index.name = self.dimension
+        return table.reset_index()